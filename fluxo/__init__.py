@@ -4,9 +4,11 @@ from fluxo.fluxo_core.flow import Flow
 from fluxo.fluxo_core.task import Task
 
 from fluxo.fluxo_core.intervals import (
+    Seconds,
     Minutes,
     Hours,
-    Days
+    Days,
+    Cron
 )
 
 __version__ = AppSettings.VERSION
\ No newline at end of file
@@ -0,0 +1,289 @@
+import os
+import sys
+import atexit
+import pickle
+from multiprocessing import shared_memory, resource_tracker
+from fluxo.settings import Artifacts
+from fluxo.logging import logger
+from fluxo.fluxo_core.database.artifact import ModelArtifact
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+
+class ArtifactStore:
+    '''
+    Stores the values returned by tasks as artifacts of the flow execution (run) that
+    produced them, so downstream tasks of the same run can read them.
+
+    Small values are pickled into the 'TB_Artifact' table. Large `bytes`, NumPy arrays
+    and Arrow buffers/tables are copied once into a `multiprocessing.shared_memory` block
+    and read back as zero-copy views. Everything is freed by `release()` when the run completes.
+
+    Methods:
+        - put(id_log_flow, task_name, value): Stores the value returned by a task.
+        - get(id_log_flow, task_name): Returns the value stored by a task in the run.
+        - release(id_log_flow): Frees all artifacts of the run.
+    '''
+    _segments: dict = {} # {shm_name: SharedMemory} opened by this process
+    _views: dict = {} # {shm_name: [memoryview]} returned by `get`, released with the run
+    _unclosed: list = [] # Blocks whose views are still used, closed once they are dropped
+    _untracked: set = set() # Blocks attached by this process and removed from its resource tracker
+
+    @staticmethod
+    def put(id_log_flow: int, task_name: str, value):
+        '''
+        Stores the value returned by a task as an artifact of the run.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+            - task_name (str): The name of the task that returned the value.
+            - value: The value returned by the task. `None` is not stored.
+
+        Returns:
+            ModelArtifact or None: The saved artifact, None if the value could not be stored.
+        '''
+        if value is None:
+            return None
+
+        try:
+            kind, metadata, payload = ArtifactStore._encode(value)
+        except Exception as err:
+            logger.warning(f'Value returned by task [{task_name}] can not be stored: {err}')
+            return None
+        size = payload.nbytes
+
+        # The task already succeeded, a failure to store its value is logged and the downstream tasks get None
+        try:
+            if size <= Artifacts.INLINE_MAX_BYTES:
+                artifact = ModelArtifact(
+                    id_log_flow=id_log_flow,
+                    task_name=task_name,
+                    storage='inline',
+                    value=bytes(payload),
+                    size=size,
+                    metadata={'kind': kind, **metadata}
+                )
+                return artifact.save()
+
+            return ArtifactStore._put_shared_memory(id_log_flow, task_name, kind, metadata, payload)
+        except Exception as err:
+            logger.error(f'Value returned by task [{task_name}] could not be stored: {err}')
+            return None
+
+    @staticmethod
+    def _put_shared_memory(id_log_flow: int, task_name: str, kind: str, metadata: dict, payload: memoryview):
+        '''
+        Copies the payload into a new shared memory block and saves its artifact. The block
+        is unlinked if the artifact can not be saved.
+        '''
+        size = payload.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            shm.buf[:size] = payload
+            artifact = ModelArtifact(
+                id_log_flow=id_log_flow,
+                task_name=task_name,
+                storage='shared_memory',
+                shm_name=shm.name,
+                size=size,
+                metadata={'kind': kind, **metadata}
+            ).save()
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+        ArtifactStore._segments[shm.name] = shm
+        return artifact
+
+    @staticmethod
+    def get(id_log_flow: int, task_name: str):
+        '''
+        Returns the value stored by a task in the run.
+
+        Values in shared memory are returned as views over the shared block:
+        `memoryview` for bytes, `numpy.ndarray` for arrays and `pyarrow` objects for Arrow data.
+        The views are valid until the run is released.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+            - task_name (str): The name of the task that returned the value.
+
+        Returns:
+            The stored value, or None if the task did not store one.
+        '''
+        artifact = ModelArtifact.get_by_idlogflow_and_taskname(id_log_flow, task_name)
+        if artifact is None:
+            return None
+
+        if artifact.storage == 'inline':
+            return ArtifactStore._decode(artifact.metadata, memoryview(artifact.value))
+
+        buffer = ArtifactStore._attach(artifact.shm_name).buf[:artifact.size]
+        value = ArtifactStore._decode(artifact.metadata, buffer)
+        if artifact.metadata.get('kind') == 'pickle':
+            buffer.release() # Unpickling copied it
+        else:
+            ArtifactStore._views.setdefault(artifact.shm_name, []).append(buffer)
+        return value
+
+    @staticmethod
+    def release(id_log_flow: int):
+        '''
+        Frees all artifacts of the run: shared memory blocks are unlinked and
+        the rows are deleted from the database.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+        '''
+        ArtifactStore._close_unclosed()
+        artifacts = ModelArtifact.get_all_by_id_log_flow(id_log_flow)
+        if artifacts is None:
+            return
+
+        for artifact in artifacts:
+            if artifact.storage == 'shared_memory':
+                try:
+                    shm = ArtifactStore._attach(artifact.shm_name)
+                except FileNotFoundError:
+                    continue
+                if artifact.shm_name in ArtifactStore._untracked:
+                    # `unlink` removes the block from the resource tracker, which must know it
+                    ArtifactStore._untracked.discard(artifact.shm_name)
+                    resource_tracker.register(f'/{shm.name}', 'shared_memory')
+                shm.unlink()
+                ArtifactStore._close(artifact.shm_name)
+
+        ModelArtifact.delete_all_by_id_log_flow(id_log_flow)
+        logger.info(f'Artifacts of flow execution [{id_log_flow}] released')
+
+    @staticmethod
+    def _close(shm_name: str):
+        '''
+        Releases the views of a block returned by `get` and closes it in this process. A block
+        with views still in use (an array or Arrow object built on them) is kept in `_unclosed`,
+        so it is not closed, and raises again, when garbage collected.
+        '''
+        shm = ArtifactStore._segments.pop(shm_name, None)
+        for view in ArtifactStore._views.pop(shm_name, []):
+            try:
+                view.release()
+            except BufferError:
+                pass
+        if shm is None:
+            return
+        try:
+            shm.close()
+        except BufferError:
+            ArtifactStore._unclosed.append(shm)
+
+    @staticmethod
+    def _close_all():
+        '''
+        Closes the blocks of this process when it exits, before the garbage collector does.
+        '''
+        for shm_name in list(ArtifactStore._segments):
+            ArtifactStore._close(shm_name)
+
+    @staticmethod
+    def _close_unclosed():
+        '''
+        Closes the blocks released while their views were in use, once the views are dropped.
+        '''
+        unclosed, ArtifactStore._unclosed = ArtifactStore._unclosed, []
+        for shm in unclosed:
+            try:
+                shm.close()
+            except BufferError:
+                ArtifactStore._unclosed.append(shm)
+
+    @staticmethod
+    def _attach(shm_name: str):
+        '''
+        Returns the shared memory block, attaching to it when it was created by another process.
+        '''
+        shm = ArtifactStore._segments.get(shm_name)
+        if shm is None:
+            # Only the creator owns the block, otherwise the resource tracker
+            # unlinks it when this process exits
+            if sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=shm_name, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=shm_name)
+                if os.name == 'posix': # The tracker knows the block by its POSIX name
+                    resource_tracker.unregister(f'/{shm.name}', 'shared_memory')
+                    ArtifactStore._untracked.add(shm_name)
+            ArtifactStore._segments[shm_name] = shm
+        return shm
+
+    @staticmethod
+    def _encode(value):
+        '''
+        Converts a value to (kind, metadata, payload), where payload is a flat `memoryview`.
+        '''
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return 'bytes', {}, memoryview(value).cast('B')
+
+        numpy = sys.modules.get('numpy')
+        if numpy is not None and isinstance(value, numpy.ndarray) and not value.dtype.hasobject:
+            value = numpy.ascontiguousarray(value)
+            metadata = {'dtype': value.dtype.str, 'shape': list(value.shape)}
+            return 'ndarray', metadata, memoryview(value.reshape(-1).view(numpy.uint8))
+
+        pyarrow = sys.modules.get('pyarrow')
+        if pyarrow is not None:
+            if isinstance(value, pyarrow.Buffer):
+                return 'arrow_buffer', {}, memoryview(value)
+            if isinstance(value, (pyarrow.Table, pyarrow.RecordBatch)):
+                sink = pyarrow.BufferOutputStream()
+                with pyarrow.ipc.new_stream(sink, value.schema) as writer:
+                    writer.write(value)
+                return 'arrow_table', {}, memoryview(sink.getvalue())
+
+        return 'pickle', {}, memoryview(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _decode(metadata: dict, buffer: memoryview):
+        '''
+        Rebuilds a value from its metadata and a buffer, without copying when possible.
+        '''
+        kind = metadata.get('kind')
+
+        if kind == 'bytes':
+            return buffer
+        elif kind == 'ndarray':
+            import numpy
+            return numpy.frombuffer(buffer, dtype=metadata.get('dtype')).reshape(metadata.get('shape'))
+        elif kind == 'arrow_buffer':
+            import pyarrow
+            return pyarrow.py_buffer(buffer)
+        elif kind == 'arrow_table':
+            import pyarrow
+            return pyarrow.ipc.open_stream(pyarrow.py_buffer(buffer)).read_all()
+        else:
+            return pickle.loads(buffer)
+
+
+atexit.register(ArtifactStore._close_all)
+
+
+def get_artifact(flow, task_name: str):
+    '''
+    Returns the value returned by a task in the current execution of the flow.
+
+    Parameters:
+        - flow (Flow): The flow the task belongs to.
+        - task_name (str): The name of the task that returned the value.
+
+    Returns:
+        The stored value, or None if there is no running execution or the task did not return a value.
+    '''
+    flow_register_db = ModelFlow.get_by_name(flow.name)
+    if flow_register_db is None:
+        return None
+
+    log_flow = ModelLogExecutionFlow.get_by_idflow_and_endtime_is_none(flow_register_db.id)
+    if log_flow is None:
+        return None
+
+    return ArtifactStore.get(log_flow.id, task_name)
@@ -0,0 +1,174 @@
+import os
+import re
+from time import sleep, monotonic
+from contextlib import contextmanager
+from fluxo.settings import Concurrency
+from fluxo.logging import logger
+from fluxo.fluxo_core.metrics import CONCURRENCY_WAIT, CONCURRENCY_WAITING
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+
+class Semaphore:
+    '''
+    A semaphore shared by all the processes of the machine, made of `limit` lock files
+    (`<name>.<slot>.lock` in `Concurrency.DIR`): holding a slot is holding the `flock` of
+    its file. The kernel releases the locks of a process that dies, so a killed flow
+    never keeps its slot. The processes waiting for a slot line up on the `flock` of
+    `<name>.queue`, and only the first of them polls the slots.
+
+    Example:
+        ```
+        semaphore = Semaphore('warehouse', 2)
+        semaphore.acquire()
+        try:
+            ...
+        finally:
+            semaphore.release()
+        ```
+    '''
+    def __init__(self, name: str, limit: int, directory: str = Concurrency.DIR):
+        self.name = name
+        self.limit = limit
+        self.directory = directory
+        self._prefix = os.path.join(directory, re.sub(r'[^\w.-]', '_', name))
+        self._fd = None
+
+    def try_acquire(self):
+        '''
+        Takes a free slot, if there is one.
+
+        Returns:
+            bool: True if a slot was taken.
+        '''
+        os.makedirs(self.directory, exist_ok=True)
+        for slot in range(self.limit):
+            fd = os.open(f'{self._prefix}.{slot}.lock', os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self._fd = fd
+            return True
+        return False
+
+    def acquire(self):
+        '''
+        Takes a slot, waiting in the queue of the semaphore while all of them are taken.
+        '''
+        if self.try_acquire():
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f'{self._prefix}.queue', 'w') as queue:
+            fcntl.flock(queue, fcntl.LOCK_EX) # Waits for the processes that came before
+            try:
+                while not self.try_acquire():
+                    sleep(Concurrency.POLL_INTERVAL)
+            finally:
+                fcntl.flock(queue, fcntl.LOCK_UN)
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class ConcurrencyLimits:
+    '''
+    Limits how many flows run at the same time, in all the processes of the machine
+    (per-flow processes and dispatcher workers alike): at most `Concurrency.MAX_RUNNING`
+    overall and at most the limit of each tag of the flow, e.g.
+    `FLUXO_TAG_LIMITS='warehouse=2;api=1'`. A flow over a limit waits for a slot instead of failing.
+
+    Methods:
+        - hold(flow_info): Context manager that holds the slots of a flow execution.
+        - tag_limits(): The configured limit of each tag.
+    '''
+    _tag_limits: dict = None # {tag: limit}
+
+    @staticmethod
+    @contextmanager
+    def hold(flow_info):
+        '''
+        Waits for a slot of each limit that applies to the flow and holds them while the
+        flow runs. Tags are taken in name order and the global limit last, so two flows
+        never wait for each other and a waiting flow does not keep a global slot.
+
+        Parameters:
+            - flow_info (Flow): The flow about to run.
+
+        Yields:
+            float: The seconds spent waiting for the slots.
+        '''
+        semaphores = ConcurrencyLimits._semaphores(flow_info)
+        if semaphores and fcntl is None:
+            logger.warning('Concurrency limits are not supported on this platform')
+            semaphores = []
+
+        start = monotonic()
+        waiting = False
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                if not semaphore.try_acquire():
+                    waiting = True
+                    logger.info(
+                        f'Flow [{flow_info.name}] is waiting for a slot of [{semaphore.name}] (limit {semaphore.limit})')
+                    CONCURRENCY_WAITING.inc(semaphore.name)
+                    try:
+                        semaphore.acquire()
+                    finally:
+                        CONCURRENCY_WAITING.inc(semaphore.name, amount=-1)
+                acquired.append(semaphore)
+        except BaseException:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+            raise
+
+        waited = monotonic() - start
+        if semaphores:
+            CONCURRENCY_WAIT.observe(waited, flow_info.name)
+        if waiting:
+            logger.info(f'Flow [{flow_info.name}] waited {waited:.1f}s for a concurrency slot')
+
+        try:
+            yield waited
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    @staticmethod
+    def tag_limits():
+        '''
+        Returns:
+            dict: {tag: limit} parsed from `Concurrency.TAG_LIMITS` ('tag=N;tag=N').
+        '''
+        if ConcurrencyLimits._tag_limits is None:
+            limits = {}
+            for item in Concurrency.TAG_LIMITS.split(';'):
+                if '=' not in item:
+                    continue
+                tag, limit = item.rsplit('=', 1)
+                try:
+                    limits[tag.strip()] = int(limit)
+                except ValueError:
+                    logger.warning(f'Invalid FLUXO_TAG_LIMITS entry: {item}')
+            ConcurrencyLimits._tag_limits = limits
+        return ConcurrencyLimits._tag_limits
+
+    @staticmethod
+    def _semaphores(flow_info):
+        limits = ConcurrencyLimits.tag_limits()
+        semaphores = [
+            Semaphore(f'tag-{tag}', limits[tag])
+            for tag in sorted(set(getattr(flow_info, 'tags', None) or [])) if limits.get(tag, 0) > 0
+        ]
+        if Concurrency.MAX_RUNNING > 0:
+            semaphores.append(Semaphore('global', Concurrency.MAX_RUNNING))
+        return semaphores
@@ -0,0 +1,195 @@
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+
+_MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+_MONTH_NAMES = {name.upper(): number for number, name in enumerate(calendar.month_abbr) if name}
+_DAY_NAMES = {'SUN': 0, 'MON': 1, 'TUE': 2, 'WED': 3, 'THU': 4, 'FRI': 5, 'SAT': 6}
+
+# Leap years repeat at most every 8 years (e.g. '0 0 29 2 *' after 2096)
+_MAX_YEARS_AHEAD = 8
+
+
+class CronExpression:
+    '''
+    A parsed five-field cron expression: `minute hour day-of-month month day-of-week`.
+
+    Each field is kept as a bitset (bit `n` set means the value `n` matches), so finding
+    the next matching value of a field is a shift and a lowest-set-bit lookup instead of
+    a minute-by-minute scan. Fields accept `*`, `a`, `a-b`, `*/n`, `a-b/n`, `a/n` and
+    comma-separated lists; months and days of the week also accept names (`JAN`, `MON`).
+    As in Vixie cron, when both day fields are restricted a day matches either of them.
+
+    Methods:
+        - parse(expression): Returns the parsed (and cached) expression.
+        - next_fire(after): Returns the first matching minute after a datetime.
+        - fire_times(after, until): Yields the matching minutes in an interval.
+
+    Example:
+    >>> CronExpression.parse('*/5 8-18 * * 1-5').next_fire(datetime(2024, 6, 1, 12, 0))
+    datetime.datetime(2024, 6, 3, 8, 0)
+    '''
+    def __init__(self, expression: str) -> None:
+        fields = _MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression must have 5 fields: {expression!r}')
+
+        self.expression = expression
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, _MONTH_NAMES)
+        days_of_week = _parse_field(fields[4], 0, 7, _DAY_NAMES)
+        self.days_of_week = (days_of_week | (days_of_week >> 7)) & 0x7F # 7 is also Sunday
+
+        self._days_restricted = not fields[2].startswith('*')
+        self._days_of_week_restricted = not fields[4].startswith('*')
+        self._month_days = {} # {(year, month): bitset of the matching days}
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def parse(expression: str):
+        '''
+        Returns the parsed expression, cached so each flow pays the parsing cost once.
+
+        Raises:
+            ValueError: If the expression is invalid.
+        '''
+        return CronExpression(expression)
+
+    def next_fire(self, after: datetime):
+        '''
+        Returns the first minute strictly after `after` that matches the expression.
+
+        Parameters:
+            - after (datetime): The reference time (naive, local time).
+
+        Returns:
+            datetime: The next fire time, with seconds and microseconds set to zero.
+        '''
+        current = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day, hour, minute = current.year, current.month, current.day, current.hour, current.minute
+
+        while year <= after.year + _MAX_YEARS_AHEAD:
+            next_month = _next_bit(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            next_day = _next_bit(self._days_of_month(year, month), day)
+            if next_day is None:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if next_day != day:
+                day, hour, minute = next_day, 0, 0
+
+            next_hour = _next_bit(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            next_minute = _next_bit(self.minutes, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                continue
+
+            return datetime(year, month, day, hour, next_minute)
+
+        raise ValueError(f'Cron expression never fires: {self.expression!r}')
+
+    def fire_times(self, after: datetime, until: datetime):
+        '''
+        Yields the fire times strictly after `after` and up to `until` (inclusive).
+        '''
+        fire_time = self.next_fire(after)
+        while fire_time <= until:
+            yield fire_time
+            fire_time = self.next_fire(fire_time)
+
+    def _days_of_month(self, year: int, month: int):
+        '''
+        Returns the bitset of the days of a month that match the day-of-month and day-of-week fields.
+        '''
+        key = (year, month)
+        days = self._month_days.get(key)
+        if days is None:
+            first_weekday, length = calendar.monthrange(year, month)
+            first_weekday = (first_weekday + 1) % 7 # Monday=0 -> Sunday=0
+
+            days_of_week = 0
+            for day in range(1, length + 1):
+                if self.days_of_week >> ((first_weekday + day - 1) % 7) & 1:
+                    days_of_week |= 1 << day
+
+            if self._days_restricted and self._days_of_week_restricted:
+                days = self.days | days_of_week
+            else:
+                days = self.days & days_of_week
+            days &= (1 << (length + 1)) - 2 # Days 1 to length
+
+            if len(self._month_days) > 64:
+                self._month_days.clear()
+            self._month_days[key] = days
+        return days
+
+    def __repr__(self) -> str:
+        return f'CronExpression({self.expression!r})'
+
+
+def _next_bit(bits: int, start: int):
+    '''
+    Returns the position of the lowest set bit at or above `start`, or None.
+    '''
+    bits >>= start
+    if not bits:
+        return None
+    return start + (bits & -bits).bit_length() - 1
+
+
+def _parse_field(field: str, minimum: int, maximum: int, names: dict = None):
+    '''
+    Parses one field of a cron expression into a bitset.
+    '''
+    bits = 0
+    for part in field.split(','):
+        values, step_given, step = part.partition('/')
+        step = _parse_value(step, 1, maximum) if step_given else 1
+
+        if values == '*':
+            start, end = minimum, maximum
+        elif '-' in values:
+            start, end = (_parse_value(value, minimum, maximum, names) for value in values.split('-', 1))
+            if start > end:
+                raise ValueError(f'Invalid cron range: {part!r}')
+        else:
+            start = _parse_value(values, minimum, maximum, names)
+            end = maximum if step_given else start
+
+        for value in range(start, end + 1, step):
+            bits |= 1 << value
+    return bits
+
+
+def _parse_value(value: str, minimum: int, maximum: int, names: dict = None):
+    if names and value.upper() in names:
+        return names[value.upper()]
+    if not value.isdigit() or not minimum <= int(value) <= maximum:
+        raise ValueError(f'Invalid cron value {value!r}, expected {minimum}-{maximum}')
+    return int(value)
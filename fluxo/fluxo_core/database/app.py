@@ -1,7 +1,6 @@
-import sqlite3
 from datetime import datetime
 from dataclasses import dataclass
-from fluxo.settings import Db
+from fluxo.fluxo_core.database.db import connect
 from fluxo.uttils import current_time_formatted
 
 
@@ -36,7 +35,7 @@ class ModelApp:
             self.active_since = current_time_formatted()
         else:
             self.active_since = None
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO TB_App (active, active_since)
@@ -65,7 +64,7 @@ class ModelApp:
             active_since = current_time_formatted()
         else:
             active_since = None
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE TB_App
@@ -88,7 +87,7 @@ class ModelApp:
         Returns:
             App or None: An instance of the 'App' class if found, else None.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_App WHERE id=?', (id,))
         data = cursor.fetchone()
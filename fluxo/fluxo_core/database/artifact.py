@@ -0,0 +1,177 @@
+import json
+from datetime import datetime
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+from fluxo.uttils import current_time_formatted
+
+
+@dataclass
+class ModelArtifact:
+    '''
+    Represents the value returned by a task during a flow execution, with attributes
+    corresponding to the columns in the 'TB_Artifact' table in the SQLite database.
+
+    Attributes:
+        - id (int): The unique identifier for the 'Artifact'.
+        - id_log_flow (int): The ID of the flow execution (run) that produced the 'Artifact'.
+        - task_name (str): The name of the task that returned the value.
+        - storage (str): Where the value lives: 'inline' (in the `value` column) or 'shared_memory'.
+        - value (bytes): The serialized value when stored inline.
+        - shm_name (str): The name of the shared memory block when stored in shared memory.
+        - size (int): The size of the stored value in bytes.
+        - metadata (dict): How to rebuild the value. Ex `{'kind': 'ndarray', 'dtype': '<f8', 'shape': [10]}`
+        - date_of_creation (datetime): The date and time when the 'Artifact' was created.
+
+    Methods:
+        - save(): Saves the current 'Artifact' instance to the 'TB_Artifact' table in the database.
+        - get_by_id(id): Retrieves an 'Artifact' instance by its ID.
+        - get_by_idlogflow_and_taskname(id_log_flow, task_name): Retrieves the latest 'Artifact'
+            returned by a task in a flow execution.
+        - get_all_by_id_log_flow(id_log_flow): Retrieves all 'Artifact' instances of a flow execution.
+        - delete_all_by_id_log_flow(id_log_flow): Deletes all 'Artifact' instances of a flow execution.
+    '''
+    id: int = None
+    id_log_flow: int = None
+    task_name: str = None
+    storage: str = None
+    value: bytes = None
+    shm_name: str = None
+    size: int = None
+    metadata: dict = None
+    date_of_creation: datetime = None
+
+    def save(self):
+        '''
+        Saves the current 'Artifact' instance to the 'TB_Artifact' table in the database.
+
+        Returns:
+            Artifact: The saved 'Artifact' instance.
+        '''
+        date_of_creation = current_time_formatted()
+        metadata = json.dumps(self.metadata) if self.metadata else None
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_Artifact (id_log_flow, task_name, storage, value, shm_name, size, metadata, date_of_creation)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (self.id_log_flow, self.task_name, self.storage, self.value, self.shm_name, self.size, metadata, date_of_creation))
+        conn.commit()
+
+        # Retrieve artifact ID after insertion
+        cursor.execute('SELECT last_insert_rowid()')
+        artifact_id = cursor.fetchone()[0]
+
+        conn.close()
+
+        return ModelArtifact.get_by_id(artifact_id)
+
+    @staticmethod
+    def get_by_id(id):
+        '''
+        Retrieves an 'Artifact' instance by its ID from the 'TB_Artifact' table.
+
+        Parameters:
+            - id (int): The ID of the 'Artifact' to be retrieved.
+
+        Returns:
+            Artifact or None: The 'Artifact' instance if found, or None if not found.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_Artifact WHERE id=?', (id,))
+        data = cursor.fetchone()
+        conn.close()
+
+        if data:
+            artifact = ModelArtifact(*data)
+            artifact.metadata = json.loads(artifact.metadata) if artifact.metadata else None
+            return artifact
+        else:
+            return None
+
+    @staticmethod
+    def get_by_idlogflow_and_taskname(id_log_flow, task_name):
+        '''
+        Retrieves the latest 'Artifact' returned by a task in a flow execution.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+            - task_name (str): The name of the task that returned the value.
+
+        Returns:
+            Artifact or None: The 'Artifact' instance if found, or None if not found.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM TB_Artifact
+            WHERE id_log_flow=? AND task_name=?
+            ORDER BY id DESC LIMIT 1
+        ''', (id_log_flow, task_name))
+        data = cursor.fetchone()
+        conn.close()
+
+        if data:
+            artifact = ModelArtifact(*data)
+            artifact.metadata = json.loads(artifact.metadata) if artifact.metadata else None
+            return artifact
+        else:
+            return None
+
+    @staticmethod
+    def get_all_by_id_log_flow(id_log_flow):
+        '''
+        Retrieves all 'Artifact' instances of a flow execution.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+
+        Returns:
+            List[Artifact] or None: A list containing the 'Artifact' instances, or None if no artifacts are found.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_Artifact WHERE id_log_flow=?', (id_log_flow,))
+        data = cursor.fetchall()
+        conn.close()
+
+        artifacts = []
+        for row in data:
+            artifact = ModelArtifact(*row)
+            artifact.metadata = json.loads(artifact.metadata) if artifact.metadata else None
+            artifacts.append(artifact)
+
+        if artifacts:
+            return artifacts
+        else:
+            return None
+
+    @staticmethod
+    def delete_all_by_id_log_flow(id_log_flow):
+        '''
+        Deletes all 'Artifact' instances of a flow execution from the 'TB_Artifact' table.
+
+        Parameters:
+            - id_log_flow (int): The ID of the flow execution.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_Artifact WHERE id_log_flow=?', (id_log_flow,))
+        conn.commit()
+        conn.close()
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'Artifact' instance.
+        '''
+        return f'''
+            id:                     {self.id},
+            id_log_flow:            {self.id_log_flow},
+            task_name:              {self.task_name},
+            storage:                {self.storage},
+            shm_name:               {self.shm_name},
+            size:                   {self.size},
+            metadata:               {self.metadata},
+            date_of_creation:       {self.date_of_creation},
+        '''
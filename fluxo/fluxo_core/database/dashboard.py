@@ -0,0 +1,232 @@
+import json
+from typing import List
+from dataclasses import dataclass, field
+from fluxo.fluxo_core.database.db import connect
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+
+FLOW_COLUMNS = 8 # Columns of 'TB_Flow', in the order of 'ModelFlow'
+
+# What a dashboard row is built from, besides its last executions (see `get_fingerprints`)
+FINGERPRINT_COLUMNS = '''
+    f.*,
+    EXISTS (SELECT 1 FROM TB_ProfileRequest p WHERE p.flow_id=f.id AND p.remaining > 0),
+    (SELECT MAX(l.id) FROM TB_LogExecutionFlow l WHERE l.id_flow=f.id),
+    (SELECT COUNT(*) FROM TB_LogExecutionFlow l WHERE l.id_flow=f.id AND l.end_time IS NULL)
+'''
+
+# Filters of `get_page` by status. All use an index, 'failed' probes the last execution of each flow
+STATUSES = {
+    'on': 'f.running = 1', # Scheduled
+    'off': 'f.running = 0',
+    'executing': 'f.id IN (SELECT id_flow FROM TB_LogExecutionFlow WHERE end_time IS NULL)',
+    'failed': '''(
+        SELECT ids_error_task FROM TB_LogExecutionFlow WHERE id_flow=f.id ORDER BY id DESC LIMIT 1
+    ) IS NOT NULL''', # The last execution has failed tasks
+}
+
+# Orders of `get_page`: (ORDER BY, condition after the cursor, its parameters from the cursor (name, id))
+SORTS = {
+    'name': (
+        'f.name COLLATE NOCASE, f.id',
+        'f.name COLLATE NOCASE >= ? AND (f.name COLLATE NOCASE, f.id) > (?, ?)',
+        lambda name, id: (name, name, id)
+    ),
+    'newest': (
+        'f.id DESC',
+        'f.id < ?',
+        lambda name, id: (id,)
+    ),
+}
+
+
+@dataclass
+class ModelFlowDashboard:
+    '''
+    Represents a row of the dashboard: a 'Flow' with its last executions and whether
+    a profile of it was requested, read in one query.
+
+    Attributes:
+        - flow (ModelFlow): The flow.
+        - log_flows (List[ModelLogExecutionFlow]): The last executions of the flow, oldest first.
+        - profiling (bool): If a profile of the next runs was requested and not consumed yet.
+        - fingerprint (tuple): What the row was read from, compared with `get_fingerprints` to know
+                when it must be read again.
+
+    Methods:
+        - get_all(last_executions, flow_ids): Retrieves every flow, or some flows, with its last executions.
+        - get_page(search, status, tag, sort, after, limit, last_executions): Retrieves a page of
+                the flows that match a search, with their last executions.
+        - get_fingerprints(flow_ids): Retrieves a cheap summary of each flow that changes when its row must be redrawn.
+        - get_counts(): Retrieves the number of flows with each status.
+    '''
+    flow: ModelFlow = None
+    log_flows: List[ModelLogExecutionFlow] = field(default_factory=list)
+    profiling: bool = False
+    fingerprint: tuple = None
+
+    @staticmethod
+    def get_all(last_executions: int = 10, flow_ids: list = None):
+        '''
+        Retrieves every flow with its last executions.
+
+        Parameters:
+            - last_executions (int): The number of executions read per flow.
+            - flow_ids (list): Only these flows, when given.
+
+        Returns:
+            List[ModelFlowDashboard]: The flows, in the order they were created.
+        '''
+        if flow_ids is None:
+            return ModelFlowDashboard._read('SELECT id FROM TB_Flow', (), 'f.id', last_executions)
+        return ModelFlowDashboard._read(
+            f"SELECT id FROM TB_Flow WHERE id IN ({', '.join('?' * len(flow_ids))})",
+            tuple(flow_ids), 'f.id', last_executions)
+
+    @staticmethod
+    def get_page(search: str = None, status: str = None, tag: str = None, sort: str = 'name',
+                 after: tuple = None, limit: int = 50, last_executions: int = 10):
+        '''
+        Retrieves a page of the flows that match a search, with their last executions.
+        Every filter and order is served by an index, and the pages are read from a cursor
+        instead of an offset, so a page costs the same wherever it is in the list.
+
+        Parameters:
+            - search (str): The start of the name of the flows, in any case.
+            - status (str): Only the flows with this status, one of `STATUSES`.
+            - tag (str): Only the flows with this tag.
+            - sort (str): The order of the flows, one of `SORTS`.
+            - after (tuple): The cursor, (name, id) of the last flow of the previous page.
+            - limit (int): The number of flows of the page.
+            - last_executions (int): The number of executions read per flow.
+
+        Returns:
+            List[ModelFlowDashboard]: The flows of the page. Fewer than `limit` on the last page.
+        '''
+        if status is not None and status not in STATUSES:
+            raise ValueError(f'Status must be one of {", ".join(STATUSES)}.')
+        if sort not in SORTS:
+            raise ValueError(f'Sort must be one of {", ".join(SORTS)}.')
+        order, after_condition, after_parameters = SORTS[sort]
+
+        conditions, parameters = [], []
+        if search:
+            # A range instead of LIKE, so '%' and '_' in the search are not wildcards
+            conditions.append('f.name COLLATE NOCASE >= ? AND f.name COLLATE NOCASE < ?')
+            parameters += [search, search + '\U0010FFFF']
+        if status is not None:
+            conditions.append(STATUSES[status])
+        if tag:
+            conditions.append('f.id IN (SELECT flow_id FROM TB_FlowTag WHERE tag=?)')
+            parameters.append(tag)
+        if after is not None:
+            conditions.append(after_condition)
+            parameters += after_parameters(*after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        return ModelFlowDashboard._read(
+            f'SELECT f.id FROM TB_Flow f {where} ORDER BY {order} LIMIT ?',
+            (*parameters, limit), order, last_executions)
+
+    @staticmethod
+    def _read(flows_sql: str, parameters: tuple, order: str, last_executions: int):
+        '''
+        Reads the flows selected by `flows_sql` (their IDs) with their last executions, in one query.
+        The executions are read from the index of each flow, from its `last_executions`-th last one.
+        '''
+        if last_executions < 1:
+            raise ValueError('The number of executions read per flow must be at least 1.')
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            WITH selected AS ({flows_sql})
+            SELECT
+                {FINGERPRINT_COLUMNS},
+                l.id, l.name, l.date_of_creation, l.start_time, l.end_time,
+                l.id_flow, l.ids_task, l.ids_error_task, l.worker
+            FROM TB_Flow f
+            LEFT JOIN TB_LogExecutionFlow l ON l.id_flow=f.id AND l.id >= IFNULL((
+                SELECT id FROM TB_LogExecutionFlow WHERE id_flow=f.id ORDER BY id DESC LIMIT 1 OFFSET ?
+            ), 0)
+            WHERE f.id IN (SELECT id FROM selected)
+            ORDER BY {order}, l.id
+        ''', (*parameters, last_executions - 1))
+        data = cursor.fetchall()
+        conn.close()
+
+        rows = {}
+        for row in data:
+            flow_id = row[0]
+            if flow_id not in rows:
+                flow = ModelFlow(*row[:FLOW_COLUMNS])
+
+                # Converter strings JSON from interval, list_names_tasks and running_process to dicts
+                flow.interval = json.loads(flow.interval) if flow.interval else None
+                flow.list_names_tasks = json.loads(flow.list_names_tasks) if flow.list_names_tasks else None
+                flow.running_process = json.loads(flow.running_process) if flow.running_process else None
+
+                rows[flow_id] = ModelFlowDashboard(
+                    flow=flow, profiling=bool(row[FLOW_COLUMNS]), fingerprint=row[:FLOW_COLUMNS + 3])
+
+            if row[FLOW_COLUMNS + 3] is None: # Flow never executed
+                continue
+            log_flow = ModelLogExecutionFlow(*row[FLOW_COLUMNS + 3:])
+
+            # Converter strings JSON from ids_task and ids_error_task to lists
+            log_flow.ids_task = json.loads(log_flow.ids_task) if log_flow.ids_task else None
+            log_flow.ids_error_task = json.loads(log_flow.ids_error_task) if log_flow.ids_error_task else None
+
+            rows[flow_id].log_flows.append(log_flow)
+
+        return list(rows.values())
+
+    @staticmethod
+    def get_fingerprints(flow_ids: list = None):
+        '''
+        Retrieves a summary of each flow that changes whenever its dashboard row does: the
+        flow's own columns, a pending profile, its last execution and its unfinished ones.
+        It is read from the indexes of the executions, much cheaper than `get_all`.
+
+        Parameters:
+            - flow_ids (list): Only these flows, when given.
+
+        Returns:
+            dict: The fingerprint of each flow, by flow ID.
+        '''
+        where, parameters = '', ()
+        if flow_ids is not None:
+            where = f"WHERE f.id IN ({', '.join('?' * len(flow_ids))})"
+            parameters = tuple(flow_ids)
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {FINGERPRINT_COLUMNS}
+            FROM TB_Flow f
+            {where}
+        ''', parameters)
+        data = cursor.fetchall()
+        conn.close()
+
+        return {row[0]: row for row in data}
+
+    @staticmethod
+    def get_counts():
+        '''
+        Retrieves the number of flows, and of flows with each status of `STATUSES`, from their indexes.
+
+        Returns:
+            dict: The number of flows ('all') and of flows with each status, by status.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT COUNT(*), {', '.join(f'IFNULL(SUM({condition}), 0)' for condition in STATUSES.values())}
+            FROM TB_Flow f
+        ''')
+        data = cursor.fetchone()
+        conn.close()
+
+        return dict(zip(('all', *STATUSES), data))
@@ -0,0 +1,30 @@
+import threading
+from fluxo.fluxo_core.database.db import connect
+
+
+class DataVersion:
+    '''
+    Tells when other connections (the schedulers, the workers, the handlers of the server)
+    committed to the database, with `PRAGMA data_version` read on one persistent connection
+    of the process. The value changes on every commit of another connection, and reading it
+    costs no table access, so it can be polled often.
+
+    Methods:
+        - get(): The current data version.
+    '''
+    _conn = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get():
+        '''
+        Returns the current data version. Compare two values to know if the database changed between them.
+
+        Returns:
+            int: The data version.
+        '''
+        with DataVersion._lock:
+            if DataVersion._conn is None:
+                # Never writes, so every commit seen comes from another connection
+                DataVersion._conn = connect(check_same_thread=False)
+            return DataVersion._conn.execute('PRAGMA data_version').fetchone()[0]
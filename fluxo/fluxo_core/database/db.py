@@ -1,7 +1,132 @@
 import os
+import re
+import time
 import sqlite3
+import threading
 from fluxo.settings import Db
 from fluxo.logging import logger
+from fluxo.settings import Tracing, Metrics
+from fluxo.fluxo_core.tracing import Tracer
+from fluxo.fluxo_core.metrics import DB_STATEMENT_DURATION
+
+
+# Columns appended to the original tables with `ALTER TABLE`, in the order they were
+# introduced, so `SELECT *` rows keep matching the model dataclasses
+ADDED_COLUMNS = {
+    'TB_Task': [
+        ('wall_time', 'REAL'), # seconds
+        ('cpu_time', 'REAL'), # seconds of process CPU
+        ('thread_cpu_time', 'REAL'), # seconds of thread CPU
+        ('peak_rss_delta', 'INTEGER'), # bytes
+        ('read_bytes', 'INTEGER'),
+        ('write_bytes', 'INTEGER'),
+        ('profile_path', 'TEXT'),
+        ('log_flow_id', 'INTEGER'), # The 'TB_LogExecutionFlow' execution the task ran in
+        ('error_size', 'INTEGER'), # characters of 'error'
+    ],
+    'TB_LogExecutionFlow': [
+        ('worker', 'TEXT'), # '<host>:<pid>' of the process running the execution
+    ],
+    'TB_FlowSchedule': [
+        ('first_planned_fire', 'DATETIME'), # The first fire of the job, set when it is scheduled
+    ],
+}
+
+
+# The connection kept open by `keep_connection` for the current thread
+_thread = threading.local()
+
+
+def connect(path_db: str = None, **kwargs):
+    '''
+    Opens a connection to the SQLite database. When tracing or metrics are enabled,
+    each statement executed through the connection is recorded as a child span of the
+    active span and its latency is added to `fluxo_db_statement_duration_seconds`.
+    In a thread that called `keep_connection`, its connection is returned instead.
+
+    Parameters:
+    - path_db (str): The path to the database file. Defaults to `Db.PATH`.
+    - kwargs: Other arguments of `sqlite3.connect`, e.g. `check_same_thread`.
+
+    Returns:
+        sqlite3.Connection: The database connection.
+    '''
+    kept = getattr(_thread, 'connection', None)
+    if kept is not None and path_db is None and not kwargs:
+        return kept
+    if Tracing.ENABLED or Metrics.ENABLED:
+        return sqlite3.connect(path_db or Db.PATH, factory=_InstrumentedConnection, **kwargs)
+    return sqlite3.connect(path_db or Db.PATH, **kwargs)
+
+
+def keep_connection(read_only: bool = True):
+    '''
+    Opens a connection that `connect` returns in the current thread from now on, so the
+    models reuse it instead of opening one per call. Closing it only ends its transaction.
+
+    Parameters:
+    - read_only (bool): Opens the database read only, so a write by mistake fails.
+    '''
+    path_db = f'file:{Db.PATH}?mode=ro' if read_only else Db.PATH
+    if Tracing.ENABLED or Metrics.ENABLED:
+        conn = sqlite3.connect(path_db, uri=read_only, factory=_InstrumentedConnection)
+    else:
+        conn = sqlite3.connect(path_db, uri=read_only)
+    _thread.connection = _KeptConnection(conn)
+
+
+class _KeptConnection:
+    '''
+    A connection kept open for a thread. `close` ends the open transaction, so the next
+    statement reads the latest data, and everything else goes to the connection.
+    '''
+    def __init__(self, conn: sqlite3.Connection):
+        object.__setattr__(self, '_conn', conn)
+
+    def close(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+
+def _statement_operation(sql: str):
+    '''
+    Returns a low cardinality name for a statement, e.g. 'SELECT TB_Task'.
+    '''
+    verb = sql.split(None, 1)[0].upper() if sql.strip() else ''
+    table = re.search(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+(\w+)', sql, re.IGNORECASE)
+    return f'{verb} {table.group(1)}' if table else verb
+
+
+class _InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            with Tracer.span('db.execute', statement=' '.join(sql.split())):
+                return super().execute(sql, parameters)
+        finally:
+            DB_STATEMENT_DURATION.observe(time.perf_counter() - start, _statement_operation(sql))
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            with Tracer.span('db.executemany', statement=' '.join(sql.split())):
+                return super().executemany(sql, seq_of_parameters)
+        finally:
+            DB_STATEMENT_DURATION.observe(time.perf_counter() - start, _statement_operation(sql))
+
+
+class _InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=_InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
 
 
 def _verify_if_db_exists(path_db: str = Db.PATH):
@@ -18,6 +143,8 @@ def _verify_if_db_exists(path_db: str = Db.PATH):
     '''
     if not os.path.exists(path_db):
         create_db(path_db)
+    else:
+        upgrade_db(path_db)
 
 
 def create_db(path_db: str):
@@ -110,3 +237,193 @@ def create_db(path_db: str):
         conn.commit()
         # Closing the database connection
         conn.close()
+
+    upgrade_db(path_db)
+
+
+def upgrade_db(path_db: str):
+    '''
+    Brings an existing SQLite database up to the current schema, creating the tables
+    added after the first release and appending the columns of `ADDED_COLUMNS`
+    when they are missing.
+
+    Parameters:
+    - path_db (str): The path to the SQLite database file.
+
+    Return:
+    None
+    '''
+    conn = sqlite3.connect(path_db)
+    try:
+        # Create TB_Artifact table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_Artifact (
+                id INTEGER PRIMARY KEY,
+                id_log_flow INTEGER,
+                task_name TEXT,
+                storage TEXT, -- 'inline' or 'shared_memory'
+                value BLOB,
+                shm_name TEXT,
+                size INTEGER,
+                metadata TEXT, -- Storing the dict as a JSON string
+                date_of_creation DATETIME
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Artifact_id_log_flow
+            ON TB_Artifact (id_log_flow, task_name)
+        ''')
+
+        # Create TB_ProfileRequest table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_ProfileRequest (
+                id INTEGER PRIMARY KEY,
+                flow_id INTEGER,
+                task_name TEXT, -- NULL profiles all tasks of the flow
+                remaining INTEGER,
+                date_of_creation DATETIME
+            )
+        ''')
+
+        # Create TB_FlowSchedule table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_FlowSchedule (
+                flow_id INTEGER PRIMARY KEY,
+                last_planned_fire DATETIME
+            )
+        ''')
+
+        # Create TB_RunQueue table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_RunQueue (
+                id INTEGER PRIMARY KEY,
+                flow_name TEXT,
+                planned_time DATETIME,
+                catch_up BOOLEAN,
+                priority INTEGER,
+                sort_key REAL,
+                enqueued_at REAL, -- epoch seconds
+                status TEXT, -- 'queued', 'claimed', 'done' or 'failed'
+                node TEXT,
+                lease_until REAL, -- epoch seconds
+                attempts INTEGER,
+                error TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_RunQueue_status
+            ON TB_RunQueue (status, sort_key)
+        ''')
+
+        # Create TB_Leader table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_Leader (
+                name TEXT PRIMARY KEY,
+                holder TEXT, -- '<host>:<pid>'
+                lease_until REAL, -- epoch seconds
+                acquired_at REAL -- epoch seconds
+            )
+        ''')
+
+        # Create TB_Heartbeat table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_Heartbeat (
+                worker TEXT PRIMARY KEY, -- '<host>:<pid>'
+                host TEXT,
+                pid INTEGER,
+                flow_name TEXT, -- The flow being run, if any
+                last_beat REAL, -- epoch seconds
+                started_at REAL -- epoch seconds
+            )
+        ''')
+
+        # Create TB_FlowTag table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_FlowTag (
+                flow_id INTEGER,
+                tag TEXT,
+                PRIMARY KEY (tag, flow_id)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_FlowTag_flow_id
+            ON TB_FlowTag (flow_id)
+        ''')
+
+        # Create TB_Rollup and TB_RollupSketch tables
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_Rollup (
+                flow_name TEXT,
+                task_name TEXT, -- '' for the executions of the whole flow
+                period TEXT, -- 'hour' or 'day'
+                start DATETIME,
+                count INTEGER,
+                errors INTEGER,
+                total_duration REAL, -- seconds
+                min_duration REAL, -- seconds
+                max_duration REAL, -- seconds
+                PRIMARY KEY (flow_name, task_name, period, start)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Rollup_period_start
+            ON TB_Rollup (period, start)
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS TB_RollupSketch (
+                flow_name TEXT,
+                task_name TEXT,
+                period TEXT,
+                start DATETIME,
+                bucket INTEGER, -- DDSketch bucket of the durations
+                count INTEGER,
+                PRIMARY KEY (flow_name, task_name, period, start, bucket)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_RollupSketch_period_start
+            ON TB_RollupSketch (period, start)
+        ''')
+
+        for table, columns in ADDED_COLUMNS.items():
+            existing_columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+            for name, type_column in columns:
+                if name not in existing_columns:
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {type_column}')
+                    logger.info(f'Column {name} added to {table}')
+
+        # The last executions of each flow, read by the dashboard
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_LogExecutionFlow_id_flow
+            ON TB_LogExecutionFlow (id_flow, id)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_LogExecutionFlow_unfinished
+            ON TB_LogExecutionFlow (id_flow) WHERE end_time IS NULL
+        ''')
+
+        # The tasks of an execution, read by the flow execution page
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Task_log_flow_id
+            ON TB_Task (log_flow_id)
+        ''')
+
+        # The history of the tasks of a flow, read by the API
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Task_flow_id
+            ON TB_Task (flow_id, id)
+        ''')
+
+        # The searches and sorts of the flows page
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Flow_name
+            ON TB_Flow (name COLLATE NOCASE)
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS IX_Flow_running
+            ON TB_Flow (running, name COLLATE NOCASE)
+        ''')
+        conn.commit()
+    finally:
+        conn.close()
+
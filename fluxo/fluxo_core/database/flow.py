@@ -1,8 +1,7 @@
-import sqlite3
 import json
 from datetime import datetime
 from dataclasses import dataclass
-from fluxo.settings import Db
+from fluxo.fluxo_core.database.db import connect
 from fluxo.uttils import current_time_formatted
 
 
@@ -49,7 +48,7 @@ class ModelFlow:
         list_names_tasks = json.dumps(self.list_names_tasks) if self.list_names_tasks else None
         running_process = json.dumps(self.running_process) if self.running_process else None
 
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO TB_Flow (name, date_of_creation, interval, active, list_names_tasks, running, running_process)
@@ -85,7 +84,7 @@ class ModelFlow:
         list_names_tasks = json.dumps(list_names_tasks) if list_names_tasks else None
         running_process = json.dumps(running_process) if running_process else None
 
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE TB_Flow
@@ -103,7 +102,7 @@ class ModelFlow:
         Returns:
         List[ModelFlow]: A list containing all 'Flow' instances in the database.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Flow')
         data = cursor.fetchall()
@@ -136,7 +135,7 @@ class ModelFlow:
         Returns:
             Flow or None: The 'Flow' instance if found, or None if not found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Flow WHERE name=?', (name,))
         data = cursor.fetchone()
@@ -165,7 +164,7 @@ class ModelFlow:
         Returns:
             Flow or None: The 'Flow' instance if found, or None if not found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Flow WHERE id=?', (id,))
         data = cursor.fetchone()
@@ -191,7 +190,7 @@ class ModelFlow:
         Parameters:
             - id (int): The ID of the 'Flow' to be deleted.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM TB_Flow WHERE id=?', (id,))
         conn.commit()
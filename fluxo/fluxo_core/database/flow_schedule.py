@@ -0,0 +1,149 @@
+import json
+from datetime import datetime
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.uttils import convert_str_to_datetime, convert_datetime_to_str
+
+
+@dataclass
+class ModelFlowSchedule:
+    '''
+    Represents the scheduling state of a flow, with attributes corresponding to the
+    columns in the 'TB_FlowSchedule' table in the SQLite database.
+
+    Attributes:
+        - flow_id (int): The ID of the 'Flow'.
+        - last_planned_fire (datetime): The planned time of the last scheduled execution.
+        - first_planned_fire (datetime): The planned time of the first execution of the job, set when it is scheduled.
+
+    Methods:
+        - get_by_flow_id(flow_id): Retrieves the scheduling state of a flow.
+        - save_last_planned_fire(flow_id, planned_fire): Stores the planned time of the last execution.
+        - save_first_planned_fire(flow_id, planned_fire): Stores the planned time of the first execution of the job.
+        - get_all_scheduled(): Retrieves every scheduled flow with the planned times of its last and first executions.
+        - delete(flow_id): Forgets the scheduling state of a flow.
+    '''
+    flow_id: int = None
+    last_planned_fire: datetime = None
+    first_planned_fire: datetime = None
+
+    @staticmethod
+    def get_by_flow_id(flow_id):
+        '''
+        Retrieves the scheduling state of a flow.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+
+        Returns:
+            ModelFlowSchedule or None: The scheduling state, or None if the flow was never scheduled.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_FlowSchedule WHERE flow_id=?', (flow_id,))
+        data = cursor.fetchone()
+        conn.close()
+
+        if data:
+            flow_schedule = ModelFlowSchedule(*data)
+            flow_schedule.last_planned_fire = convert_str_to_datetime(flow_schedule.last_planned_fire)
+            flow_schedule.first_planned_fire = convert_str_to_datetime(flow_schedule.first_planned_fire)
+            return flow_schedule
+        else:
+            return None
+
+    @staticmethod
+    def save_last_planned_fire(flow_id, planned_fire: datetime):
+        '''
+        Stores the planned time of the last scheduled execution of a flow.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+            - planned_fire (datetime): The planned time of the execution.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_FlowSchedule (flow_id, last_planned_fire) VALUES (?, ?)
+            ON CONFLICT (flow_id) DO UPDATE SET last_planned_fire=excluded.last_planned_fire
+        ''', (flow_id, convert_datetime_to_str(planned_fire)))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def save_first_planned_fire(flow_id, planned_fire: datetime):
+        '''
+        Stores the planned time of the first execution of a flow's job when it is scheduled, so its
+        next executions can be projected on the grid of the job before it fires. The last planned
+        fire is left as is, it still counts the executions missed before.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+            - planned_fire (datetime): The planned time of the first execution.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_FlowSchedule (flow_id, first_planned_fire) VALUES (?, ?)
+            ON CONFLICT (flow_id) DO UPDATE SET first_planned_fire=excluded.first_planned_fire
+        ''', (flow_id, convert_datetime_to_str(planned_fire)))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_all_scheduled():
+        '''
+        Retrieves every scheduled flow (turned on) with the planned times of its last and first executions, in one query.
+
+        Returns:
+            List[Tuple[ModelFlow, datetime, datetime]]: The flows, their last planned fire and the first planned fire
+                of their job, None if unknown.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT f.*, s.last_planned_fire, s.first_planned_fire
+            FROM TB_Flow f
+            LEFT JOIN TB_FlowSchedule s ON s.flow_id=f.id
+            WHERE f.running = 1
+        ''')
+        data = cursor.fetchall()
+        conn.close()
+
+        flows = []
+        for row in data:
+            flow = ModelFlow(*row[:-2])
+
+            # Converter strings JSON from interval, list_names_tasks and running_process to dicts
+            flow.interval = json.loads(flow.interval) if flow.interval else None
+            flow.list_names_tasks = json.loads(flow.list_names_tasks) if flow.list_names_tasks else None
+            flow.running_process = json.loads(flow.running_process) if flow.running_process else None
+
+            flows.append((flow, convert_str_to_datetime(row[-2]), convert_str_to_datetime(row[-1])))
+
+        return flows
+
+    @staticmethod
+    def delete(flow_id):
+        '''
+        Forgets the scheduling state of a flow, so no missed executions are caught up on its next start.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_FlowSchedule WHERE flow_id=?', (flow_id,))
+        conn.commit()
+        conn.close()
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'FlowSchedule' instance.
+        '''
+        return f'''
+            flow_id:                {self.flow_id},
+            last_planned_fire:      {self.last_planned_fire},
+            first_planned_fire:     {self.first_planned_fire},
+        '''
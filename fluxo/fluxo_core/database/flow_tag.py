@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+
+
+@dataclass
+class ModelFlowTag:
+    '''
+    Represents a tag of a flow (`Flow(tags=...)`), with attributes corresponding to the
+    columns in the 'TB_FlowTag' table in the SQLite database, so the flows can be searched by tag.
+
+    Attributes:
+        - flow_id (int): The ID of the 'Flow'.
+        - tag (str): The tag.
+
+    Methods:
+        - set_tags(flow_id, tags): Replaces the tags of a flow.
+        - get_by_flow_id(flow_id): Retrieves the tags of a flow.
+        - delete(flow_id): Deletes the tags of a flow.
+    '''
+    flow_id: int = None
+    tag: str = None
+
+    @staticmethod
+    def set_tags(flow_id, tags: list):
+        '''
+        Replaces the tags of a flow.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+            - tags (list): Its tags.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_FlowTag WHERE flow_id=?', (flow_id,))
+        cursor.executemany(
+            'INSERT OR IGNORE INTO TB_FlowTag (flow_id, tag) VALUES (?, ?)', [(flow_id, tag) for tag in tags or []])
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_by_flow_id(flow_id):
+        '''
+        Retrieves the tags of a flow.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+
+        Returns:
+            List[str]: The tags, in alphabetical order.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT tag FROM TB_FlowTag WHERE flow_id=? ORDER BY tag', (flow_id,))
+        data = cursor.fetchall()
+        conn.close()
+
+        return [row[0] for row in data]
+
+    @staticmethod
+    def delete(flow_id):
+        '''
+        Deletes the tags of a flow.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_FlowTag WHERE flow_id=?', (flow_id,))
+        conn.commit()
+        conn.close()
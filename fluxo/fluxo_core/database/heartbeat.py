@@ -0,0 +1,92 @@
+import time
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+
+
+@dataclass
+class ModelHeartbeat:
+    '''
+    Represents the last sign of life of a process that runs flows, with attributes
+    corresponding to the columns in the 'TB_Heartbeat' table in the SQLite database.
+
+    Attributes:
+        - worker (str): The process, as '<host>:<pid>'.
+        - host (str): The host of the process.
+        - pid (int): The PID of the process.
+        - flow_name (str): The name of the 'Flow' the process is running, if any.
+        - last_beat (float): The epoch time of the last heartbeat.
+        - started_at (float): The epoch time of the first heartbeat.
+
+    Methods:
+        - beat(worker, host, pid, flow_name): Records a heartbeat of a process.
+        - get_all(): Retrieves the heartbeats of all processes.
+        - delete(worker): Forgets a process.
+    '''
+    worker: str = None
+    host: str = None
+    pid: int = None
+    flow_name: str = None
+    last_beat: float = None
+    started_at: float = None
+
+    @staticmethod
+    def beat(worker: str, host: str, pid: int, flow_name: str = None):
+        '''
+        Records a heartbeat of a process.
+
+        Parameters:
+            - worker (str): The process, as '<host>:<pid>'.
+            - host (str): The host of the process.
+            - pid (int): The PID of the process.
+            - flow_name (str): The name of the 'Flow' the process is running, if any.
+        '''
+        now = time.time()
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_Heartbeat (worker, host, pid, flow_name, last_beat, started_at) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (worker) DO UPDATE SET flow_name=excluded.flow_name, last_beat=excluded.last_beat
+        ''', (worker, host, pid, flow_name, now, now))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_all():
+        '''
+        Retrieves the heartbeats of all processes.
+
+        Returns:
+            List[ModelHeartbeat]: The heartbeats.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_Heartbeat')
+        data = cursor.fetchall()
+        conn.close()
+
+        return [ModelHeartbeat(*row) for row in data]
+
+    @staticmethod
+    def delete(worker: str):
+        '''
+        Forgets a process.
+
+        Parameters:
+            - worker (str): The process, as '<host>:<pid>'.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_Heartbeat WHERE worker=?', (worker,))
+        conn.commit()
+        conn.close()
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'Heartbeat' instance.
+        '''
+        return f'''
+            worker:                 {self.worker},
+            flow_name:              {self.flow_name},
+            last_beat:              {self.last_beat},
+            started_at:             {self.started_at},
+        '''
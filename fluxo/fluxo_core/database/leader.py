@@ -0,0 +1,123 @@
+import time
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+
+
+@dataclass
+class ModelLeader:
+    '''
+    Represents the leadership lease of a role (e.g. 'scheduler'), with attributes
+    corresponding to the columns in the 'TB_Leader' table in the SQLite database.
+
+    Attributes:
+        - name (str): The name of the role.
+        - holder (str): The process holding the lease, as '<host>:<pid>'.
+        - lease_until (float): The epoch time the lease expires if not renewed.
+        - acquired_at (float): The epoch time the holder took the lease.
+
+    Methods:
+        - acquire(name, holder, ttl, dead_host): Takes or renews the lease, if it is free.
+        - release(name, holder): Gives up the lease.
+        - get_by_name(name): Retrieves the lease of a role.
+    '''
+    name: str = None
+    holder: str = None
+    lease_until: float = None
+    acquired_at: float = None
+
+    @staticmethod
+    def acquire(name: str, holder: str, ttl: float, dead_host: str = None):
+        '''
+        Takes the lease of a role if nobody holds it or it expired, or renews it if `holder` holds it.
+
+        Parameters:
+            - name (str): The name of the role.
+            - holder (str): The process taking the lease, as '<host>:<pid>'.
+            - ttl (float): Seconds the lease lasts from now.
+            - dead_host (str): A host whose holders are known to be dead, so their lease is
+                taken before it expires (the caller holds the lock file of the host).
+
+        Returns:
+            tuple: (bool, str) True if `holder` holds the lease, and the previous holder when
+                it was taken from another process (None on a renewal or a free lease).
+        '''
+        conn = connect()
+        conn.isolation_level = None # One IMMEDIATE transaction, so two processes never take the lease together
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            cursor.execute('SELECT * FROM TB_Leader WHERE name=?', (name,))
+            data = cursor.fetchone()
+            leader = ModelLeader(*data) if data else None
+
+            if leader and leader.holder == holder:
+                cursor.execute('UPDATE TB_Leader SET lease_until=? WHERE name=?', (now + ttl, name))
+                cursor.execute('COMMIT')
+                return True, None
+
+            if leader and leader.lease_until >= now and leader.holder.rsplit(':', 1)[0] != dead_host:
+                cursor.execute('COMMIT')
+                return False, None
+
+            cursor.execute('''
+                INSERT INTO TB_Leader (name, holder, lease_until, acquired_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    holder=excluded.holder, lease_until=excluded.lease_until, acquired_at=excluded.acquired_at
+            ''', (name, holder, now + ttl, now))
+            cursor.execute('COMMIT')
+            return True, leader.holder if leader else None
+        except BaseException:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def release(name: str, holder: str):
+        '''
+        Gives up the lease of a role, so the next process takes it as a fresh start and not as a takeover.
+
+        Parameters:
+            - name (str): The name of the role.
+            - holder (str): The process holding the lease.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM TB_Leader WHERE name=? AND holder=?', (name, holder))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_by_name(name: str):
+        '''
+        Retrieves the lease of a role.
+
+        Parameters:
+            - name (str): The name of the role.
+
+        Returns:
+            ModelLeader or None: The lease, or None if nobody took it.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_Leader WHERE name=?', (name,))
+        data = cursor.fetchone()
+        conn.close()
+
+        if data:
+            return ModelLeader(*data)
+        else:
+            return None
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'Leader' instance.
+        '''
+        return f'''
+            name:                   {self.name},
+            holder:                 {self.holder},
+            lease_until:            {self.lease_until},
+            acquired_at:            {self.acquired_at},
+        '''
@@ -1,8 +1,7 @@
-import sqlite3
 import json
 from datetime import datetime
 from dataclasses import dataclass
-from fluxo.settings import Db
+from fluxo.fluxo_core.database.db import connect
 from fluxo.uttils import current_time_formatted
 
 
@@ -20,6 +19,7 @@ class ModelLogExecutionFlow:
         id_flow (int, optional): The identifier of the associated flow.
         ids_task (list, optional): A list of task IDs involved in the flow.
         ids_error_task (list, optional): A list of task IDs that encountered errors during execution.
+        worker (str, optional): The process running the flow execution, as '<host>:<pid>'.
 
     Methods:
         save(self): Save the log entry to the database and return the updated LogExecutionFluxo instance.
@@ -31,6 +31,8 @@ class ModelLogExecutionFlow:
         get_by_idflow_and_endtime_is_none(cls, id_flow): Retrieve a log entry for a specific fluxo
             where the end time is not set.
         get_all_by_id_flow(cls, id_flow): Retrieve all log entries for a specific flow from the database.
+        get_all_endtime_is_none(cls): Retrieve the log entries of all executions not finished.
+        get_page(cls, id_flow, unfinished, after, limit): Retrieve the log entries after a cursor, oldest first.
         delete(cls, id): Delete a log entry by its unique identifier from the database.
     '''
     id: int = None
@@ -41,18 +43,19 @@ class ModelLogExecutionFlow:
     id_flow: int = None
     ids_task: list = None
     ids_error_task: list = None
+    worker: str = None
 
     def save(self):
         date_of_creation = current_time_formatted()
         ids_task = json.dumps(self.ids_task) if self.ids_task else None
         ids_error_task = json.dumps(self.ids_error_task) if self.ids_error_task else None
 
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO TB_LogExecutionFlow (name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (self.name, date_of_creation, self.start_time, self.end_time, self.id_flow, ids_task, ids_error_task))
+            INSERT INTO TB_LogExecutionFlow (name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task, worker)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (self.name, date_of_creation, self.start_time, self.end_time, self.id_flow, ids_task, ids_error_task, self.worker))
         conn.commit()
 
         cursor.execute('SELECT last_insert_rowid()')
@@ -63,17 +66,17 @@ class ModelLogExecutionFlow:
         return ModelLogExecutionFlow.get_by_id(id_log_execution_flow)
 
     @staticmethod
-    def update(id, name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task):
+    def update(id, name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task, worker=None):
         ids_task = json.dumps(ids_task) if ids_task else None
         ids_error_task = json.dumps(ids_error_task) if ids_error_task else None
 
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE TB_LogExecutionFlow
-            SET name=?, date_of_creation=?, start_time=?, end_time=?, id_flow=?, ids_task=?, ids_error_task=?
+            SET name=?, date_of_creation=?, start_time=?, end_time=?, id_flow=?, ids_task=?, ids_error_task=?, worker=?
             WHERE id=?
-        ''', (name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task, id))
+        ''', (name, date_of_creation, start_time, end_time, id_flow, ids_task, ids_error_task, worker, id))
         conn.commit()
 
         conn.close()
@@ -82,7 +85,7 @@ class ModelLogExecutionFlow:
 
     @staticmethod
     def get_all():
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_LogExecutionFlow')
         data = cursor.fetchall()
@@ -105,7 +108,7 @@ class ModelLogExecutionFlow:
 
     @staticmethod
     def get_by_name(name):
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_LogExecutionFlow WHERE name=?', (name,))
         data = cursor.fetchone()
@@ -124,7 +127,7 @@ class ModelLogExecutionFlow:
 
     @staticmethod
     def get_by_id(id):
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_LogExecutionFlow WHERE id=?', (id,))
         data = cursor.fetchone()
@@ -143,7 +146,7 @@ class ModelLogExecutionFlow:
         
     @staticmethod
     def get_by_idflow_and_endtime_is_none(id_flow):
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_LogExecutionFlow WHERE id_flow=? AND end_time IS NULL', (id_flow,))
         data = cursor.fetchone()
@@ -162,7 +165,7 @@ class ModelLogExecutionFlow:
 
     @staticmethod
     def get_all_by_id_flow(id_flow):
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_LogExecutionFlow WHERE id_flow=?', (id_flow,))
         data = cursor.fetchall()
@@ -183,9 +186,74 @@ class ModelLogExecutionFlow:
         else:
             return None
 
+    @staticmethod
+    def get_all_endtime_is_none():
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_LogExecutionFlow WHERE end_time IS NULL')
+        data = cursor.fetchall()
+        conn.close()
+
+        log_flows = []
+        for row in data:
+            log_flow = ModelLogExecutionFlow(*row)
+
+            # Converter strings JSON from ids_task and ids_error_task to lists
+            log_flow.ids_task = json.loads(log_flow.ids_task) if log_flow.ids_task else None
+            log_flow.ids_error_task = json.loads(log_flow.ids_error_task) if log_flow.ids_error_task else None
+
+            log_flows.append(log_flow)
+
+        return log_flows
+
+    @staticmethod
+    def get_page(id_flow=None, unfinished: bool = False, after: int = None, limit: int = 100):
+        '''
+        Retrieves the executions created after a cursor, oldest first, from the primary key or the
+        indexes of the executions of a flow and of the unfinished ones, so a client can read the
+        whole history a page at a time and then only the new executions.
+
+        Parameters:
+            - id_flow (int): Only the executions of this flow.
+            - unfinished (bool): Only the executions not finished.
+            - after (int): The cursor, the ID of the last execution read.
+            - limit (int): The number of executions.
+
+        Returns:
+            List[ModelLogExecutionFlow]: The executions. Fewer than `limit` on the last page.
+        '''
+        conditions, parameters = ['id > ?'], [after or 0]
+        if id_flow is not None:
+            conditions.append('id_flow=?')
+            parameters.append(id_flow)
+        if unfinished:
+            conditions.append('end_time IS NULL')
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT * FROM TB_LogExecutionFlow
+            WHERE {' AND '.join(conditions)}
+            ORDER BY id LIMIT ?
+        ''', (*parameters, limit))
+        data = cursor.fetchall()
+        conn.close()
+
+        log_flows = []
+        for row in data:
+            log_flow = ModelLogExecutionFlow(*row)
+
+            # Converter strings JSON from ids_task and ids_error_task to lists
+            log_flow.ids_task = json.loads(log_flow.ids_task) if log_flow.ids_task else None
+            log_flow.ids_error_task = json.loads(log_flow.ids_error_task) if log_flow.ids_error_task else None
+
+            log_flows.append(log_flow)
+
+        return log_flows
+
     @staticmethod
     def delete(id):
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM TB_LogExecutionFlow WHERE id=?', (id,))
         conn.commit()
@@ -0,0 +1,115 @@
+from datetime import datetime
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+from fluxo.uttils import current_time_formatted
+
+
+@dataclass
+class ModelProfileRequest:
+    '''
+    Represents a request to profile the next invocations of a flow or task, with attributes
+    corresponding to the columns in the 'TB_ProfileRequest' table in the SQLite database.
+
+    Attributes:
+        - id (int): The unique identifier for the request.
+        - flow_id (int): The ID of the 'Flow' to be profiled.
+        - task_name (str): The name of the task to be profiled. None profiles all tasks of the flow.
+        - remaining (int): How many invocations are still to be profiled.
+        - date_of_creation (datetime): The date and time when the request was created.
+
+    Methods:
+        - save(): Saves the current request to the 'TB_ProfileRequest' table in the database.
+        - consume(flow_id, task_name): Uses one invocation of a matching request, if any.
+        - get_all_active_by_flow_id(flow_id): Retrieves the requests of a flow with invocations remaining.
+    '''
+    id: int = None
+    flow_id: int = None
+    task_name: str = None
+    remaining: int = None
+    date_of_creation: datetime = None
+
+    def save(self):
+        '''
+        Saves the current request to the 'TB_ProfileRequest' table in the database.
+        '''
+        date_of_creation = current_time_formatted()
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_ProfileRequest (flow_id, task_name, remaining, date_of_creation)
+            VALUES (?, ?, ?, ?)
+        ''', (self.flow_id, self.task_name, self.remaining, date_of_creation))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def consume(flow_id, task_name):
+        '''
+        Uses one invocation of the request that matches the task (or, failing that, its flow).
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow' of the task.
+            - task_name (str): The name of the task about to be invoked.
+
+        Returns:
+            bool: True if the invocation must be profiled.
+        '''
+        matching = '''
+            SELECT id FROM TB_ProfileRequest
+            WHERE flow_id=? AND (task_name=? OR task_name IS NULL) AND remaining > 0
+            ORDER BY task_name IS NULL, id
+            LIMIT 1
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        # A read first, so the invocations without a request (almost all) take no write lock
+        cursor.execute(matching, (flow_id, task_name))
+        if cursor.fetchone() is None:
+            conn.close()
+            return False
+
+        cursor.execute(f'''
+            UPDATE TB_ProfileRequest
+            SET remaining = remaining - 1
+            WHERE id = ({matching})
+        ''', (flow_id, task_name))
+        consumed = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+
+        return consumed
+
+    @staticmethod
+    def get_all_active_by_flow_id(flow_id):
+        '''
+        Retrieves the requests of a flow that still have invocations to profile.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow'.
+
+        Returns:
+            List[ModelProfileRequest] or None: The active requests, or None if there are none.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM TB_ProfileRequest WHERE flow_id=? AND remaining > 0', (flow_id,))
+        data = cursor.fetchall()
+        conn.close()
+
+        if data:
+            return [ModelProfileRequest(*row) for row in data]
+        else:
+            return None
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'ProfileRequest' instance.
+        '''
+        return f'''
+            id:                     {self.id},
+            flow_id:                {self.flow_id},
+            task_name:              {self.task_name},
+            remaining:              {self.remaining},
+            date_of_creation:       {self.date_of_creation},
+        '''
@@ -0,0 +1,179 @@
+from datetime import datetime
+from dataclasses import dataclass, field
+from fluxo.fluxo_core.database.db import connect
+from fluxo.fluxo_core.sketch import DDSketch
+
+
+# The start of the hour and of the day of a time, the periods of the rollups
+PERIODS = {
+    'hour': '%Y/%m/%d %H:00:00',
+    'day': '%Y/%m/%d 00:00:00',
+}
+
+
+@dataclass
+class ModelRollup:
+    '''
+    Represents the executions of a task, or of a whole flow, finished in an hour or a day, with
+    attributes corresponding to the columns in the 'TB_Rollup' table in the SQLite database and the
+    buckets of their durations ('TB_RollupSketch', see `DDSketch`). The rollups are updated as the
+    executions finish, so the trends are read from them instead of from 'TB_Task'.
+
+    Attributes:
+        - flow_name (str): The name of the 'Flow'.
+        - task_name (str): The name of the 'Task', '' for the executions of the whole flow.
+        - period (str): 'hour' or 'day'.
+        - start (str): The start of the hour or of the day, None for the sum of several.
+        - count (int): The number of executions.
+        - errors (int): The number of executions that failed.
+        - total_duration (float): The sum of their durations, in seconds.
+        - min_duration (float): The shortest duration, in seconds.
+        - max_duration (float): The longest duration, in seconds.
+        - sketch (dict): The number of durations of each bucket of `DDSketch`, by bucket.
+
+    Methods:
+        - add(flow_name, task_name, finished_at, duration, error): Counts an execution in its hour and its day.
+        - get_trend(flow_name, task_name, period, start, end): Retrieves the rollups of a task or a flow, by hour or day.
+        - get_summary(period, start, end): Retrieves the sum of the rollups of each task and flow between two times.
+        - quantiles(qs): The estimates of some quantiles of the durations.
+    '''
+    flow_name: str = None
+    task_name: str = None
+    period: str = None
+    start: str = None
+    count: int = 0
+    errors: int = 0
+    total_duration: float = 0.0
+    min_duration: float = None
+    max_duration: float = None
+    sketch: dict = field(default_factory=dict)
+
+    @staticmethod
+    def add(flow_name: str, task_name: str, finished_at: datetime, duration: float, error: bool):
+        '''
+        Counts an execution in the rollups of its hour and of its day, in one transaction.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow'.
+            - task_name (str): The name of the 'Task', '' for an execution of the whole flow.
+            - finished_at (datetime): When the execution finished.
+            - duration (float): The duration of the execution, in seconds.
+            - error (bool): If the execution failed.
+        '''
+        bucket = DDSketch.bucket(duration)
+        conn = connect()
+        cursor = conn.cursor()
+        for period, format_start in PERIODS.items():
+            start = finished_at.strftime(format_start)
+            cursor.execute('''
+                INSERT INTO TB_Rollup (flow_name, task_name, period, start, count, errors,
+                    total_duration, min_duration, max_duration)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+                ON CONFLICT (flow_name, task_name, period, start) DO UPDATE SET
+                    count=count + 1,
+                    errors=errors + excluded.errors,
+                    total_duration=total_duration + excluded.total_duration,
+                    min_duration=MIN(min_duration, excluded.min_duration),
+                    max_duration=MAX(max_duration, excluded.max_duration)
+            ''', (flow_name, task_name, period, start, int(error), duration, duration, duration))
+            cursor.execute('''
+                INSERT INTO TB_RollupSketch (flow_name, task_name, period, start, bucket, count)
+                VALUES (?, ?, ?, ?, ?, 1)
+                ON CONFLICT (flow_name, task_name, period, start, bucket) DO UPDATE SET count=count + 1
+            ''', (flow_name, task_name, period, start, bucket))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def get_trend(flow_name: str, task_name: str = '', period: str = 'hour', start: str = None, end: str = None):
+        '''
+        Retrieves the rollups of a task, or of a whole flow, by hour or by day.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow'.
+            - task_name (str): The name of the 'Task', '' for the executions of the whole flow.
+            - period (str): 'hour' or 'day'.
+            - start (str): From this hour or day, included.
+            - end (str): Until this hour or day, excluded.
+
+        Returns:
+            List[ModelRollup]: The rollups, oldest first. The hours or days without executions are missing.
+        '''
+        if period not in PERIODS:
+            raise ValueError(f'Period must be one of {", ".join(PERIODS)}.')
+
+        where = 'WHERE flow_name=? AND task_name=? AND period=? AND start >= ? AND start < ?'
+        parameters = (flow_name, task_name, period, start or '', end or '\U0010FFFF')
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN') # The rollups and their sketches from the same snapshot
+        cursor.execute(f'''
+            SELECT flow_name, task_name, period, start, count, errors, total_duration, min_duration, max_duration
+            FROM TB_Rollup {where} ORDER BY start
+        ''', parameters)
+        rollups = {row[3]: ModelRollup(*row) for row in cursor.fetchall()}
+        cursor.execute(f'SELECT start, bucket, count FROM TB_RollupSketch {where}', parameters)
+        for row_start, bucket, count in cursor.fetchall():
+            rollups[row_start].sketch[bucket] = count
+        conn.close()
+
+        return list(rollups.values())
+
+    @staticmethod
+    def get_summary(period: str = 'day', start: str = None, end: str = None):
+        '''
+        Retrieves the sum of the rollups of each task and of each flow between two times, with
+        their sketches merged. Read from the rollups of the hours or of the days, so a long range
+        is cheaper with 'day'.
+
+        Parameters:
+            - period (str): 'hour' or 'day'.
+            - start (str): From this hour or day, included.
+            - end (str): Until this hour or day, excluded.
+
+        Returns:
+            List[ModelRollup]: The sums, by flow and task name, with `start` None.
+        '''
+        if period not in PERIODS:
+            raise ValueError(f'Period must be one of {", ".join(PERIODS)}.')
+
+        where = 'WHERE period=? AND start >= ? AND start < ?'
+        parameters = (period, start or '', end or '\U0010FFFF')
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN') # The rollups and their sketches from the same snapshot
+        cursor.execute(f'''
+            SELECT flow_name, task_name, period, NULL, SUM(count), SUM(errors), SUM(total_duration),
+                MIN(min_duration), MAX(max_duration)
+            FROM TB_Rollup {where}
+            GROUP BY flow_name, task_name
+            ORDER BY flow_name, task_name
+        ''', parameters)
+        rollups = {(row[0], row[1]): ModelRollup(*row) for row in cursor.fetchall()}
+        cursor.execute(f'''
+            SELECT flow_name, task_name, bucket, SUM(count)
+            FROM TB_RollupSketch {where}
+            GROUP BY flow_name, task_name, bucket
+        ''', parameters)
+        for flow_name, task_name, bucket, count in cursor.fetchall():
+            rollups[flow_name, task_name].sketch[bucket] = count
+        conn.close()
+
+        return list(rollups.values())
+
+    def quantiles(self, qs: tuple = (0.5, 0.95, 0.99)):
+        '''
+        Returns the estimates of some quantiles of the durations, within the shortest and the longest.
+
+        Parameters:
+            - qs (tuple): The quantiles, between 0 and 1.
+
+        Returns:
+            List[float]: The duration of each quantile, in seconds.
+        '''
+        values = DDSketch.quantiles(self.sketch, qs)
+        if self.min_duration is None:
+            return values
+        return [min(max(value, self.min_duration), self.max_duration) for value in values]
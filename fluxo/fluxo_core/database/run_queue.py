@@ -0,0 +1,263 @@
+import time
+from datetime import datetime
+from dataclasses import dataclass
+from fluxo.fluxo_core.database.db import connect
+
+
+@dataclass
+class ModelRunQueue:
+    '''
+    Represents a flow execution queued by the dispatcher for the worker nodes, with attributes
+    corresponding to the columns in the 'TB_RunQueue' table in the SQLite database.
+
+    A node claims an execution by taking a lease on it, and renews the lease while the
+    execution runs. An execution whose lease expired (its node died) is claimed again by
+    another node, up to `max_attempts` times.
+
+    Attributes:
+        - id (int): The unique identifier for the execution.
+        - flow_name (str): The name of the 'Flow' to run.
+        - planned_time (datetime): The planned time of the execution.
+        - catch_up (bool): If True it is a missed execution being caught up.
+        - priority (int): The priority of the 'Flow'.
+        - sort_key (float): The priority aged from the enqueue time, the highest is claimed first.
+        - enqueued_at (float): The epoch time the execution was queued.
+        - status (str): 'queued', 'claimed', 'done' or 'failed'.
+        - node (str): The node that claimed the execution.
+        - lease_until (float): The epoch time the lease of the node expires.
+        - attempts (int): How many times the execution was claimed.
+        - error (str): The error of a failed execution.
+        - expired_node (str): Not a column. The node whose lease expired, when `claim` takes the
+                execution again, so the execution it left open can be closed.
+
+    Methods:
+        - enqueue(flow_name, planned_time, catch_up, priority, sort_key): Queues an execution.
+        - claim(node, ttl, max_attempts): Takes a lease on the next execution.
+        - renew(id, node, ttl): Extends the lease of a claimed execution.
+        - finish(id, node, error): Marks a claimed execution as done or failed.
+        - pop_finished(): Retrieves and deletes the finished executions.
+        - get_all_unfinished(): Retrieves the queued and claimed executions.
+        - delete_queued(): Deletes the executions not claimed yet.
+        - count_queued_by_priority(): Counts the queued executions by priority.
+    '''
+    id: int = None
+    flow_name: str = None
+    planned_time: datetime = None
+    catch_up: bool = False
+    priority: int = 0
+    sort_key: float = None
+    enqueued_at: float = None
+    status: str = None
+    node: str = None
+    lease_until: float = None
+    attempts: int = 0
+    error: str = None
+    expired_node: str = None
+
+    @staticmethod
+    def enqueue(flow_name: str, planned_time: datetime, catch_up: bool, priority: int, sort_key: float):
+        '''
+        Queues a flow execution for the worker nodes.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow'.
+            - planned_time (datetime): The planned time of the execution.
+            - catch_up (bool): If True it is a missed execution being caught up.
+            - priority (int): The priority of the 'Flow'.
+            - sort_key (float): The aged priority, the highest is claimed first.
+
+        Returns:
+            int: The ID of the queued execution.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO TB_RunQueue (
+                flow_name, planned_time, catch_up, priority, sort_key, enqueued_at, status, attempts)
+            VALUES (?, ?, ?, ?, ?, ?, 'queued', 0)
+        ''', (flow_name, planned_time.isoformat() if planned_time else None, catch_up, priority, sort_key, time.time()))
+        conn.commit()
+        id = cursor.lastrowid
+        conn.close()
+
+        return id
+
+    @staticmethod
+    def claim(node: str, ttl: float, max_attempts: int):
+        '''
+        Takes a lease on the queued execution with the highest aged priority, or on an
+        execution whose lease expired. Executions that expired `max_attempts` times are failed.
+
+        Parameters:
+            - node (str): The node claiming the execution.
+            - ttl (float): Seconds the lease lasts if not renewed.
+            - max_attempts (int): How many times an execution may be claimed.
+
+        Returns:
+            ModelRunQueue or None: The claimed execution, or None if there is none to run. When its
+                lease expired, `expired_node` is the node that held it.
+        '''
+        conn = connect()
+        conn.isolation_level = None # The claim is one IMMEDIATE transaction, so two nodes never take the same row
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            while True:
+                cursor.execute('''
+                    SELECT * FROM TB_RunQueue
+                    WHERE status='queued' OR (status='claimed' AND lease_until < ?)
+                    ORDER BY status='claimed' DESC, sort_key DESC, id
+                    LIMIT 1
+                ''', (now,))
+                data = cursor.fetchone()
+                if data is None:
+                    cursor.execute('COMMIT')
+                    return None
+
+                run = ModelRunQueue._from_row(data)
+                if run.attempts >= max_attempts:
+                    cursor.execute('''
+                        UPDATE TB_RunQueue SET status='failed', error=? WHERE id=?
+                    ''', (f'Lease of node {run.node} expired {run.attempts} time(s)', run.id))
+                    continue
+
+                cursor.execute('''
+                    UPDATE TB_RunQueue SET status='claimed', node=?, lease_until=?, attempts=attempts + 1
+                    WHERE id=?
+                ''', (node, now + ttl, run.id))
+                cursor.execute('COMMIT')
+
+                if run.status == 'claimed':
+                    run.expired_node = run.node
+                run.status, run.node, run.lease_until, run.attempts = 'claimed', node, now + ttl, run.attempts + 1
+                return run
+        except BaseException:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def renew(id, node: str, ttl: float):
+        '''
+        Extends the lease of a claimed execution.
+
+        Parameters:
+            - id (int): The ID of the execution.
+            - node (str): The node holding the lease.
+            - ttl (float): Seconds the lease lasts from now.
+
+        Returns:
+            bool: False if the node lost the lease (it expired and another node claimed the execution).
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE TB_RunQueue SET lease_until=? WHERE id=? AND node=? AND status='claimed'
+        ''', (time.time() + ttl, id, node))
+        renewed = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+
+        return renewed
+
+    @staticmethod
+    def finish(id, node: str, error: str = None):
+        '''
+        Marks a claimed execution as done, or as failed if there is an error.
+
+        Parameters:
+            - id (int): The ID of the execution.
+            - node (str): The node holding the lease.
+            - error (str): The error of the execution, if it failed.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE TB_RunQueue SET status=?, error=? WHERE id=? AND node=? AND status='claimed'
+        ''', ('failed' if error else 'done', error, id, node))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def pop_finished():
+        '''
+        Retrieves and deletes the executions that are done or failed.
+
+        Returns:
+            List[ModelRunQueue]: The finished executions.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM TB_RunQueue WHERE status IN ('done', 'failed')")
+        data = cursor.fetchall()
+        if data:
+            cursor.executemany('DELETE FROM TB_RunQueue WHERE id=?', [(row[0],) for row in data])
+        conn.commit()
+        conn.close()
+
+        return [ModelRunQueue._from_row(row) for row in data]
+
+    @staticmethod
+    def get_all_unfinished():
+        '''
+        Retrieves the executions that are queued or claimed.
+
+        Returns:
+            List[ModelRunQueue]: The unfinished executions.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM TB_RunQueue WHERE status IN ('queued', 'claimed')")
+        data = cursor.fetchall()
+        conn.close()
+
+        return [ModelRunQueue._from_row(row) for row in data]
+
+    @staticmethod
+    def delete_queued():
+        '''
+        Deletes the executions that no node claimed yet.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM TB_RunQueue WHERE status='queued'")
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def count_queued_by_priority():
+        '''
+        Returns:
+            dict: {priority: number of queued executions}
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT priority, COUNT(*) FROM TB_RunQueue WHERE status='queued' GROUP BY priority")
+        data = cursor.fetchall()
+        conn.close()
+
+        return dict(data)
+
+    @staticmethod
+    def _from_row(row):
+        run = ModelRunQueue(*row)
+        run.planned_time = datetime.fromisoformat(run.planned_time) if run.planned_time else None
+        run.catch_up = bool(run.catch_up)
+        return run
+
+    def __repr__(self) -> str:
+        '''
+        Returns a string representation of the 'RunQueue' instance.
+        '''
+        return f'''
+            id:                     {self.id},
+            flow_name:              {self.flow_name},
+            planned_time:           {self.planned_time},
+            status:                 {self.status},
+            node:                   {self.node},
+            lease_until:            {self.lease_until},
+            attempts:               {self.attempts},
+        '''
@@ -1,10 +1,13 @@
-import sqlite3
 from datetime import datetime
 from dataclasses import dataclass
-from fluxo.settings import Db
+from fluxo.fluxo_core.database.db import connect
 from fluxo.uttils import current_time_formatted
 
 
+# The size of the error, from its column or, for the tasks saved before it existed, from the text
+ERROR_SIZE = 'IFNULL(error_size, length(error))'
+
+
 @dataclass
 class ModelTask:
     '''
@@ -19,15 +22,29 @@ class ModelTask:
     - start_time (datetime): The start time of the 'Task'.
     - end_time (datetime): The end time of the 'Task'.
     - error (str): Any error message associated with the 'Task'.
+    - wall_time (float): Elapsed time of the invocation, in seconds.
+    - cpu_time (float): CPU time used by the process during the invocation, in seconds.
+    - thread_cpu_time (float): CPU time used by the thread running the 'Task', in seconds.
+    - peak_rss_delta (int): How much the peak resident memory of the process grew, in bytes.
+    - read_bytes (int): Bytes read from storage during the invocation.
+    - write_bytes (int): Bytes written to storage during the invocation.
+    - profile_path (str): Path of the cProfile stats file, when the invocation was profiled.
+    - log_flow_id (int): The ID of the flow execution ('TB_LogExecutionFlow') the 'Task' ran in.
+    - error_size (int): The length of the error message, in characters, set when the 'Task' is saved.
 
     Methods:
     - save(): Saves the current 'Task' instance to the 'TB_Task' table in the database.
-    - update(id, name, execution_date, flow_id, start_time, end_time, error): Updates the 'Task' with the specified ID
+    - update(id, name, execution_date, flow_id, start_time, end_time, error, ...): Updates the 'Task' with the specified ID
       with the provided information in the 'TB_Task' table.
     - get_all(): Retrieves all 'Task' instances from the 'TB_Task' table.
     - get_by_name(name): Retrieves a 'Task' instance by its name from the 'TB_Task' table.
     - get_by_id(id): Retrieves a 'Task' instance by its ID from the 'TB_Task' table.
     - get_all_by_flow_id(flow_id): Retrieves all 'Task' instances associated with the specified 'Flow' ID.
+    - get_all_by_log_flow_id(log_flow_id, ids_task, error_chars): Retrieves the 'Task' instances of a flow execution.
+    - get_page(flow_id, after, limit, error_chars): Retrieves the 'Task' instances after a cursor, oldest first.
+    - get_by_id_with_error_preview(id, head, tail): Retrieves a 'Task' instance with only the start and
+      the end of its error message.
+    - get_error_chunk(id, start, length): Retrieves a part of the error message of a 'Task'.
     - delete(id): Deletes the 'Task' with the specified ID from the 'TB_Task' table.
     - __repr__(): Returns a string representation of the 'Task' instance.
     '''
@@ -38,6 +55,15 @@ class ModelTask:
     start_time: datetime = None
     end_time: datetime = None
     error: str = None
+    wall_time: float = None
+    cpu_time: float = None
+    thread_cpu_time: float = None
+    peak_rss_delta: int = None
+    read_bytes: int = None
+    write_bytes: int = None
+    profile_path: str = None
+    log_flow_id: int = None
+    error_size: int = None
 
     def save(self):
         '''
@@ -46,12 +72,18 @@ class ModelTask:
         Returns:
             Task: The saved 'Task' instance.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        self.error_size = len(self.error) if self.error is not None else None
+
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO TB_Task (name, execution_date, flow_id, start_time, end_time, error)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (self.name, self.execution_date, self.flow_id, self.start_time, self.end_time, self.error))
+            INSERT INTO TB_Task (name, execution_date, flow_id, start_time, end_time, error,
+                wall_time, cpu_time, thread_cpu_time, peak_rss_delta, read_bytes, write_bytes, profile_path, log_flow_id,
+                error_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (self.name, self.execution_date, self.flow_id, self.start_time, self.end_time, self.error,
+              self.wall_time, self.cpu_time, self.thread_cpu_time, self.peak_rss_delta, self.read_bytes, self.write_bytes,
+              self.profile_path, self.log_flow_id, self.error_size))
         conn.commit()
 
         # Retrieve task ID after insertion
@@ -63,7 +95,9 @@ class ModelTask:
         return ModelTask.get_by_id(task_id)
 
     @staticmethod
-    def update(id, name, execution_date, flow_id, start_time, end_time, error):
+    def update(id, name, execution_date, flow_id, start_time, end_time, error,
+               wall_time=None, cpu_time=None, thread_cpu_time=None, peak_rss_delta=None, read_bytes=None,
+               write_bytes=None, profile_path=None, log_flow_id=None):
         '''
         Updates the 'Task' with the specified ID with the provided information
         in the 'TB_Task' table.
@@ -76,14 +110,32 @@ class ModelTask:
         - start_time (datetime): The new start time for the 'Task'.
         - end_time (datetime): The new end time for the 'Task'.
         - error (str): The new error message for the 'Task'.
+        - wall_time, cpu_time, thread_cpu_time (float): The resources used by the 'Task', in seconds.
+        - peak_rss_delta, read_bytes, write_bytes (int): The memory and I/O used by the 'Task', in bytes.
+        - profile_path (str): The path of the cProfile stats file of the 'Task'.
+        - log_flow_id (int): The ID of the flow execution the 'Task' ran in.
+
+        The optional columns are left as they are when not given (None). The length of `error` is
+        saved as 'error_size', so the 'error_size' of a 'Task' is left out of its fields.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        columns = {
+            'name': name, 'execution_date': execution_date, 'flow_id': flow_id, 'start_time': start_time,
+            'end_time': end_time, 'error': error, 'error_size': len(error) if error is not None else None,
+        }
+        optional = {
+            'wall_time': wall_time, 'cpu_time': cpu_time, 'thread_cpu_time': thread_cpu_time,
+            'peak_rss_delta': peak_rss_delta, 'read_bytes': read_bytes, 'write_bytes': write_bytes,
+            'profile_path': profile_path, 'log_flow_id': log_flow_id,
+        }
+        columns.update({column: value for column, value in optional.items() if value is not None})
+
+        conn = connect()
         cursor = conn.cursor()
-        cursor.execute('''
+        cursor.execute(f'''
             UPDATE TB_Task
-            SET name=?, execution_date=?, flow_id=?, start_time=?, end_time=?, error=?
+            SET {', '.join(f'{column}=?' for column in columns)}
             WHERE id=?
-        ''', (name, execution_date, flow_id, start_time, end_time, error, id))
+        ''', (*columns.values(), id))
         conn.commit()
         conn.close()
 
@@ -95,7 +147,7 @@ class ModelTask:
         Returns:
             List[Task] or None: A list containing all 'Task' instances in the database, or None if no tasks are found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Task')
         data = cursor.fetchall()
@@ -116,7 +168,7 @@ class ModelTask:
         Returns:
             Task or None: The 'Task' instance if found, or None if not found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Task WHERE name=?', (name,))
         data = cursor.fetchone()
@@ -137,7 +189,7 @@ class ModelTask:
         Returns:
             Task or None: The 'Task' instance if found, or None if not found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Task WHERE id=?', (id,))
         data = cursor.fetchone()
@@ -159,7 +211,7 @@ class ModelTask:
             List[Task] or None: A list containing all 'Task' instances associated with the specified 'Flow' ID,
                 or None if no tasks are found.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM TB_Task WHERE flow_id=?', (flow_id,))
         data = cursor.fetchall()
@@ -169,6 +221,128 @@ class ModelTask:
         else:
             return None
 
+    @staticmethod
+    def get_all_by_log_flow_id(log_flow_id, ids_task: list = None, error_chars: int = None):
+        '''
+        Retrieves the 'Task' instances of a flow execution, from the index of 'log_flow_id'.
+
+        Parameters:
+            - log_flow_id (int): The ID of the flow execution ('TB_LogExecutionFlow').
+            - ids_task (list): The IDs of the tasks of the execution (`ModelLogExecutionFlow.ids_task`),
+                for the tasks saved before 'log_flow_id' existed.
+            - error_chars (int): Only the first characters of the error messages, when given.
+
+        Returns:
+            List[Task]: The tasks of the execution, in the order they started.
+        '''
+        ids_task = ids_task or []
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {ModelTask._columns('substr(error, 1, ?)' if error_chars is not None else 'error')} FROM TB_Task
+            WHERE log_flow_id=? OR id IN ({', '.join('?' * len(ids_task))})
+            ORDER BY id
+        ''', (*(() if error_chars is None else (error_chars,)), log_flow_id, *ids_task))
+        data = cursor.fetchall()
+        conn.close()
+
+        return [ModelTask(*row) for row in data]
+
+    @staticmethod
+    def get_page(flow_id=None, after: int = None, limit: int = 100, error_chars: int = None):
+        '''
+        Retrieves the 'Task' instances saved after a cursor, oldest first, from the primary key
+        or the index of the tasks of a flow.
+
+        Parameters:
+            - flow_id (int): Only the tasks of this 'Flow'.
+            - after (int): The cursor, the ID of the last 'Task' read.
+            - limit (int): The number of tasks.
+            - error_chars (int): Only the first characters of the error messages, when given.
+
+        Returns:
+            List[Task]: The tasks. Fewer than `limit` on the last page.
+        '''
+        conditions, parameters = ['id > ?'], [after or 0]
+        if flow_id is not None:
+            conditions.append('flow_id=?')
+            parameters.append(flow_id)
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {ModelTask._columns('substr(error, 1, ?)' if error_chars is not None else 'error')} FROM TB_Task
+            WHERE {' AND '.join(conditions)}
+            ORDER BY id LIMIT ?
+        ''', (*(() if error_chars is None else (error_chars,)), *parameters, limit))
+        data = cursor.fetchall()
+        conn.close()
+
+        return [ModelTask(*row) for row in data]
+
+    @staticmethod
+    def get_by_id_with_error_preview(id, head: int, tail: int):
+        '''
+        Retrieves a 'Task' instance by its ID, with only the first `head` and the last `tail`
+        characters of its error message when it is longer, cut by SQLite so the rest of a
+        large traceback is never sent to the server. The rest is read with `get_error_chunk`.
+
+        Parameters:
+            - id (int): The ID of the 'Task' to be retrieved.
+            - head (int): The number of characters kept from the start of the error.
+            - tail (int): The number of characters kept from the end of the error.
+
+        Returns:
+            Tuple[Task, str] or None: The 'Task' instance, with the start of the error in `error` and its
+                full length in `error_size`, and the end of the error, None when `error` is complete.
+                None if the 'Task' is not found.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {ModelTask._columns(f'CASE WHEN {ERROR_SIZE} > ? THEN substr(error, 1, ?) ELSE error END')},
+                CASE WHEN {ERROR_SIZE} > ? THEN substr(error, -?) END
+            FROM TB_Task WHERE id=?
+        ''', (head + tail, head, head + tail, tail, id))
+        data = cursor.fetchone()
+        conn.close()
+        if data:
+            return ModelTask(*data[:-1]), data[-1]
+        else:
+            return None
+
+    @staticmethod
+    def get_error_chunk(id, start: int, length: int):
+        '''
+        Retrieves a part of the error message of a 'Task'.
+
+        Parameters:
+            - id (int): The ID of the 'Task'.
+            - start (int): The position of the first character, from 0.
+            - length (int): The number of characters.
+
+        Returns:
+            str or None: The characters, fewer at the end of the error. None if the 'Task' is not found.
+        '''
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT substr(error, ?, ?) FROM TB_Task WHERE id=?', (start + 1, length, id))
+        data = cursor.fetchone()
+        conn.close()
+        if data:
+            return data[0]
+        else:
+            return None
+
+    @staticmethod
+    def _columns(error: str):
+        '''
+        Returns the columns of 'TB_Task' in the order of the dataclass, with `error` read by an expression
+        and `error_size` filled in for the tasks saved before it existed.
+        '''
+        expressions = {'error': error, 'error_size': ERROR_SIZE}
+        return ', '.join(expressions.get(name, name) for name in ModelTask.__dataclass_fields__)
+
     @staticmethod
     def delete(id):
         '''
@@ -177,7 +351,7 @@ class ModelTask:
         Parameters:
             - id (int): The ID of the 'Task' to be deleted.
         '''
-        conn = sqlite3.connect(Db.PATH)
+        conn = connect()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM TB_Task WHERE id=?', (id,))
         conn.commit()
@@ -195,4 +369,13 @@ class ModelTask:
             start_time:             {self.start_time},
             end_time:               {self.end_time},
             error:                  {self.error},
+            wall_time:              {self.wall_time},
+            cpu_time:               {self.cpu_time},
+            thread_cpu_time:        {self.thread_cpu_time},
+            peak_rss_delta:         {self.peak_rss_delta},
+            read_bytes:             {self.read_bytes},
+            write_bytes:            {self.write_bytes},
+            profile_path:           {self.profile_path},
+            log_flow_id:            {self.log_flow_id},
+            error_size:             {self.error_size},
         '''
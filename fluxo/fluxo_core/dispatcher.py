@@ -0,0 +1,587 @@
+import os
+import heapq
+import signal
+import asyncio
+import socket
+import sqlite3
+import itertools
+import threading
+import multiprocessing
+from queue import Empty
+from collections import deque
+from datetime import datetime
+from time import monotonic, time
+from fluxo.settings import PathFilesPython, Scheduling
+from fluxo.logging import logger
+from fluxo.fluxo_core.database.db import _verify_if_db_exists
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.flow_tag import ModelFlowTag
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+from fluxo.fluxo_core.database.run_queue import ModelRunQueue
+from fluxo.fluxo_core.database.leader import ModelLeader
+from fluxo.fluxo_core.artifacts import ArtifactStore
+from fluxo.fluxo_core.flows_executor import FlowsExecutor
+from fluxo.fluxo_core.jobs import FixedRateJob
+from fluxo.fluxo_core.leader import LeaderElection
+from fluxo.fluxo_core.heartbeat import Heartbeat, Reaper
+from fluxo.fluxo_core.metrics import WORKERS, RUN_QUEUE_DEPTH, RUN_QUEUE_WAIT
+
+
+class Dispatcher:
+    '''
+    One scheduler process for all flows. It owns the timetable of every running flow
+    (a heap ordered by next fire, so each fire costs O(log n)) and sends "run flow X"
+    messages over a `multiprocessing` queue to a pool of worker processes, which send
+    an event back when the execution ends. A flow never has two executions at the same
+    time: a fire that comes while the flow is still running is skipped, like in the
+    per-flow processes of `FlowsExecutor`.
+
+    Due executions wait in a run queue until a worker is free, and the queue is served by
+    `Flow.priority` (highest first). A waiting execution gains one priority level every
+    `Scheduling.PRIORITY_AGING` seconds, so low priority flows still run under load.
+
+    Enabled with `FLUXO_DISPATCHER=1` (in the scheduler and in the server, so the UI switches
+    flows on and off through the database instead of starting and killing processes).
+
+    With `FLUXO_BROKER=1` the executions are queued in 'TB_RunQueue' instead, and the worker
+    processes of this and other nodes (`python -m fluxo.init_worker`, with the same database
+    and Flow files) claim them with a lease (see `ModelRunQueue`).
+
+    Several dispatchers may run against the same database: one is elected leader (see
+    `LeaderElection`) and the others are standbys that keep their timetables up to date
+    without sending anything. A standby that takes over runs the fires missed in the
+    gap following the misfire policy of each flow.
+
+    Methods:
+        - run(): Starts the workers and dispatches the fires until interrupted.
+    '''
+    def __init__(self, path: str = PathFilesPython.PATH_FILES_PYTHON, workers: int = Scheduling.WORKERS):
+        self.path = path
+        self.number_workers = workers
+        self.flows = {} # {flow name: (Flow, [tasks])}
+        self.jobs = {} # {flow name: (job, sequence)} of the running flows
+        self.timetable = [] # Heap of (next run, sequence, flow name)
+        self.pending = {} # {flow name: deque of (planned time, catch up)} waiting for the flow to be free
+        self.in_flight = set() # Flows with an execution in the run queue or in a worker
+        self.run_queue_ready = [] # Heap of (aged priority key, sequence, message, priority, monotonic enqueue time)
+        self.busy_workers = 0
+        self.broker = Scheduling.BROKER
+        self.broker_runs = {} # {TB_RunQueue id: flow name} of the executions queued in the database
+        self.stop_event = multiprocessing.Event()
+        self._queued_priorities = set()
+        self.workers = []
+        self.run_queue = multiprocessing.Queue()
+        self.event_queue = multiprocessing.Queue()
+        self._sequence = itertools.count()
+        self._next_reconcile = 0
+        self.election = LeaderElection()
+        self.leader = False
+        self._next_election = 0
+        self._next_reap = 0
+
+    def run(self):
+        '''
+        Starts the workers and dispatches the fires of the running flows until interrupted.
+        '''
+        _verify_if_db_exists()
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        self.flows = load_flows(self.path)
+        register_flows(self.flows)
+        Heartbeat.start()
+
+        if self.broker:
+            self.workers = start_lease_workers(self.path, self.number_workers, self.stop_event)
+        else:
+            for _ in range(self.number_workers):
+                worker = multiprocessing.Process(
+                    target=_worker, args=(self.path, self.run_queue, self.event_queue), daemon=True)
+                worker.start()
+                self.workers.append(worker)
+        logger.info(f'Dispatcher started with {self.number_workers} worker(s)' + (' and the broker' if self.broker else ''))
+
+        try:
+            while True:
+                if monotonic() >= self._next_election:
+                    self._elect()
+                    # Standbys look for a dead leader every second
+                    self._next_election = monotonic() + (self.election.ttl / 3 if self.leader else 1.0)
+                elif self.leader and not self.election.is_leader:
+                    self._elect() # The lease is about to expire and the renewal is late
+
+                if monotonic() >= self._next_reconcile:
+                    self._reconcile()
+                    self._next_reconcile = monotonic() + Scheduling.RECONCILE_INTERVAL
+
+                if self.leader and monotonic() >= self._next_reap:
+                    self._reap()
+                    self._next_reap = monotonic() + Scheduling.REAP_INTERVAL
+
+                self._dispatch_due()
+                self._send_ready()
+                self._wait_events(self._seconds_to_next_fire())
+        except KeyboardInterrupt:
+            logger.warning('Dispatcher interrupted')
+        finally:
+            self._stop()
+
+    def _elect(self):
+        '''
+        Takes or renews the leadership, starting or stopping the dispatch when it changes.
+        '''
+        try:
+            leader = self.election.poll()
+        except sqlite3.OperationalError as err: # E.g. the database is locked for longer than the timeout
+            logger.warning(f'Dispatcher could not renew its leadership: {err}')
+            leader = self.election.is_leader
+
+        if leader and not self.leader:
+            self.leader = True
+            self._become_leader()
+        elif self.leader and not leader:
+            self.leader = False
+            # The new leader sends the executions that were not sent yet
+            for pending in self.pending.values():
+                pending.clear()
+            for _key, _sequence, message, priority, _enqueued in self.run_queue_ready:
+                RUN_QUEUE_DEPTH.inc(str(priority), amount=-1)
+                self.in_flight.discard(message['flow'])
+            self.run_queue_ready.clear()
+            logger.warning('Dispatcher lost the leadership, it is now a standby')
+        elif not leader and self._next_election == 0:
+            holder = ModelLeader.get_by_name(self.election.name)
+            logger.info(f'Dispatcher is a standby of {holder.holder if holder else "another dispatcher"}')
+
+    def _become_leader(self):
+        '''
+        Starts dispatching: switches the active flows on (on a fresh start) or takes the
+        running flows of the previous leader and runs the fires missed since it died.
+        '''
+        FlowsExecutor._change_app_status_to_true()
+        previous_holder = self.election.previous_holder
+        if previous_holder:
+            logger.warning(f'Dispatcher took over the leadership from {previous_holder}')
+            for flow in ModelFlow.get_all() or []:
+                if flow.running and (flow.running_process or {}).get('dispatcher'):
+                    self._mark_running(flow.name, True)
+        else:
+            logger.info('Dispatcher is the leader')
+            for flow_info, _tasks in self.flows.values():
+                if flow_info.active:
+                    self._mark_running(flow_info.name, True)
+
+        if self.broker:
+            # Executions queued by a previous dispatcher still count as running
+            for run in ModelRunQueue.get_all_unfinished():
+                self.broker_runs[run.id] = run.flow_name
+                self.in_flight.add(run.flow_name)
+
+        warm = list(self.jobs) # Flows already in the timetable of the standby; `_add` queues the others
+        self._reconcile()
+        self._next_reconcile = monotonic() + Scheduling.RECONCILE_INTERVAL
+        for name in warm:
+            if name in self.jobs:
+                self._queue_missed(name)
+
+    def _reap(self):
+        '''
+        Replaces the worker processes that died, and frees the flows they were running.
+        '''
+        for index, worker in enumerate(self.workers):
+            if not worker.is_alive():
+                logger.warning(f'Worker {worker.pid} died with exit code {worker.exitcode}, starting another one')
+                if self.broker:
+                    self.workers[index], = start_lease_workers(self.path, 1, self.stop_event)
+                else:
+                    self.workers[index] = multiprocessing.Process(
+                        target=_worker, args=(self.path, self.run_queue, self.event_queue), daemon=True)
+                    self.workers[index].start()
+
+        try:
+            dead = Reaper.reap(restart=lambda flow: self._mark_running(flow.name, True))
+        except sqlite3.OperationalError as err:
+            logger.warning(f'Error reaping dead processes: {err}')
+            return
+
+        if self.broker:
+            return # The lease of the execution expires and another worker runs it again
+        host = socket.gethostname()
+        for heartbeat in dead:
+            # A local worker that died never sends the event of its execution
+            if heartbeat.host == host and heartbeat.flow_name in self.in_flight and heartbeat.pid != os.getpid():
+                self._handle_event({
+                    'flow': heartbeat.flow_name, 'worker': heartbeat.pid, 'status': 'error', 'error': 'Worker died'})
+
+    def _reconcile(self):
+        '''
+        Adds the flows switched on (and removes the flows switched off or deleted) in the database.
+        '''
+        flows_db = {flow.name: flow for flow in ModelFlow.get_all() or []}
+
+        for name in list(self.jobs):
+            flow = flows_db.get(name)
+            if flow is None or not flow.running:
+                del self.jobs[name]
+                self.pending.pop(name, None)
+                logger.info(f'Flow [{name}] execution scheduling canceled')
+
+        reloaded = False
+        for name, flow in flows_db.items():
+            if name in self.jobs or not (flow.running and (flow.running_process or {}).get('dispatcher')):
+                continue
+            if name not in self.flows and not reloaded:
+                # A Flow file added after the start
+                self.flows = load_flows(self.path)
+                reloaded = True
+            if name in self.flows:
+                self._add(name)
+
+    def _add(self, name: str):
+        '''
+        Adds a flow to the timetable, queueing the executions it missed.
+        '''
+        flow_info, _tasks = self.flows[name]
+        job, delay = FlowsExecutor._new_flow_job(flow_info.interval)
+        job._schedule_next_run()
+        if delay and not isinstance(job, FixedRateJob):
+            job.next_run += delay
+
+        sequence = next(self._sequence)
+        self.jobs[name] = (job, sequence)
+        heapq.heappush(self.timetable, (job.next_run, sequence, name))
+
+        if self.leader:
+            self._queue_missed(name)
+        logger.info(f'Flow [{name}] execution scheduling started')
+
+    def _queue_missed(self, name: str):
+        '''
+        Queues the executions the flow missed since its last planned fire (see `FlowsExecutor._missed_runs`),
+        and remembers the next fire of its job as the first one of this leader.
+        '''
+        flow_info, _tasks = self.flows[name]
+        job, _sequence = self.jobs[name]
+        FlowsExecutor._save_first_fire(flow_info, job)
+        missed = FlowsExecutor._missed_runs(flow_info, job)
+        if missed:
+            self.pending.setdefault(name, deque()).extend((planned_time, True) for planned_time in missed)
+            self._send_pending(name)
+
+    def _dispatch_due(self):
+        '''
+        Sends the flows whose next run has come to the workers and schedules their next run.
+        '''
+        now = datetime.now()
+        while self.timetable and self.timetable[0][0] <= now:
+            planned_time, sequence, name = heapq.heappop(self.timetable)
+            job, current_sequence = self.jobs.get(name, (None, None))
+            if sequence != current_sequence:
+                continue # The flow was removed (or added again) after this entry
+
+            if not self.leader:
+                pass # A standby only keeps its timetable up to date
+            elif name in self.in_flight:
+                logger.info(f'Flow [{name}] is still running, the execution of {planned_time} is skipped')
+            else:
+                self.pending.setdefault(name, deque()).append((planned_time, False))
+                self._send_pending(name)
+
+            job.last_run = now
+            job._schedule_next_run()
+            heapq.heappush(self.timetable, (job.next_run, sequence, name))
+
+    def _send_pending(self, name: str):
+        '''
+        Puts the oldest execution waiting for the flow in the run queue, if the flow is not running.
+        '''
+        pending = self.pending.get(name)
+        if name in self.in_flight or not pending:
+            return
+        planned_time, catch_up = pending.popleft()
+        self.in_flight.add(name)
+
+        flow_info, _tasks = self.flows[name]
+        priority = getattr(flow_info, 'priority', 0)
+        # The broker compares the keys of several nodes, so they are based on the wall clock
+        enqueued = time() if self.broker else monotonic()
+        # Aging adds (now - enqueued) / aging to the priority. `now` is the same for every
+        # execution in the queue, so the order only depends on this key and a heap keeps it
+        key = -(priority - enqueued / Scheduling.PRIORITY_AGING)
+        message = {'flow': name, 'planned_time': planned_time, 'catch_up': catch_up}
+        heapq.heappush(self.run_queue_ready, (key, next(self._sequence), message, priority, enqueued))
+        RUN_QUEUE_DEPTH.inc(str(priority))
+
+    def _send_ready(self):
+        '''
+        Sends the executions of the run queue with the highest aged priority to the free workers.
+        '''
+        while self.run_queue_ready and (self.broker or self.busy_workers < self.number_workers):
+            key, _sequence, message, priority, enqueued = heapq.heappop(self.run_queue_ready)
+            RUN_QUEUE_DEPTH.inc(str(priority), amount=-1)
+            if message['flow'] not in self.jobs:
+                self.in_flight.discard(message['flow']) # The flow was switched off while waiting
+                continue
+
+            if self.broker:
+                # The nodes claim the executions by the same key (see `ModelRunQueue.claim`)
+                run_id = ModelRunQueue.enqueue(
+                    message['flow'], message['planned_time'], message['catch_up'], priority, -key)
+                self.broker_runs[run_id] = message['flow']
+                continue
+
+            RUN_QUEUE_WAIT.observe(monotonic() - enqueued, str(priority))
+            self.busy_workers += 1
+            self.run_queue.put(message)
+
+    def _wait_events(self, timeout: float):
+        '''
+        Waits up to `timeout` seconds for the events of the workers and handles all that arrived.
+        '''
+        if self.broker or not self.leader:
+            self.stop_event.wait(min(timeout, Scheduling.BROKER_POLL_INTERVAL))
+            if self.leader:
+                self._poll_broker()
+            return
+
+        try:
+            event = self.event_queue.get(timeout=timeout)
+            while True:
+                self._handle_event(event)
+                event = self.event_queue.get_nowait()
+        except Empty:
+            pass
+
+    def _poll_broker(self):
+        '''
+        Handles the executions finished by the nodes and updates the depth of the queue.
+        '''
+        for run in ModelRunQueue.pop_finished():
+            name = self.broker_runs.pop(run.id, run.flow_name)
+            self._handle_event({
+                'flow': name, 'worker': run.node, 'status': 'error' if run.error else 'success', 'error': run.error})
+
+        queued = ModelRunQueue.count_queued_by_priority()
+        for priority in set(queued) | self._queued_priorities:
+            RUN_QUEUE_DEPTH.set(queued.get(priority, 0), str(priority))
+        self._queued_priorities = set(queued)
+
+    def _handle_event(self, event: dict):
+        name = event.get('flow')
+        self.in_flight.discard(name)
+        if not self.broker:
+            self.busy_workers -= 1
+        if event.get('status') == 'error':
+            logger.error(f'Flow [{name}] execution failed in worker {event.get("worker")}: {event.get("error")}')
+        self._send_pending(name)
+        self._send_ready()
+
+    def _seconds_to_next_fire(self):
+        # Also wakes up for the periodic reconciliation with the database
+        if not self.timetable:
+            return Scheduling.RECONCILE_INTERVAL
+        seconds = (self.timetable[0][0] - datetime.now()).total_seconds()
+        return min(max(seconds, 0.01), Scheduling.RECONCILE_INTERVAL)
+
+    def _mark_running(self, name: str, running: bool):
+        flow = ModelFlow.get_by_name(name)
+        flow.running = running
+        flow.running_process = {
+            'process_pid': os.getpid(), 'host': socket.gethostname(), 'dispatcher': True} if running else None
+        flow.update(**flow.__dict__)
+
+    def _stop(self):
+        '''
+        Stops the workers and marks the scheduled flows as not running.
+        '''
+        signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C reaches the whole process group, once or more
+        self.stop_event.set()
+        if not self.broker:
+            for _ in self.workers:
+                self.run_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        if not self.leader:
+            self.election.release()
+            logger.info('Dispatcher stopped')
+            return # The flows belong to the leader
+
+        if self.broker:
+            ModelRunQueue.delete_queued()
+
+        # Also the flows switched on after the last reconciliation
+        names = set(self.jobs) | {
+            flow.name for flow in ModelFlow.get_all() or []
+            if flow.running and (flow.running_process or {}).get('dispatcher')}
+        for name in names:
+            self._mark_running(name, False)
+            if self.broker:
+                continue # The executions claimed by other nodes keep running
+            flow = ModelFlow.get_by_name(name)
+            log_flow = ModelLogExecutionFlow.get_by_idflow_and_endtime_is_none(flow.id)
+            if log_flow:
+                ArtifactStore.release(log_flow.id)
+                log_flow.delete(log_flow.id)
+        FlowsExecutor._change_app_status_to_false()
+        self.election.release()
+        logger.info('Dispatcher stopped')
+
+
+def _worker(path: str, run_queue: multiprocessing.Queue, event_queue: multiprocessing.Queue):
+    '''
+    Runs the flow executions received from the dispatcher, one at a time.
+    '''
+    flows = load_flows(path)
+    WORKERS.set(1, 'idle')
+
+    while True:
+        try:
+            message = run_queue.get()
+        except KeyboardInterrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            continue # The dispatcher sends the stop message
+        if message is None:
+            break
+
+        name = message['flow']
+        if name not in flows:
+            flows = load_flows(path)
+
+        event = {'flow': name, 'worker': os.getpid(), 'status': 'success'}
+        try:
+            flow_info, tasks = flows[name]
+            FlowsExecutor._run_flow(
+                flow_info, tasks, planned_time=message['planned_time'], catch_up=message['catch_up'])
+        except KeyboardInterrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            FlowsExecutor._update_tasks_in_db_if_keyboardinterrupt(name)
+            event_queue.put({**event, 'status': 'interrupted'})
+            break
+        except Exception as err:
+            event.update(status='error', error=f'{type(err).__name__}: {err}')
+        event_queue.put(event)
+
+
+def start_lease_workers(path: str, number: int, stop_event):
+    '''
+    Starts the worker processes that claim the executions queued in 'TB_RunQueue'.
+
+    Parameters:
+        - path (str): The path to the directory containing the Flow files.
+        - number (int): How many worker processes to start.
+        - stop_event (multiprocessing.Event): Set to stop the workers after their current execution.
+
+    Returns:
+        list: The started processes.
+    '''
+    node = socket.gethostname()
+    workers = []
+    for _ in range(number):
+        worker = multiprocessing.Process(target=_lease_worker, args=(path, node, stop_event), daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
+
+
+def _lease_worker(path: str, node: str, stop_event):
+    '''
+    Claims the executions queued in 'TB_RunQueue' and runs them, one at a time, renewing
+    the lease from a thread while the execution runs.
+    '''
+    node = f'{node}:{os.getpid()}'
+    flows = load_flows(path)
+    WORKERS.set(1, 'idle')
+
+    while not stop_event.is_set():
+        try:
+            run = ModelRunQueue.claim(node, Scheduling.LEASE_TTL, Scheduling.MAX_ATTEMPTS)
+            if run is None:
+                stop_event.wait(Scheduling.BROKER_POLL_INTERVAL)
+                continue
+        except KeyboardInterrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            continue # The main process sets the stop event
+
+        RUN_QUEUE_WAIT.observe(max(time() - run.enqueued_at, 0), str(run.priority))
+        if run.flow_name not in flows:
+            flows = load_flows(path)
+        if run.expired_node:
+            # The execution of the previous attempt is left open, the tasks of this one would be added to it
+            Reaper.close_executions(
+                run.flow_name, run.expired_node, f'Orphaned execution: the lease of node {run.expired_node} expired')
+
+        renewing = threading.Event()
+        heartbeat = threading.Thread(target=_renew_lease, args=(run, node, renewing), daemon=True)
+        heartbeat.start()
+        error = None
+        try:
+            flow_info, tasks = flows[run.flow_name]
+            FlowsExecutor._run_flow(flow_info, tasks, planned_time=run.planned_time, catch_up=run.catch_up)
+        except KeyboardInterrupt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            FlowsExecutor._update_tasks_in_db_if_keyboardinterrupt(run.flow_name)
+            error = 'Interrupted'
+        except Exception as err:
+            error = f'{type(err).__name__}: {err}'
+        finally:
+            renewing.set()
+            heartbeat.join()
+            ModelRunQueue.finish(run.id, node, error)
+
+
+def _renew_lease(run, node: str, stop: threading.Event):
+    '''
+    Renews the lease of a claimed execution every third of `Scheduling.LEASE_TTL`, until `stop` is set.
+    '''
+    while not stop.wait(Scheduling.LEASE_TTL / 3):
+        if not ModelRunQueue.renew(run.id, node, Scheduling.LEASE_TTL):
+            logger.warning(f'Flow [{run.flow_name}] lost the lease of its execution {run.id}, another node may run it')
+            return
+
+
+def load_flows(path: str):
+    '''
+    Imports the Flow files and groups the tasks by flow.
+
+    Parameters:
+        - path (str): The path to the directory containing the Flow files.
+
+    Returns:
+        dict: {flow name: (Flow, [task functions in execution order])}
+    '''
+    flows = {}
+    dir_base = os.path.basename(path)
+    for file in sorted(os.listdir(path)):
+        if file.endswith('.py'):
+            module = FlowsExecutor._import_module(dir_base, file[:-3])
+
+            # Search for asynchronous functions decorated with @Task
+            for name_attribute in dir(module):
+                attribute = getattr(module, name_attribute)
+                if asyncio.iscoroutinefunction(attribute) and hasattr(attribute, 'task_info'):
+                    flow_info = attribute.task_info.get('flow')
+                    flows.setdefault(flow_info.name, (flow_info, []))[1].append(attribute)
+    return flows
+
+
+def register_flows(flows: dict):
+    '''
+    Creates the flows that are not in the database yet and updates the others.
+
+    Parameters:
+        - flows (dict): The flows returned by `load_flows`.
+    '''
+    for name, (flow_info, tasks) in flows.items():
+        names_tasks = [task.task_info.get('name') for task in tasks]
+        flow = ModelFlow.get_by_name(name)
+        if flow is None:
+            flow = ModelFlow(name=name, interval=flow_info.interval, list_names_tasks=names_tasks, running=False)
+            flow = flow.save()
+            logger.info(f'New Flow [{name}] update in database')
+        else:
+            flow.interval = flow_info.interval
+            flow.active = flow_info.active
+            flow.list_names_tasks = names_tasks
+            flow.update(**flow.__dict__)
+        ModelFlowTag.set_tags(flow.id, flow_info.tags)
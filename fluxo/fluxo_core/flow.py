@@ -1,5 +1,12 @@
 
 
+from fluxo.settings import Scheduling
+from fluxo.fluxo_core.intervals import spread_interval
+
+
+MISFIRE_POLICIES = ('skip', 'once', 'all')
+
+
 class Flow:
     '''
     Represents a 'Flow' object with attributes such as name, interval, and active status.
@@ -8,6 +15,18 @@ class Flow:
         - name (str): The name of the 'Flow'.
         - interval (dict): The interval information for the 'Flow'.
         - active (bool): A flag indicating whether the 'Flow' is active or not.
+        - misfire_policy (str): What to do with the executions missed while the scheduler was down:
+            'skip' (default) does not run them, 'once' runs one execution for all of them and
+            'all' runs each of them, one after the other.
+        - misfire_grace_time (int): Seconds a fire may be late and still run normally.
+            Defaults to `Scheduling.MISFIRE_GRACE_TIME`.
+        - spread_window (int): Moves the fires by a fixed offset, from a hash of the name, of up
+            to this many seconds, so flows with the same interval do not fire together.
+            Defaults to `Scheduling.SPREAD_WINDOW` (0, disabled).
+        - tags (list): Tags of the 'Flow'. When a tag has a limit in `Concurrency.TAG_LIMITS`,
+            at most that many flows with the tag run at the same time, the others wait.
+        - priority (int): With the dispatcher (`FLUXO_DISPATCHER=1`), executions of flows with a
+            higher priority are sent to the workers first when all of them are busy. Defaults to 0.
 
     Example:
         ```
@@ -19,14 +38,48 @@ class Flow:
         @Task('My Task 1', flow=flow)
         async def My_func():
             print('My_func executed!')
+            return [1, 2, 3]
+
+        @Task('My Task 2', flow=flow)
+        async def My_func_2():
+            values = flow.get_artifact('My Task 1')
         ```
     '''
     def __init__(
         self,
         name: str,
         interval: dict = None,
-        active: bool = True
+        active: bool = True,
+        misfire_policy: str = 'skip',
+        misfire_grace_time: int = None,
+        spread_window: int = None,
+        tags: list = None,
+        priority: int = 0
     ):
+        if not isinstance(priority, int):
+            raise ValueError("Priority must be an integer.")
+        if misfire_policy not in MISFIRE_POLICIES:
+            raise ValueError(f"Misfire policy must be one of {', '.join(MISFIRE_POLICIES)}.")
+
         self.name = name
-        self.interval = interval
+        self.interval = spread_interval(
+            interval, name, Scheduling.SPREAD_WINDOW if spread_window is None else spread_window)
         self.active = active
+        self.misfire_policy = misfire_policy
+        self.misfire_grace_time = misfire_grace_time
+        self.tags = [tags] if isinstance(tags, str) else list(tags or [])
+        self.priority = priority
+
+    def get_artifact(self, task_name: str):
+        '''
+        Returns the value returned by a task in the current execution of this flow.
+
+        Parameters:
+            - task_name (str): The name of the task that returned the value.
+
+        Returns:
+            The stored value, or None if the task did not return a value in this execution.
+        '''
+        # Imported here, so defining a flow does not load the database models
+        from fluxo.fluxo_core.artifacts import get_artifact
+        return get_artifact(self, task_name)
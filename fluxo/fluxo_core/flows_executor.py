@@ -5,16 +5,28 @@ import importlib
 import asyncio
 import schedule
 import signal
-from time import sleep
+import socket
+import threading
+from time import sleep, monotonic
+from datetime import datetime, timedelta
 from typing import List, Optional
-from fluxo.settings import PathFilesPython, Db
+from fluxo.settings import PathFilesPython, Db, Metrics, Scheduling
 from fluxo.uttils import current_time_formatted
 from fluxo.logging import logger
 from fluxo.fluxo_core.database.db import _verify_if_db_exists
 from fluxo.fluxo_core.database.app import ModelApp
 from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.flow_tag import ModelFlowTag
 from fluxo.fluxo_core.database.task import ModelTask
 from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+from fluxo.fluxo_core.database.flow_schedule import ModelFlowSchedule
+from fluxo.fluxo_core.artifacts import ArtifactStore
+from fluxo.fluxo_core.intervals import last_missed_fire_times
+from fluxo.fluxo_core.jobs import CronJob, FixedRateJob
+from fluxo.fluxo_core.concurrency import ConcurrencyLimits
+from fluxo.fluxo_core.heartbeat import Heartbeat, Reaper
+from fluxo.fluxo_core.tracing import Tracer
+from fluxo.fluxo_core.metrics import MetricsRegistry, SCHEDULE_LAG, SCHEDULE_JITTER, MISFIRES, WORKERS
 
 
 class FlowsExecutor:
@@ -29,6 +41,7 @@ class FlowsExecutor:
         - stop_flow_execution(): Stops the execution of the specified flows.
     '''
     _coroutines: list = [] # [(task, flow_info)]
+    _previous_fires: dict = {} # {flow name: (planned time, monotonic start) of the last scheduled execution}
 
     def __init__(self, path=PathFilesPython.PATH_FILES_PYTHON) -> None:
         '''
@@ -61,10 +74,22 @@ class FlowsExecutor:
                         target=FlowsExecutor._execute_async_tasks_first_time, args=(self.path, file))
                     self.processes.append(process)
                     process.start()
+        elif Scheduling.DISPATCHER and flows is not None:
+            # The dispatcher process schedules the flows marked as running
+            for flow in flows:
+                flow = ModelFlow.get_by_id(flow.id)
+                flow.running = True
+                flow.running_process = {'dispatcher': True}
+                flow.update(**flow.__dict__)
         else:
+            _verify_if_db_exists() # Upgrade the database to the current schema
             FlowsExecutor._change_app_status_to_true() # Change status to True in database
             # If flows is None, then all flows will be executed
             if flows is None:
+                # Close what the processes of a previous run left behind, then keep watching
+                Reaper.reap()
+                threading.Thread(target=self._reap_periodically, daemon=True).start()
+
                 all_flows = ModelFlow.get_all()
                 for flow in all_flows:
                     process = multiprocessing.Process(
@@ -78,6 +103,17 @@ class FlowsExecutor:
                     self.processes.append(process)
                     process.start()
 
+    def _reap_periodically(self):
+        '''
+        Closes the executions and flows of the flow processes that died, every `Scheduling.REAP_INTERVAL` seconds.
+        '''
+        while True:
+            sleep(Scheduling.REAP_INTERVAL)
+            try:
+                Reaper.reap(restart=lambda flow: self.execute_parallel_flows([flow]))
+            except Exception as err:
+                logger.error(f'Error reaping dead processes: {err}')
+
     def execute_flow_now(self, flows: Optional[List[ModelFlow]] = None):
         '''
         Executes Flow right now.
@@ -89,11 +125,9 @@ class FlowsExecutor:
             process.start()
                     
     def update_new_flow_in_python_files(self):
-        # Check if the database doesn't exist
-        if not self._db_exists():
-            # Verify and create the database if it doesn't exist
-            _verify_if_db_exists()
-            
+        # Verify and create the database if it doesn't exist, or upgrade it
+        _verify_if_db_exists()
+
         for file in os.listdir(self.path):
             if file.endswith(".py"):
                 FlowsExecutor._update_tasks_in_new_flow(self.path, file)
@@ -116,12 +150,16 @@ class FlowsExecutor:
             if flow:
                 if flow.running:
                     pid = flow.running_process.get('process_pid')
+                    dispatcher = flow.running_process.get('dispatcher')
                     try:
                         flow.running_process = None
                         flow.running = False
                         flow.update(**flow.__dict__)
+                        # Stopped on purpose: the executions missed until it starts again are not caught up
+                        ModelFlowSchedule.delete(flow.id)
                         logger.info(f'Flow [{flow.name}] execution scheduling canceled')
-                        os.kill(pid, signal.SIGTERM)
+                        if not dispatcher: # The dispatcher drops the flow when it reads the database
+                            os.kill(pid, signal.SIGTERM)
                     except ProcessLookupError:
                         raise Exception(f'The process with PID {pid} was not found')
                     except PermissionError:
@@ -144,7 +182,7 @@ class FlowsExecutor:
 
                     # Dynamically import the module
                     dir_base = os.path.basename(path)
-                    module = importlib.import_module(f"{dir_base}.{name_module}")
+                    module = FlowsExecutor._import_module(dir_base, name_module)
 
                     # Search for asynchronous functions in the module
                     for name_attribute in dir(module):
@@ -171,6 +209,7 @@ class FlowsExecutor:
                                     flow.interval = flow_info.interval
                                     flow.active = flow_info.active
                                     flow.update(**flow.__dict__)
+                                    ModelFlowTag.set_tags(flow.id, flow_info.tags)
                                     
                                     if flow.active: # Check if fluxo.active is True
                                         FlowsExecutor._coroutines.append((attribute, flow_info))
@@ -178,7 +217,7 @@ class FlowsExecutor:
                     if FlowsExecutor._coroutines:
                         flow.running = True
                         # Sets the running process to the flow, storing the PID of the current process.
-                        flow.running_process = {'process_pid': os.getpid()}
+                        flow.running_process = {'process_pid': os.getpid(), 'host': socket.gethostname()}
                         flow.update(**flow.__dict__)
                         logger.info(f'Flow [{flow.name}] execution scheduling started')
                         FlowsExecutor._schedule_async_tasks()
@@ -203,7 +242,7 @@ class FlowsExecutor:
 
                     # Dynamically import the module
                     dir_base = os.path.basename(path)
-                    module = importlib.import_module(f"{dir_base}.{name_module}")
+                    module = FlowsExecutor._import_module(dir_base, name_module)
 
                     # Search for asynchronous functions in the module
                     for name_attribute in dir(module):
@@ -230,6 +269,7 @@ class FlowsExecutor:
                                     flow.interval = flow_info.interval
                                     flow.active = flow_info.active
                                     flow.update(**flow.__dict__)
+                                    ModelFlowTag.set_tags(flow.id, flow_info.tags)
                                     
                                     if flow.active: # Check if fluxo.active is True
                                         FlowsExecutor._coroutines.append((attribute, flow_info))
@@ -237,7 +277,7 @@ class FlowsExecutor:
                     if FlowsExecutor._coroutines:
                         flow.running = True
                         # Sets the running process to the flow, storing the PID of the current process.
-                        flow.running_process = {'process_pid': os.getpid()}
+                        flow.running_process = {'process_pid': os.getpid(), 'host': socket.gethostname()}
                         flow.update(**flow.__dict__)
                         logger.info(f'Flow [{flow.name}] execution scheduling started')
                         FlowsExecutor._schedule_async_tasks_now()
@@ -260,7 +300,7 @@ class FlowsExecutor:
 
             # Dynamically import the module
             dir_base = os.path.basename(path)
-            module = importlib.import_module(f"{dir_base}.{name_module}")
+            module = FlowsExecutor._import_module(dir_base, name_module)
 
             # Search for asynchronous functions in the module
             for name_attribute in dir(module):
@@ -287,6 +327,7 @@ class FlowsExecutor:
                             flow.interval = flow_info.interval
                             flow.list_names_tasks.append(task_info.get('name'))
                             flow.update(**flow.__dict__)
+                        ModelFlowTag.set_tags(flow.id, flow_info.tags)
 
         except Exception as e:
             raise Exception(f"Error executing task in module")
@@ -306,7 +347,7 @@ class FlowsExecutor:
 
             # Dynamically import the module
             dir_base = os.path.basename(path)
-            module = importlib.import_module(f"{dir_base}.{name_module}")
+            module = FlowsExecutor._import_module(dir_base, name_module)
 
             _name_flow = None
             _list_names_tasks: list = []
@@ -330,6 +371,7 @@ class FlowsExecutor:
                             )
                             flow = flow.save()
                             _name_flow = flow
+                            ModelFlowTag.set_tags(flow.id, flow_info.tags)
                             logger.info(f'New Flow [{flow.name}] update in database')
                         else:
                             if _name_flow:
@@ -348,24 +390,23 @@ class FlowsExecutor:
         '''
         Schedules the execution of asynchronous tasks based on the specified intervals.
         '''
-        for task, flow_info in FlowsExecutor._coroutines:
-            if flow_info.interval.get('minutes'):
-                schedule.every(flow_info.interval.get('minutes')).minutes.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-            elif flow_info.interval.get('hours'):
-                schedule.every(flow_info.interval.get('hours')).hours.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-            elif flow_info.interval.get('days'):
-                schedule.every(flow_info.interval.get('days')).days.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-                
+        flow_job = FlowsExecutor._schedule_flow_job()
+        WORKERS.set(1, 'idle')
+        Heartbeat.start()
+
         jobs_pending = [schedule.get_jobs()]
 
         condition = True
+        catch_up_pending = True
         while condition:
             try:
+                if catch_up_pending:
+                    catch_up_pending = False
+                    FlowsExecutor._catch_up_missed_fires(flow_job)
+
                 schedule.run_pending()
-                sleep(1)
+                # Wake up at the next run (at least once per second), so short intervals fire on time
+                sleep(min(1.0, max(0.01, schedule.idle_seconds() or 1.0)))
             except KeyboardInterrupt:
                 for job in jobs_pending:
                     schedule.cancel_job(job)
@@ -382,17 +423,8 @@ class FlowsExecutor:
         '''
         Schedules the execution of asynchronous tasks right now.
         '''
-        for task, flow_info in FlowsExecutor._coroutines:
-            if flow_info.interval.get('minutes'):
-                schedule.every(flow_info.interval.get('minutes')).minutes.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-            elif flow_info.interval.get('hours'):
-                schedule.every(flow_info.interval.get('hours')).hours.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-            elif flow_info.interval.get('days'):
-                schedule.every(flow_info.interval.get('days')).days.at(
-                    flow_info.interval.get('at')).do(FlowsExecutor._run_asynchronous_task, task)
-                
+        FlowsExecutor._schedule_flow_job(now=True)
+
         jobs_pending = [schedule.get_jobs()]
 
         _tasks, flow = zip(*FlowsExecutor._coroutines)
@@ -409,6 +441,215 @@ class FlowsExecutor:
             FlowsExecutor._update_tasks_in_db_if_keyboardinterrupt(flow.name)
             FlowsExecutor._stop_flow_execution(flow.name)
 
+    @staticmethod
+    def _schedule_flow_job(now: bool = False):
+        '''
+        Schedules one job that runs all the tasks of the flow, in order, at each fire.
+
+        Parameters:
+            - now (bool): If True the job is run by `schedule.run_all()`, so it has no planned time.
+
+        Returns:
+            schedule.Job: The scheduled job.
+        '''
+        tasks, flows_info = zip(*FlowsExecutor._coroutines)
+        flow_info = flows_info[0]
+
+        job, delay = FlowsExecutor._new_flow_job(flow_info.interval, schedule.default_scheduler)
+        job.do(FlowsExecutor._run_flow, flow_info, list(tasks), None if now else job)
+        if delay and not isinstance(job, FixedRateJob):
+            job.next_run += delay # The next runs are counted from the first one
+        if not now:
+            FlowsExecutor._save_first_fire(flow_info, job)
+        return job
+
+    @staticmethod
+    def _save_first_fire(flow_info, job: schedule.Job):
+        '''
+        Remembers the first fire of a newly scheduled job, so the upcoming runs are projected
+        on its schedule before it fires (see `UpcomingRuns`).
+
+        Parameters:
+            - flow_info (Flow): The flow of the job.
+            - job (schedule.Job): The job, whose `next_run` is its first fire.
+        '''
+        flow = ModelFlow.get_by_name(flow_info.name)
+        if flow is not None:
+            ModelFlowSchedule.save_first_planned_fire(flow.id, job.next_run)
+
+    @staticmethod
+    def _new_flow_job(interval: dict, scheduler: schedule.Scheduler = None):
+        '''
+        Creates the job of an interval, without scheduling it.
+
+        Parameters:
+            - interval (dict): The interval of the flow.
+            - scheduler (schedule.Scheduler): The scheduler the job is added to by `job.do()`.
+
+        Returns:
+            tuple: The job and the delay (timedelta) to add to its first run. A `FixedRateJob`
+                already has the delay in its grid.
+        '''
+        # The spread offset of minutes, hours and days is already in 'at'
+        delay = timedelta(seconds=interval.get('offset', 0)) if interval.get('seconds') else timedelta(0)
+
+        if interval.get('cron'):
+            job = CronJob(interval.get('cron'), scheduler, interval.get('offset', 0))
+        elif interval.get('seconds'):
+            job = schedule.Job(interval.get('seconds'), scheduler).seconds
+        elif interval.get('minutes'):
+            job = schedule.Job(interval.get('minutes'), scheduler).minutes.at(interval.get('at'))
+        elif interval.get('hours'):
+            job = schedule.Job(interval.get('hours'), scheduler).hours.at(interval.get('at'))
+        elif interval.get('days'):
+            job = schedule.Job(interval.get('days'), scheduler).days.at(interval.get('at'))
+
+        if interval.get('fixed_rate') and not interval.get('cron'):
+            job = FixedRateJob.from_job(job, delay)
+        return job, delay
+
+    @staticmethod
+    def _run_flow(flow_info, tasks: list, job: schedule.Job = None, planned_time: datetime = None,
+                  catch_up: bool = False):
+        '''
+        Runs the tasks of a flow execution, traced as one root span.
+
+        Parameters:
+            - flow_info (Flow): The flow being executed.
+            - tasks (list): The decorated task functions, in execution order.
+            - job (schedule.Job): The job that fired the execution. Its `next_run` still holds
+                the planned time while the job function runs.
+            - planned_time (datetime): The planned time, when the execution was not fired by `job`.
+            - catch_up (bool): If True it is a missed execution being caught up, left out of the lag and jitter.
+        '''
+        if job:
+            planned_time = job.next_run
+        Heartbeat.start(flow_info.name)
+
+        lag = jitter = None
+        if planned_time is not None and not catch_up:
+            lag = (datetime.now() - planned_time).total_seconds()
+            jitter = FlowsExecutor._measure_jitter(flow_info.name, planned_time)
+            SCHEDULE_LAG.observe(lag, flow_info.name)
+        if jitter is not None:
+            SCHEDULE_JITTER.observe(jitter, flow_info.name)
+
+        if planned_time is not None:
+            # Remembered so the executions missed while the scheduler is down can be caught up
+            flow = ModelFlow.get_by_name(flow_info.name)
+            ModelFlowSchedule.save_last_planned_fire(flow.id, planned_time)
+
+        WORKERS.set(1, 'active')
+        WORKERS.set(0, 'idle')
+        try:
+            with Tracer.span('flow.run', root=True, flow=flow_info.name) as span:
+                if span and planned_time is not None:
+                    span.set_attribute('schedule.planned_time', planned_time.isoformat())
+                if span and lag is not None:
+                    span.set_attribute('schedule.lag_seconds', lag)
+                if span and jitter is not None:
+                    span.set_attribute('schedule.jitter_seconds', jitter)
+                if span and catch_up:
+                    span.set_attribute('schedule.catch_up', True)
+
+                with ConcurrencyLimits.hold(flow_info) as waited:
+                    if span and waited:
+                        span.set_attribute('concurrency.wait_seconds', waited)
+                    for task in tasks:
+                        FlowsExecutor._run_asynchronous_task(task)
+        finally:
+            Heartbeat.set_flow(None)
+            WORKERS.set(0, 'active')
+            WORKERS.set(1, 'idle')
+            # Flow processes are terminated by signal or `os._exit`, without running atexit handlers
+            if Metrics.ENABLED:
+                MetricsRegistry.flush()
+
+    @staticmethod
+    def _catch_up_missed_fires(job: schedule.Job):
+        '''
+        Runs the executions missed by the flow of this process (see `_missed_runs`), one after the other.
+
+        Parameters:
+            - job (schedule.Job): The job of the flow, whose `next_run` is the first fire not missed.
+        '''
+        tasks, flows_info = zip(*FlowsExecutor._coroutines)
+        for planned_time in FlowsExecutor._missed_runs(flows_info[0], job):
+            FlowsExecutor._run_flow(flows_info[0], list(tasks), planned_time=planned_time, catch_up=True)
+
+    @staticmethod
+    def _missed_runs(flow_info, job: schedule.Job):
+        '''
+        Applies the misfire policy of a flow to the fires missed since its last planned
+        execution, e.g. while the scheduler was down. Fires late by less than the grace time
+        run once, as a normal (late) execution; older ones are misfires, which are skipped,
+        run once or all run, per `Flow.misfire_policy`.
+
+        Parameters:
+            - flow_info (Flow): The flow.
+            - job (schedule.Job): The job of the flow, whose `next_run` is the first fire not missed.
+
+        Returns:
+            list: The planned times (datetime) of the executions to run, oldest first.
+        '''
+        flow = ModelFlow.get_by_name(flow_info.name)
+        flow_schedule = ModelFlowSchedule.get_by_flow_id(flow.id)
+        if flow_schedule is None or flow_schedule.last_planned_fire is None:
+            return []
+
+        now = datetime.now()
+        grace_time = timedelta(seconds=Scheduling.MISFIRE_GRACE_TIME
+            if flow_info.misfire_grace_time is None else flow_info.misfire_grace_time)
+
+        # The fires before the first one of the job, and late by more than the grace time for the misfires
+        until = min(now, job.next_run - timedelta(microseconds=1))
+        count_misfires, misfires = last_missed_fire_times(
+            flow_info.interval, flow_schedule.last_planned_fire, min(until, now - grace_time - timedelta(microseconds=1)),
+            Scheduling.MAX_CATCH_UP_RUNS)
+        count_fires, last_fires = last_missed_fire_times(flow_info.interval, flow_schedule.last_planned_fire, until, 1)
+        late_fire = last_fires[-1] if count_fires > count_misfires else None
+
+        if flow_info.misfire_policy == 'all':
+            runs = list(misfires) + ([late_fire] if late_fire else [])
+            count_run = len(misfires)
+        elif flow_info.misfire_policy == 'once':
+            # One execution for all of them, the late fire (if any) already is one
+            runs = [late_fire or misfires[-1]] if (late_fire or misfires) else []
+            count_run = min(count_misfires, 1)
+        else:
+            runs = [late_fire] if late_fire else []
+            count_run = 0
+
+        if count_misfires:
+            logger.warning(f'Flow [{flow_info.name}] missed {count_misfires} execution(s), misfire policy '
+                           f'\'{flow_info.misfire_policy}\': {count_run} caught up, {count_misfires - count_run} skipped')
+            MISFIRES.inc(flow_info.name, 'run', amount=count_run)
+            MISFIRES.inc(flow_info.name, 'skipped', amount=count_misfires - count_run)
+
+            if not runs:
+                # Skipped for good, they are not counted again on the next start
+                ModelFlowSchedule.save_last_planned_fire(flow.id, misfires[-1])
+        return runs
+
+    @staticmethod
+    def _measure_jitter(flow_name: str, planned_time: datetime):
+        '''
+        Returns how much the time since the previous execution of the flow deviates from
+        the planned time since it, in seconds, or None for the first execution.
+
+        Parameters:
+            - flow_name (str): The name of the flow.
+            - planned_time (datetime): The planned time of the execution.
+        '''
+        previous = FlowsExecutor._previous_fires.get(flow_name)
+        FlowsExecutor._previous_fires[flow_name] = (planned_time, monotonic())
+        if previous is None:
+            return None
+
+        planned = (planned_time - previous[0]).total_seconds()
+        measured = FlowsExecutor._previous_fires[flow_name][1] - previous[1]
+        return abs(measured - planned)
+
     def _cleanup_processes(self):
         '''
         Terminates all running processes.
@@ -439,7 +680,7 @@ class FlowsExecutor:
                 task.error = 'KeyboardInterrupt'
                 task.end_time = current_time_formatted()
                 task.execution_date = task.end_time
-                task.update(**task.__dict__)
+                task.update(**{key: value for key, value in task.__dict__.items() if key != 'error_size'})
 
     @staticmethod
     def _stop_flow_execution(flow_name: str):
@@ -465,6 +706,7 @@ class FlowsExecutor:
                     flow.running = False
                     flow.update(**flow.__dict__)
                     if log_flow:
+                        ArtifactStore.release(log_flow.id)
                         log_flow.delete(log_flow.id)
                         
                     logger.info(f'Flow [{flow.name}] execution scheduling canceled')
@@ -500,6 +742,18 @@ class FlowsExecutor:
         if app:
             app.update(app.id, False)
 
+    @staticmethod
+    def _import_module(dir_base: str, name_module: str):
+        '''
+        Dynamically imports a module of the Flow files directory.
+
+        Parameters:
+        - dir_base (str): The name of the directory containing the module.
+        - name_module (str): The name of the module (excluding the '.py' extension).
+        '''
+        with Tracer.span('executor.import', root=True, module=f'{dir_base}.{name_module}'):
+            return importlib.import_module(f"{dir_base}.{name_module}")
+
     @staticmethod
     def _run_asynchronous_task(task):
         '''
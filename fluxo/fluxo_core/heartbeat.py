@@ -0,0 +1,184 @@
+import os
+import socket
+import sqlite3
+import threading
+from time import time, sleep
+from fluxo.settings import Scheduling
+from fluxo.logging import logger
+from fluxo.uttils import current_time_formatted, is_process_alive
+from fluxo.fluxo_core.artifacts import ArtifactStore
+from fluxo.fluxo_core.rollups import Rollups
+from fluxo.fluxo_core.database.heartbeat import ModelHeartbeat
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.task import ModelTask
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+
+class Heartbeat:
+    '''
+    Writes a heartbeat of the current process to 'TB_Heartbeat' every
+    `Scheduling.HEARTBEAT_INTERVAL` seconds, from a daemon thread, with the flow it is running.
+
+    Methods:
+        - start(flow_name): Starts the heartbeats of the process, or updates its flow.
+        - set_flow(flow_name): Changes the flow reported by the next heartbeats.
+        - worker_id(): The identifier of the current process, '<host>:<pid>'.
+    '''
+    _pid: int = None # The process whose thread is beating, forked children start their own
+    _flow_name: str = None
+
+    @staticmethod
+    def worker_id():
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @staticmethod
+    def start(flow_name: str = None):
+        '''
+        Starts the heartbeats of the current process (once per process) and reports the flow it runs.
+
+        Parameters:
+            - flow_name (str): The name of the flow being run, if any.
+        '''
+        Heartbeat._flow_name = flow_name
+        if Heartbeat._pid == os.getpid():
+            return
+
+        Heartbeat._pid = os.getpid()
+        Heartbeat._beat() # Written before the execution starts, so the reaper never sees it without a heartbeat
+        threading.Thread(target=Heartbeat._loop, daemon=True).start()
+
+    @staticmethod
+    def set_flow(flow_name: str = None):
+        Heartbeat._flow_name = flow_name
+
+    @staticmethod
+    def _loop():
+        while True:
+            sleep(Scheduling.HEARTBEAT_INTERVAL)
+            try:
+                Heartbeat._beat()
+            except sqlite3.Error as err:
+                logger.warning(f'Heartbeat of process {os.getpid()} failed: {err}')
+
+    @staticmethod
+    def _beat():
+        ModelHeartbeat.beat(Heartbeat.worker_id(), socket.gethostname(), os.getpid(), Heartbeat._flow_name)
+
+
+class Reaper:
+    '''
+    Cleans up after processes that died without doing it themselves (killed, out of memory).
+    A process of this host is dead when its PID is gone, whatever its heartbeat says (a task
+    holding the GIL in a long C call delays the heartbeats of a live process). A process of
+    another host is dead when its heartbeat is older than `Scheduling.HEARTBEAT_TIMEOUT`. Then:
+
+        - Its unfinished flow executions ('TB_LogExecutionFlow' rows with `end_time IS NULL`)
+          and their unfinished tasks are closed with an error, and their artifacts released.
+        - The flows it was scheduling are marked as not running, and optionally started again.
+
+    Methods:
+        - reap(restart): Detects the dead processes and closes what they left behind.
+        - close_executions(flow_name, worker, error): Closes the unfinished executions of a flow left by a process.
+    '''
+    @staticmethod
+    def reap(restart=None):
+        '''
+        Detects the dead processes and closes what they left behind.
+
+        Parameters:
+            - restart (callable): Called with the 'ModelFlow' of each flow whose scheduling
+                process died, when `Scheduling.REAP_RESTART` is set.
+
+        Returns:
+            List[ModelHeartbeat]: The heartbeats of the processes found dead.
+        '''
+        host = socket.gethostname()
+        now = time()
+        dead = {}
+        for heartbeat in ModelHeartbeat.get_all():
+            if heartbeat.host == host:
+                if not is_process_alive(heartbeat.pid):
+                    dead[heartbeat.worker] = (heartbeat, 'is no longer running')
+            elif heartbeat.last_beat < now - Scheduling.HEARTBEAT_TIMEOUT:
+                dead[heartbeat.worker] = (heartbeat, f'sent no heartbeat for {now - heartbeat.last_beat:.0f}s')
+
+        # Only the processes known dead: one that started after the heartbeats were read has no heartbeat here
+        for log_flow in ModelLogExecutionFlow.get_all_endtime_is_none():
+            # Executions started before the heartbeats were added have no worker
+            if not log_flow.worker:
+                continue
+            if log_flow.worker in dead:
+                reason = dead[log_flow.worker][1]
+            elif Reaper._is_gone(log_flow.worker, host):
+                reason = 'exited'
+            else:
+                continue
+            Reaper._close_execution(log_flow, f'Orphaned execution: process {log_flow.worker} {reason}')
+
+        for flow in ModelFlow.get_all() or []:
+            pid = (flow.running_process or {}).get('process_pid')
+            if not (flow.running and pid):
+                continue
+            worker = f"{flow.running_process.get('host', host)}:{pid}"
+            if worker in dead or Reaper._is_gone(worker, host):
+                flow.running = False
+                flow.running_process = None
+                flow.update(**flow.__dict__)
+                logger.warning(f'Flow [{flow.name}] was scheduled by process {worker}, which died')
+                if restart and Scheduling.REAP_RESTART:
+                    restart(flow)
+
+        for worker in dead:
+            ModelHeartbeat.delete(worker)
+        return [heartbeat for heartbeat, _reason in dead.values()]
+
+    @staticmethod
+    def _is_gone(worker: str, host: str):
+        '''
+        Returns True when the process '<host>:<pid>' is of this host and its PID no longer exists.
+        '''
+        worker_host, _, pid = worker.rpartition(':')
+        return worker_host == host and pid.isdigit() and not is_process_alive(int(pid))
+
+    @staticmethod
+    def close_executions(flow_name: str, worker: str, error: str):
+        '''
+        Closes the unfinished executions of a flow left by a process, before the flow runs again
+        in another process (a run whose lease expired, see `ModelRunQueue.claim`). Otherwise the
+        new run would continue the execution left open.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow'.
+            - worker (str): The process that left the executions, as '<host>:<pid>'.
+            - error (str): The error written in their unfinished tasks.
+        '''
+        for log_flow in ModelLogExecutionFlow.get_all_endtime_is_none():
+            if log_flow.name == flow_name and log_flow.worker == worker:
+                Reaper._close_execution(log_flow, error)
+
+    @staticmethod
+    def _close_execution(log_flow: ModelLogExecutionFlow, error: str):
+        '''
+        Closes an execution left unfinished, with an error in its unfinished tasks.
+        '''
+        end_time = current_time_formatted()
+        ids_task = log_flow.ids_task or []
+        ids_error_task = log_flow.ids_error_task or []
+        for task in ModelTask.get_all_by_log_flow_id(log_flow.id, log_flow.ids_task):
+            if task.end_time is None:
+                task.error = error
+                task.end_time = end_time
+                task.execution_date = end_time
+                task.update(**{key: value for key, value in task.__dict__.items() if key != 'error_size'})
+                Rollups.record_task(log_flow.name, task)
+                if task.id not in ids_task:
+                    ids_task.append(task.id)
+                ids_error_task.append(task.id)
+
+        log_flow.ids_task = ids_task
+        log_flow.ids_error_task = ids_error_task
+        log_flow.end_time = end_time
+        log_flow.update(**log_flow.__dict__)
+        Rollups.record_execution(log_flow.name, log_flow)
+        ArtifactStore.release(log_flow.id)
+        logger.warning(f'Flow [{log_flow.name}] execution {log_flow.id} closed: {error}')
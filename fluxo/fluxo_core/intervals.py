@@ -1,3 +1,37 @@
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+from fluxo.fluxo_core.cron import CronExpression
+
+
+class Seconds:
+    '''
+    A class representing time in seconds.
+
+    Args:
+        - seconds (int): The number of seconds (1 or more).
+        - fixed_rate (bool): If True, the fires are kept on a fixed grid (see `Minutes`).
+
+    Attributes:
+        - seconds (int): The number of seconds.
+
+    Methods:
+        - format(): Returns a dictionary with the 'seconds' key representing the time.
+
+    Example:
+    >>> time = Seconds(10, fixed_rate=True)
+    >>> time.format()
+    {'seconds': 10, 'fixed_rate': True}
+    '''
+    def __init__(self, seconds: int, fixed_rate: bool = False) -> None:
+        if not (isinstance(seconds, int) and seconds >= 1):
+            raise ValueError("Seconds must be an integer greater than 0.")
+
+        self.seconds = seconds
+        self.fixed_rate = fixed_rate
+
+    def format(self):
+        return _with_fixed_rate({'seconds': self.seconds}, self.fixed_rate)
 
 
 class Minutes:
@@ -7,6 +41,8 @@ class Minutes:
     Args:
         - minutes (int): The number of minutes.
         - seconds (int): The number of seconds (0 to 59).
+        - fixed_rate (bool): If True, the fires are kept on a fixed grid anchored to the first
+            fire, so the duration of the executions does not delay the next ones.
 
     Attributes:
         - minutes (int): The number of minutes.
@@ -20,22 +56,23 @@ class Minutes:
     >>> time.format()
     {'minutes': 5, 'at': ':30'}
     '''
-    def __init__(self, minutes: int, seconds: int) -> None:
+    def __init__(self, minutes: int, seconds: int, fixed_rate: bool = False) -> None:
         if not isinstance(minutes, int):
             raise ValueError("Minutes must be an integer.")
-        
+
         if not (isinstance(seconds, int) and 0 <= seconds <= 59):
             raise ValueError("Seconds must be a int representing a two-digit integer between 0 and 59.")
-        
+
         if not seconds >= 10:
             seconds = ''.join(['0',str(seconds)])
 
         self.minutes = minutes
         self.seconds = seconds
+        self.fixed_rate = fixed_rate
 
     def format(self):
-        return {'minutes': self.minutes, 'at': f':{self.seconds}'}
-    
+        return _with_fixed_rate({'minutes': self.minutes, 'at': f':{self.seconds}'}, self.fixed_rate)
+
 
 class Hours:
     '''
@@ -44,6 +81,7 @@ class Hours:
     Args:
         - hours (int): The number of hours.
         - minutes (int): The number of minutes (0 to 59).
+        - fixed_rate (bool): If True, the fires are kept on a fixed grid (see `Minutes`).
 
     Attributes:
         - hours (int): The number of hours.
@@ -57,23 +95,24 @@ class Hours:
     >>> time.format()
     {'hours': 3, 'at': ':45'}
     '''
-    
-    def __init__(self, hours: int, minutes: int) -> None:
+
+    def __init__(self, hours: int, minutes: int, fixed_rate: bool = False) -> None:
         if not isinstance(hours, int):
             raise ValueError("Hours must be an integer.")
-        
+
         if not (isinstance(minutes, int) and 0 <= minutes <= 59):
             raise ValueError("Minutes must be a int representing a two-digit integer between 0 and 59.")
-        
+
         if not minutes >= 10:
             minutes = ''.join(['0',str(minutes)])
 
         self.hours = hours
         self.minutes = minutes
+        self.fixed_rate = fixed_rate
 
     def format(self):
-        return {'hours': self.hours, 'at': f':{self.minutes}'}
-    
+        return _with_fixed_rate({'hours': self.hours, 'at': f':{self.minutes}'}, self.fixed_rate)
+
 
 class Days:
     '''
@@ -82,7 +121,8 @@ class Days:
     Args:
         - days (int): The number of days.
         - hours_minutes (tuple): A tuple representing hours and minutes (0 to 23 and 0 to 59, respectively).
-    
+        - fixed_rate (bool): If True, the fires are kept on a fixed grid (see `Minutes`).
+
     Attributes:
         - days (int): The number of days.
         - hours (str): The formatted representation of hours as a two-digit string.
@@ -96,19 +136,19 @@ class Days:
     >>> time.format()
     {'days': 5, 'at': '18:30'}
     '''
-    def __init__(self, days: int, hours_minutes: tuple) -> None:
+    def __init__(self, days: int, hours_minutes: tuple, fixed_rate: bool = False) -> None:
         hours = hours_minutes[0]
         minutes = hours_minutes[1]
 
         if not isinstance(days, int):
             raise ValueError("Days must be an integer.")
-        
+
         if not (isinstance(hours_minutes, tuple) and 0 <= hours <= 23 and 0 <= minutes <= 59):
             raise ValueError("Hours and Minutes must be a tuple representing hours and minutes between (0,0) and (23,59).")
-        
+
         if not (isinstance(hours, int) and isinstance(minutes, int)):
             raise ValueError('Values in tuple must be integer.')
-        
+
         if not hours >= 10:
             hours = ''.join(['0',str(hours)])
 
@@ -118,6 +158,236 @@ class Days:
         self.days = days
         self.hours = hours
         self.minutes = minutes
+        self.fixed_rate = fixed_rate
 
     def format(self):
-        return {'days': self.days, 'at': f'{self.hours}:{self.minutes}'}
\ No newline at end of file
+        return _with_fixed_rate({'days': self.days, 'at': f'{self.hours}:{self.minutes}'}, self.fixed_rate)
+
+
+class Cron:
+    '''
+    A class representing a cron expression: `minute hour day-of-month month day-of-week`.
+
+    Args:
+        - expression (str): The cron expression, e.g. '*/5 8-18 * * 1-5' or '@daily'.
+
+    Attributes:
+        - expression (str): The cron expression.
+
+    Methods:
+        - format(): Returns a dictionary with the 'cron' key representing the expression.
+
+    Example:
+    >>> time = Cron('15 6 * * 1-5') # Weekdays at 06:15
+    >>> time.format()
+    {'cron': '15 6 * * 1-5'}
+    '''
+    def __init__(self, expression: str) -> None:
+        if not isinstance(expression, str):
+            raise ValueError("Cron expression must be a string.")
+
+        CronExpression.parse(expression) # Raises ValueError if the expression is invalid
+        self.expression = expression
+
+    def format(self):
+        return {'cron': self.expression}
+
+
+def describe_interval(interval: dict):
+    '''
+    Returns a short human readable description of an interval, e.g. 'every 5 min(s) at 30s'.
+
+    Parameters:
+        - interval (dict): The interval returned by `format()` of an interval class.
+
+    Returns:
+        str: The description, or an empty string if the interval is unknown.
+    '''
+    if not interval:
+        return ''
+    elif interval.get('cron'):
+        description = f'cron {interval.get("cron")}'
+    elif interval.get('seconds'):
+        description = f'every {interval.get("seconds")} sec(s)'
+    elif interval.get('minutes'):
+        description = f'every {interval.get("minutes")} min(s) at {interval.get("at")[1:]}s'
+    elif interval.get('hours'):
+        minutes, _, seconds = interval.get('at').lstrip(':').partition(':')
+        description = f'every {interval.get("hours")} hour(s) at {minutes}m{f"{seconds}s" if seconds else ""}'
+    elif interval.get('days'):
+        description = f'every {interval.get("days")} day(s) at {interval.get("at")}'
+    else:
+        return ''
+
+    if interval.get('offset'):
+        description += f' (spread +{interval.get("offset")}s)'
+    if interval.get('fixed_rate'):
+        description += ' (fixed rate)'
+    return description
+
+
+def spread_interval(interval: dict, name: str, window: int):
+    '''
+    Moves the fires of a flow by a deterministic offset (a hash of its name) inside a
+    window, so flows written with the same interval, e.g. `Minutes(1, 0)`, do not all
+    fire at the same second. The offset is kept in the 'offset' key; for minutes, hours
+    and days it is also added to 'at', so the returned interval shows the effective fire times.
+
+    Parameters:
+        - interval (dict): The interval returned by `format()` of an interval class.
+        - name (str): The name of the flow.
+        - window (int): The largest offset, in seconds. 0 disables spreading.
+
+    Returns:
+        dict: The interval with the offset applied.
+    '''
+    if not interval or not window or 'offset' in interval:
+        return interval
+
+    # The offset wraps around inside the phase that 'at' can express
+    if interval.get('minutes'):
+        window = min(window, 60)
+    elif interval.get('hours'):
+        window = min(window, 3600)
+    elif interval.get('days'):
+        window = min(window, 86400)
+    elif interval.get('seconds'):
+        window = min(window, interval.get('seconds'))
+
+    offset = zlib.crc32(name.encode()) % int(window)
+    if not offset:
+        return interval
+
+    spread = dict(interval, offset=offset)
+    if interval.get('minutes'):
+        second = (int(interval.get('at')[1:]) + offset) % 60
+        spread['at'] = f':{second:02d}'
+    elif interval.get('hours'):
+        total = (int(interval.get('at')[1:]) * 60 + offset) % 3600
+        spread['at'] = f'{total // 60:02d}:{total % 60:02d}'
+    elif interval.get('days'):
+        hours, minutes = interval.get('at').split(':')[:2]
+        total = (int(hours) * 3600 + int(minutes) * 60 + offset) % 86400
+        spread['at'] = f'{total // 3600:02d}:{total // 60 % 60:02d}:{total % 60:02d}'
+    return spread
+
+
+def interval_period(interval: dict):
+    '''
+    Returns the time between two fires of a fixed interval, or None for cron intervals.
+    '''
+    for unit in ('seconds', 'minutes', 'hours', 'days'):
+        if interval.get(unit):
+            return timedelta(**{unit: interval.get(unit)})
+    return None
+
+
+def missed_fire_times(interval: dict, last_fire: datetime, until: datetime):
+    '''
+    Yields the fire times of an interval after a fire and up to a time (inclusive), in order.
+
+    Parameters:
+        - interval (dict): The interval returned by `format()` of an interval class.
+        - last_fire (datetime): A past fire time; fixed intervals are counted from it.
+        - until (datetime): The last time to consider, usually now.
+    '''
+    if interval.get('cron'):
+        offset = timedelta(seconds=interval.get('offset', 0))
+        for fire_time in CronExpression.parse(interval.get('cron')).fire_times(last_fire - offset, until - offset):
+            yield fire_time + offset
+        return
+
+    period = interval_period(interval)
+    fire_time = last_fire + period
+    while fire_time <= until:
+        yield fire_time
+        fire_time += period
+
+
+def last_missed_fire_times(interval: dict, last_fire: datetime, until: datetime, keep: int):
+    '''
+    Counts the fire times of an interval after a fire and up to a time (inclusive), and returns
+    the last of them. For fixed intervals both are computed without walking the fires, so a long
+    outage of a flow that fires every second costs the same as a short one.
+
+    Parameters:
+        - interval (dict): The interval returned by `format()` of an interval class.
+        - last_fire (datetime): A past fire time; fixed intervals are counted from it.
+        - until (datetime): The last time to consider, usually now.
+        - keep (int): How many of the last fire times are returned.
+
+    Returns:
+        Tuple[int, List[datetime]]: The number of fire times, and the last `keep` of them in order.
+    '''
+    if interval.get('cron'):
+        count, fire_times = 0, deque(maxlen=keep)
+        for fire_time in missed_fire_times(interval, last_fire, until):
+            count += 1
+            fire_times.append(fire_time)
+        return count, list(fire_times)
+
+    period = interval_period(interval)
+    count = max((until - last_fire) // period, 0)
+    return count, [last_fire + period * number for number in range(max(count - keep + 1, 1), count + 1)]
+
+
+def next_fire_times(interval: dict, after: datetime, until: datetime, last_fire: datetime = None,
+                    first_fire: datetime = None):
+    '''
+    Yields the planned fire times of an interval after a time and up to a time (inclusive), in order.
+    The first one is found without walking the fires before it: from the latest known fire of the
+    flow (its last fire, or the first fire of its job when the job was scheduled after it), by
+    skipping whole periods, else from the 'at' of the interval, as the scheduler does for a new job.
+
+    Parameters:
+        - interval (dict): The interval returned by `format()` of an interval class.
+        - after (datetime): The fires after this time, usually now.
+        - until (datetime): The last time to consider.
+        - last_fire (datetime): The planned time of the last fire of the flow, if any.
+        - first_fire (datetime): The planned time of the first fire of the job of the flow, if any.
+    '''
+    if interval.get('cron'):
+        yield from missed_fire_times(interval, after, until)
+        return
+
+    period = interval_period(interval)
+    known_fire = max((fire for fire in (last_fire, first_fire) if fire is not None), default=None)
+    if known_fire is None:
+        fire_time = _first_fire_time(interval, after, period)
+    elif known_fire > after:
+        fire_time = known_fire # The job has not fired yet
+    else:
+        fire_time = known_fire + period * ((after - known_fire) // period + 1)
+    while fire_time <= until:
+        yield fire_time
+        fire_time += period
+
+
+def _first_fire_time(interval: dict, after: datetime, period: timedelta):
+    '''
+    Returns the first fire of a job started at `after`, like `schedule.Job._schedule_next_run`:
+    one period later at the 'at' of the unit, moved back one unit when the 'at' is still ahead
+    in the current unit. For days this is only done when the interval is one day.
+    '''
+    if interval.get('seconds'):
+        return after.replace(microsecond=0) + period + timedelta(seconds=interval.get('offset', 0))
+
+    at = [int(value) for value in interval.get('at').lstrip(':').split(':')]
+    if interval.get('minutes'):
+        at_time, unit = after.replace(second=at[0], microsecond=0), timedelta(minutes=1)
+    elif interval.get('hours'):
+        at_time, unit = after.replace(minute=at[0], second=(at[1:] or [0])[0], microsecond=0), timedelta(hours=1)
+    else:
+        at_time, unit = after.replace(hour=at[0], minute=at[1], second=(at[2:] or [0])[0], microsecond=0), timedelta(days=1)
+
+    fire_time = at_time + period
+    if at_time > after and (not interval.get('days') or interval.get('days') == 1):
+        fire_time -= unit
+    return fire_time
+
+
+def _with_fixed_rate(interval: dict, fixed_rate: bool):
+    # The key is left out by default, so the intervals stored before it existed stay equal
+    if fixed_rate:
+        interval['fixed_rate'] = True
+    return interval
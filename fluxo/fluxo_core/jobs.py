@@ -0,0 +1,83 @@
+import math
+import time
+import schedule
+from datetime import datetime, timedelta
+from fluxo.fluxo_core.cron import CronExpression
+
+
+class CronJob(schedule.Job):
+    '''
+    A `schedule` job whose next run is the next fire time of a cron expression (plus
+    an optional offset in seconds), instead of the last run plus a fixed period.
+
+    Example:
+        ```
+        CronJob('*/5 8-18 * * 1-5', schedule.default_scheduler).do(my_function)
+        ```
+    '''
+    def __init__(self, expression: str, scheduler: schedule.Scheduler = None, offset: int = 0):
+        super().__init__(1, scheduler)
+        self.expression = CronExpression.parse(expression)
+        self.offset = timedelta(seconds=offset) # Every fire is moved by this (see `spread_interval`)
+
+    def _schedule_next_run(self) -> None:
+        self.next_run = self.expression.next_fire(datetime.now() - self.offset) + self.offset
+
+    def __str__(self) -> str:
+        return f'CronJob(expression={self.expression.expression!r}, do={self.job_func})'
+
+    def __repr__(self) -> str:
+        return f'CronJob({self.expression.expression!r}, next run: {self.next_run})'
+
+
+class FixedRateJob(schedule.Job):
+    '''
+    A `schedule` job that fires at `first_run + k * period`, on a grid anchored to the
+    monotonic clock. With `schedule`'s own jobs the next run is counted from the end of
+    the last one, so the duration of the executions accumulates as drift; here it does
+    not move the next fires. Fires that pass while an execution is still running are skipped.
+
+    Methods:
+        - from_job(job): Creates a fixed rate job with the period and first run of a `schedule` job.
+    '''
+    def __init__(self, period: timedelta, first_run: datetime, scheduler: schedule.Scheduler = None):
+        super().__init__(1, scheduler)
+        self.period = period
+        self._first_run = first_run
+        self._origin = time.monotonic() + (first_run - datetime.now()).total_seconds()
+        self._fires = None # Index of the next fire in the grid
+        self._next_monotonic = None
+
+    @staticmethod
+    def from_job(job: schedule.Job, delay: timedelta = timedelta(0)):
+        '''
+        Creates a fixed rate job from a configured (and not yet registered) `schedule` job,
+        e.g. `schedule.every(5).minutes.at(':30')`, keeping its period and first run.
+
+        Parameters:
+            - job (schedule.Job): The configured job.
+            - delay (timedelta): Moves the first run, and so the whole grid, later.
+        '''
+        job._schedule_next_run()
+        return FixedRateJob(job.period, job.next_run + delay, job.scheduler)
+
+    @property
+    def should_run(self) -> bool:
+        return time.monotonic() >= self._next_monotonic
+
+    def _schedule_next_run(self) -> None:
+        period = self.period.total_seconds()
+        if self._fires is None:
+            self._fires = 0
+        else:
+            elapsed = time.monotonic() - self._origin
+            self._fires = max(self._fires + 1, math.floor(elapsed / period) + 1)
+
+        self._next_monotonic = self._origin + self._fires * period
+        self.next_run = self._first_run + self._fires * self.period
+
+    def __str__(self) -> str:
+        return f'FixedRateJob(period={self.period}, do={self.job_func})'
+
+    def __repr__(self) -> str:
+        return f'FixedRateJob({self.period}, next run: {self.next_run})'
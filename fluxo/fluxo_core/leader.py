@@ -0,0 +1,84 @@
+import os
+import socket
+from time import time
+from fluxo.settings import Db, Scheduling
+from fluxo.fluxo_core.database.leader import ModelLeader
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+
+class LeaderElection:
+    '''
+    Elects one leader among the processes of a role, e.g. the scheduler instances that
+    share a database. Two locks are used:
+
+        - A lock file next to the database (`flock`), held by one process per machine.
+          The kernel frees it when the process dies, so a standby of the same machine
+          takes over at once.
+        - A lease row in 'TB_Leader', renewed every third of the TTL, for the processes
+          of other machines. They take over when the lease expires.
+
+    A leader only acts while its own lease is valid by its clock (`is_leader`), so it stops
+    before a standby can take the expired lease, and a fire is never sent by both.
+
+    Methods:
+        - poll(): Takes or renews the leadership, if possible.
+        - is_leader: True while the lease is valid.
+        - release(): Gives up the leadership.
+    '''
+    def __init__(self, name: str = 'scheduler', ttl: float = Scheduling.LEADER_TTL):
+        self.name = name
+        self.ttl = ttl
+        self.host = socket.gethostname()
+        self.holder = f'{self.host}:{os.getpid()}'
+        self.previous_holder = None # Set when the leadership was taken from a dead or stuck leader
+        self._lease_until = 0
+        self._lock_file = None
+
+    @property
+    def is_leader(self):
+        # A margin of a tenth of the TTL covers the time between the check and the dispatch
+        return time() < self._lease_until - self.ttl / 10
+
+    def poll(self):
+        '''
+        Takes the leadership if it is free, or renews it if this process is the leader.
+
+        Returns:
+            bool: True if this process is the leader.
+        '''
+        if fcntl and self._lock_file is None:
+            lock_file = open(f'{Db.PATH}.{self.name}.lock', 'w')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return False # The leader, or the standby in line, of this machine holds it
+            self._lock_file = lock_file
+
+        now = time()
+        # Holding the lock file, any other holder of this machine is dead
+        acquired, previous_holder = ModelLeader.acquire(
+            self.name, self.holder, self.ttl, self.host if self._lock_file else None)
+        if acquired:
+            self._lease_until = now + self.ttl
+            if previous_holder:
+                self.previous_holder = previous_holder
+        else:
+            self._lease_until = 0
+        return acquired
+
+    def release(self):
+        '''
+        Gives up the leadership, so the next leader starts fresh instead of taking over.
+        '''
+        if self._lease_until:
+            ModelLeader.release(self.name, self.holder)
+            self._lease_until = 0
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
@@ -0,0 +1,345 @@
+import os
+import json
+import atexit
+import threading
+from time import sleep
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from fluxo.settings import Metrics
+from fluxo.logging import logger
+from fluxo.uttils import is_process_alive
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+
+
+class _Metric:
+    type: str = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {} # {labels (tuple): value}
+        MetricsRegistry.register(self)
+
+
+class Counter(_Metric):
+    '''
+    A value that only goes up, e.g. the number of task executions.
+
+    Example:
+        ```
+        TASK_RUNS.inc('My Flow 1', 'My Task 1', 'success')
+        ```
+    '''
+    type = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        if not Metrics.ENABLED:
+            return
+        with MetricsRegistry._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+        MetricsRegistry._mark_dirty()
+
+
+class Gauge(_Metric):
+    '''
+    A value that goes up and down, e.g. the number of active workers. The values of
+    each process are summed, and processes that are no longer alive are left out.
+    '''
+    type = 'gauge'
+
+    def set(self, value: float, *labels):
+        if not Metrics.ENABLED:
+            return
+        with MetricsRegistry._lock:
+            self._values[labels] = value
+        MetricsRegistry._mark_dirty()
+
+    def inc(self, *labels, amount: float = 1):
+        if not Metrics.ENABLED:
+            return
+        with MetricsRegistry._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+        MetricsRegistry._mark_dirty()
+
+
+class Histogram(_Metric):
+    '''
+    Counts observations, e.g. durations in seconds, in cumulative buckets.
+
+    Example:
+        ```
+        TASK_DURATION.observe(1.25, 'My Flow 1', 'My Task 1')
+        ```
+    '''
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = list(buckets)
+
+    def observe(self, value: float, *labels):
+        if not Metrics.ENABLED:
+            return
+        with MetricsRegistry._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._values[labels] = entry
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+        MetricsRegistry._mark_dirty()
+
+
+class MetricsRegistry:
+    '''
+    Holds the metrics of the process and aggregates the metrics of all fluxo processes.
+
+    Every process writes its values to `Metrics.DIR/<pid>.json` (at most once per
+    `Metrics.FLUSH_INTERVAL`). `collect()` sums the files of all processes: counters
+    and histograms of processes that exited are folded into `aggregate.json`, so they
+    keep growing, while gauges only count processes that are alive.
+
+    Methods:
+        - register(metric): Adds a metric to the registry.
+        - flush(): Writes the values of this process to its file.
+        - collect(): Returns the metrics of all processes in the Prometheus text format.
+    '''
+    _metrics: dict = {} # {name: metric}
+    _lock = threading.Lock()
+    _dirty: bool = False
+    _flusher_pid: int = None
+
+    @staticmethod
+    def register(metric: _Metric):
+        MetricsRegistry._metrics[metric.name] = metric
+
+    @staticmethod
+    def flush():
+        '''
+        Writes the values of this process to `Metrics.DIR/<pid>.json`.
+        '''
+        with MetricsRegistry._lock:
+            MetricsRegistry._dirty = False
+            snapshot = {
+                name: {json.dumps(list(labels)): value for labels, value in metric._values.items()}
+                for name, metric in MetricsRegistry._metrics.items()
+            }
+
+        os.makedirs(Metrics.DIR, exist_ok=True)
+        path = os.path.join(Metrics.DIR, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def collect():
+        '''
+        Returns the metrics of all fluxo processes in the Prometheus text format.
+        '''
+        MetricsRegistry.flush()
+
+        totals = {name: {} for name in MetricsRegistry._metrics}
+        with _DirectoryLock():
+            aggregate = MetricsRegistry._read(os.path.join(Metrics.DIR, 'aggregate.json'))
+            dead_processes = []
+
+            for file in os.listdir(Metrics.DIR):
+                if not (file.endswith('.json') and file[:-5].isdigit()):
+                    continue
+                pid = int(file[:-5])
+                snapshot = MetricsRegistry._read(os.path.join(Metrics.DIR, file))
+                if is_process_alive(pid):
+                    MetricsRegistry._merge(totals, snapshot, with_gauges=True)
+                else:
+                    MetricsRegistry._merge(aggregate, snapshot, with_gauges=False)
+                    dead_processes.append(file)
+
+            if dead_processes:
+                with open(os.path.join(Metrics.DIR, 'aggregate.json'), 'w') as file:
+                    json.dump(aggregate, file)
+                for file in dead_processes:
+                    os.remove(os.path.join(Metrics.DIR, file))
+
+        MetricsRegistry._merge(totals, aggregate, with_gauges=False)
+        return MetricsRegistry._render(totals)
+
+    @staticmethod
+    def _mark_dirty():
+        MetricsRegistry._dirty = True
+        if MetricsRegistry._flusher_pid != os.getpid():
+            MetricsRegistry._flusher_pid = os.getpid()
+            threading.Thread(target=MetricsRegistry._flush_periodically, daemon=True).start()
+
+    @staticmethod
+    def _flush_periodically():
+        while True:
+            sleep(Metrics.FLUSH_INTERVAL)
+            if MetricsRegistry._dirty:
+                try:
+                    MetricsRegistry.flush()
+                except OSError as err:
+                    logger.warning(f'Metrics could not be written: {err}')
+
+    @staticmethod
+    def _reset_after_fork():
+        '''
+        A forked process starts from zero, otherwise the values of the parent would be counted twice.
+        '''
+        MetricsRegistry._lock = threading.Lock()
+        MetricsRegistry._dirty = False
+        for metric in MetricsRegistry._metrics.values():
+            metric._values = {}
+
+    @staticmethod
+    def _read(path: str):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _merge(totals: dict, snapshot: dict, with_gauges: bool):
+        '''
+        Adds the values of a snapshot to the totals.
+        '''
+        for name, samples in snapshot.items():
+            metric = MetricsRegistry._metrics.get(name)
+            if metric is None or (metric.type == 'gauge' and not with_gauges):
+                continue
+            merged = totals.setdefault(name, {})
+            for labels, value in samples.items():
+                if metric.type == 'histogram':
+                    entry = merged.setdefault(labels, {'buckets': [0] * len(metric.buckets), 'sum': 0.0, 'count': 0})
+                    entry['buckets'] = [a + b for a, b in zip(entry['buckets'], value['buckets'])]
+                    entry['sum'] += value['sum']
+                    entry['count'] += value['count']
+                else:
+                    merged[labels] = merged.get(labels, 0) + value
+
+    @staticmethod
+    def _render(totals: dict):
+        '''
+        Formats the aggregated values in the Prometheus text exposition format.
+        '''
+        lines = []
+        for name, samples in totals.items():
+            metric = MetricsRegistry._metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+
+            for labels, value in samples.items():
+                labels = dict(zip(metric.labelnames, json.loads(labels)))
+                if metric.type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value['buckets']):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels({**labels, "le": bound})} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels({**labels, "le": "+Inf"})} {value["count"]}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class _DirectoryLock:
+    '''
+    Exclusive lock on `Metrics.DIR`, so the scheduler and the server do not
+    fold the files of exited processes at the same time.
+    '''
+    def __enter__(self):
+        os.makedirs(Metrics.DIR, exist_ok=True)
+        self.file = open(os.path.join(Metrics.DIR, '.lock'), 'w')
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def _format_labels(labels: dict):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def start_http_server(port: int, host: str = Metrics.HOST):
+    '''
+    Serves the aggregated metrics at `http://<host>:<port>/metrics` in a background thread.
+
+    Parameters:
+        - port (int): The port to listen on.
+        - host (str): The address to listen on. Defaults to `Metrics.HOST`.
+    '''
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = MetricsRegistry.collect().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f'Metrics available at http://{host}:{port}/metrics')
+    return server
+
+
+def _flush_at_exit():
+    if Metrics.ENABLED and MetricsRegistry._dirty:
+        MetricsRegistry.flush()
+
+
+os.register_at_fork(after_in_child=MetricsRegistry._reset_after_fork)
+atexit.register(_flush_at_exit)
+
+
+TASK_RUNS = Counter(
+    'fluxo_task_runs_total', 'Task executions by final status.', ('flow', 'task', 'status'))
+TASK_DURATION = Histogram(
+    'fluxo_task_duration_seconds', 'Wall time of the task executions.', ('flow', 'task'))
+SCHEDULE_LAG = Histogram(
+    'fluxo_schedule_lag_seconds', 'Delay between the planned and the actual start of a flow execution.', ('flow',))
+SCHEDULE_JITTER = Histogram(
+    'fluxo_schedule_jitter_seconds', 'Deviation of the time between two flow executions from the planned time between them.',
+    ('flow',), buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+MISFIRES = Counter(
+    'fluxo_schedule_misfires_total', 'Fires missed while the scheduler was down, by action (run or skipped).', ('flow', 'action'))
+DB_STATEMENT_DURATION = Histogram(
+    'fluxo_db_statement_duration_seconds', 'Latency of the SQLite statements.', ('operation',))
+CONCURRENCY_WAIT = Histogram(
+    'fluxo_concurrency_wait_seconds', 'Time a flow execution waited for its concurrency limits.', ('flow',))
+CONCURRENCY_WAITING = Gauge(
+    'fluxo_concurrency_waiting', 'Flow executions waiting for a slot, by limit (global or tag-<name>).', ('limit',))
+RUN_QUEUE_DEPTH = Gauge(
+    'fluxo_run_queue_depth', 'Flow executions waiting for a worker of the dispatcher, by priority.', ('priority',))
+RUN_QUEUE_WAIT = Histogram(
+    'fluxo_run_queue_wait_seconds', 'Time a flow execution waited for a worker of the dispatcher, by priority.', ('priority',))
+WORKERS = Gauge(
+    'fluxo_workers', 'Worker processes by state (active or idle).', ('state',))
@@ -0,0 +1,126 @@
+import os
+import cProfile
+import pstats
+from fluxo.settings import Profiling
+from fluxo.logging import logger
+from fluxo.fluxo_core.database.profile_request import ModelProfileRequest
+
+
+class Profiler:
+    '''
+    Profiles the next invocations of a flow or task with `cProfile`, on request.
+
+    Requests come from the UI (rows of 'TB_ProfileRequest') or from the `FLUXO_PROFILE`
+    environment variable, e.g. `FLUXO_PROFILE='My Flow 1=3;My Flow 2/My Task 1=5'`
+    profiles the next 3 invocations of every task of 'My Flow 1' and the next 5
+    invocations of 'My Task 1'. The stats are saved to `Profiling.DIR/task_<id>.pstats`.
+
+    Methods:
+        - start(flow_id, flow_name, task_name): Starts a profiler if the invocation was requested.
+        - stop(profile, task_id): Stops the profiler and saves its stats.
+        - top_functions(path, limit): Summarizes the functions with the highest cumulative time.
+    '''
+    _env_requests: dict = None # {(flow_name, task_name or None): remaining}
+
+    @staticmethod
+    def start(flow_id: int, flow_name: str, task_name: str):
+        '''
+        Starts a profiler if this invocation of the task was requested.
+
+        Parameters:
+            - flow_id (int): The ID of the 'Flow' of the task.
+            - flow_name (str): The name of the 'Flow' of the task.
+            - task_name (str): The name of the task about to be invoked.
+
+        Returns:
+            cProfile.Profile or None: The enabled profiler, or None if the invocation is not profiled.
+        '''
+        if not (Profiler._consume_env_request(flow_name, task_name) or
+                ModelProfileRequest.consume(flow_id, task_name)):
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as err: # Another profiler is already active
+            logger.warning(f'Task [{task_name}] can not be profiled: {err}')
+            return None
+        return profile
+
+    @staticmethod
+    def stop(profile: cProfile.Profile, task_id: int):
+        '''
+        Stops the profiler and saves its stats.
+
+        Parameters:
+            - profile (cProfile.Profile): The enabled profiler.
+            - task_id (int): The ID of the profiled task register.
+
+        Returns:
+            str: The path of the pstats file.
+        '''
+        profile.disable()
+        os.makedirs(Profiling.DIR, exist_ok=True)
+        path = os.path.join(Profiling.DIR, f'task_{task_id}.pstats')
+        profile.dump_stats(path)
+        logger.info(f'Profile of task [{task_id}] saved in {path}')
+        return path
+
+    @staticmethod
+    def top_functions(path: str, limit: int = 10):
+        '''
+        Summarizes the functions with the highest cumulative time in a pstats file.
+
+        Parameters:
+            - path (str): The path of the pstats file.
+            - limit (int): How many functions to return.
+
+        Returns:
+            list: Dicts with 'function', 'calls', 'total_time' and 'cumulative_time', or None if the file is missing.
+        '''
+        if not path or not os.path.exists(path):
+            return None
+
+        stats = pstats.Stats(path).stats
+        functions = []
+        for (file, line, name), (_primitive_calls, calls, total_time, cumulative_time, _callers) in stats.items():
+            functions.append({
+                # Built-in functions have no file ('~')
+                'function': name if file == '~' else f'{name} ({os.path.basename(file)}:{line})',
+                'calls': calls,
+                'total_time': total_time,
+                'cumulative_time': cumulative_time,
+            })
+        functions.sort(key=lambda function: function['cumulative_time'], reverse=True)
+        return functions[:limit]
+
+    @staticmethod
+    def _consume_env_request(flow_name: str, task_name: str):
+        '''
+        Uses one invocation of a `FLUXO_PROFILE` request that matches the task, if any.
+        '''
+        if Profiler._env_requests is None:
+            Profiler._env_requests = Profiler._parse_env(Profiling.FROM_ENV)
+
+        for key in [(flow_name, task_name), (flow_name, None)]:
+            if Profiler._env_requests.get(key, 0) > 0:
+                Profiler._env_requests[key] -= 1
+                return True
+        return False
+
+    @staticmethod
+    def _parse_env(value: str):
+        '''
+        Parses 'Flow=N;Flow/Task=N' into {(flow_name, task_name or None): N}.
+        '''
+        requests = {}
+        for item in value.split(';'):
+            if '=' not in item:
+                continue
+            target, runs = item.rsplit('=', 1)
+            flow_name, _, task_name = target.strip().partition('/')
+            try:
+                requests[(flow_name, task_name or None)] = int(runs)
+            except ValueError:
+                logger.warning(f'Invalid FLUXO_PROFILE entry: {item}')
+        return requests
@@ -0,0 +1,105 @@
+import sys
+import time
+from dataclasses import dataclass
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+
+@dataclass
+class ResourceUsage:
+    '''
+    Snapshot of the resources used by the current process, taken around a task invocation.
+
+    Attributes:
+        - wall_time (float): Monotonic clock, in seconds.
+        - cpu_time (float): CPU time of the process (user + system), in seconds.
+        - thread_cpu_time (float): CPU time of the current thread, in seconds.
+        - max_rss (int): Peak resident set size of the process, in bytes. None if unavailable.
+        - read_bytes (int): Bytes read from storage by the process (`/proc/self/io`). None if unavailable.
+        - write_bytes (int): Bytes written to storage by the process (`/proc/self/io`). None if unavailable.
+
+    Methods:
+        - snapshot(): Returns the current resource usage.
+        - since(start): Returns the resources used between `start` and this snapshot.
+
+    Example:
+        ```
+        start = ResourceUsage.snapshot()
+        ...
+        usage = ResourceUsage.snapshot().since(start)
+        ```
+    '''
+    wall_time: float = None
+    cpu_time: float = None
+    thread_cpu_time: float = None
+    max_rss: int = None
+    read_bytes: int = None
+    write_bytes: int = None
+
+    @staticmethod
+    def snapshot():
+        '''
+        Returns the current resource usage of the process and thread.
+        '''
+        read_bytes, write_bytes = ResourceUsage._read_proc_io()
+        return ResourceUsage(
+            wall_time=time.perf_counter(),
+            cpu_time=time.process_time(),
+            thread_cpu_time=time.thread_time(),
+            max_rss=ResourceUsage._read_max_rss(),
+            read_bytes=read_bytes,
+            write_bytes=write_bytes
+        )
+
+    def since(self, start):
+        '''
+        Returns the resources used between the `start` snapshot and this one.
+
+        `max_rss` becomes how much the peak RSS grew: since the peak is a high-water mark
+        of the whole process, a task that stays below an earlier peak reports 0.
+
+        Parameters:
+            - start (ResourceUsage): The snapshot taken before the invocation.
+
+        Returns:
+            ResourceUsage: The difference between both snapshots.
+        '''
+        def diff(end, begin):
+            if end is None or begin is None:
+                return None
+            return end - begin
+
+        return ResourceUsage(
+            wall_time=diff(self.wall_time, start.wall_time),
+            cpu_time=diff(self.cpu_time, start.cpu_time),
+            thread_cpu_time=diff(self.thread_cpu_time, start.thread_cpu_time),
+            max_rss=diff(self.max_rss, start.max_rss),
+            read_bytes=diff(self.read_bytes, start.read_bytes),
+            write_bytes=diff(self.write_bytes, start.write_bytes)
+        )
+
+    @staticmethod
+    def _read_max_rss():
+        '''
+        Returns the peak RSS of the process in bytes, or None if `resource` is not available.
+        '''
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+    @staticmethod
+    def _read_proc_io():
+        '''
+        Returns (read_bytes, write_bytes) from `/proc/self/io`, or (None, None) outside Linux.
+        '''
+        try:
+            with open('/proc/self/io') as file:
+                counters = dict(line.split(': ') for line in file.read().splitlines())
+            return int(counters['read_bytes']), int(counters['write_bytes'])
+        except (OSError, KeyError, ValueError):
+            return None, None
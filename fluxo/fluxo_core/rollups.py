@@ -0,0 +1,49 @@
+from fluxo.logging import logger
+from fluxo.uttils import convert_str_to_datetime
+from fluxo.fluxo_core.database.task import ModelTask
+from fluxo.fluxo_core.database.rollup import ModelRollup
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+
+class Rollups:
+    '''
+    Counts the finished executions of the tasks and of the flows in their hourly and daily
+    rollups (`ModelRollup`), read by the analytics of the API. A failure to count one is
+    logged and never fails the execution.
+
+    Methods:
+        - record_task(flow_name, task): Counts a finished execution of a task.
+        - record_execution(flow_name, log_flow): Counts a finished execution of a whole flow.
+    '''
+    @staticmethod
+    def record_task(flow_name: str, task: ModelTask):
+        '''
+        Counts a finished execution of a task, with its wall time or, when it was not
+        measured, the time between its start and its end.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow' of the task.
+            - task (ModelTask): The task register, with its end time.
+        '''
+        Rollups._record(flow_name, task.name, task.start_time, task.end_time, task.wall_time, bool(task.error))
+
+    @staticmethod
+    def record_execution(flow_name: str, log_flow: ModelLogExecutionFlow):
+        '''
+        Counts a finished execution of a whole flow, as the task ''.
+
+        Parameters:
+            - flow_name (str): The name of the 'Flow'.
+            - log_flow (ModelLogExecutionFlow): The execution, with its end time.
+        '''
+        Rollups._record(flow_name, '', log_flow.start_time, log_flow.end_time, None, bool(log_flow.ids_error_task))
+
+    @staticmethod
+    def _record(flow_name: str, task_name: str, start_time: str, end_time: str, duration: float, error: bool):
+        try:
+            finished_at = convert_str_to_datetime(end_time)
+            if duration is None:
+                duration = (finished_at - convert_str_to_datetime(start_time or end_time)).total_seconds()
+            ModelRollup.add(flow_name, task_name, finished_at, duration, error)
+        except Exception as err:
+            logger.error(f'Error counting [{flow_name}] {task_name} in the rollups: {err}')
@@ -0,0 +1,73 @@
+import math
+from fluxo.settings import Analytics
+
+
+GAMMA = (1 + Analytics.RELATIVE_ACCURACY) / (1 - Analytics.RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+class DDSketch:
+    '''
+    Quantile sketch of durations with a relative accuracy (DDSketch): a duration is counted in
+    the bucket `ceil(log(duration) / log(gamma))`, gamma = (1 + a) / (1 - a), and every duration
+    of a bucket is within a relative error `Analytics.RELATIVE_ACCURACY` of its estimate. A sketch
+    is only the counts of its buckets, so sketches merge by adding their counts, e.g. with a
+    `SUM(count) ... GROUP BY bucket` over the hours of a day.
+
+    Methods:
+        - bucket(duration): The bucket a duration is counted in.
+        - value(bucket): The estimate of the durations of a bucket.
+        - quantiles(counts, qs): The estimates of some quantiles of a sketch.
+    '''
+    @staticmethod
+    def bucket(duration: float):
+        '''
+        Returns the bucket a duration is counted in.
+
+        Parameters:
+            - duration (float): The duration, in seconds.
+
+        Returns:
+            int: The bucket.
+        '''
+        return math.ceil(math.log(max(duration, Analytics.MIN_DURATION)) / LOG_GAMMA)
+
+    @staticmethod
+    def value(bucket: int):
+        '''
+        Returns the estimate of the durations of a bucket, the one with the least relative error.
+
+        Parameters:
+            - bucket (int): The bucket.
+
+        Returns:
+            float: The duration, in seconds.
+        '''
+        return 2 * GAMMA ** bucket / (GAMMA + 1)
+
+    @staticmethod
+    def quantiles(counts: dict, qs: tuple = (0.5, 0.95, 0.99)):
+        '''
+        Returns the estimates of some quantiles of a sketch.
+
+        Parameters:
+            - counts (dict): The number of durations of each bucket, by bucket.
+            - qs (tuple): The quantiles, between 0 and 1.
+
+        Returns:
+            List[float]: The duration of each quantile, in seconds. None for each when the sketch is empty.
+        '''
+        total = sum(counts.values())
+        if total == 0:
+            return [None for _ in qs]
+
+        buckets = sorted(counts.items())
+        values = []
+        for q in qs:
+            rank, cumulative = q * (total - 1), 0
+            for bucket, count in buckets:
+                cumulative += count
+                if cumulative > rank:
+                    break
+            values.append(DDSketch.value(bucket))
+        return values
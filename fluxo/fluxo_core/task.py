@@ -2,6 +2,13 @@ import traceback
 from fluxo.logging import logger
 from datetime import datetime
 from fluxo.fluxo_core.flow import Flow
+from fluxo.fluxo_core.artifacts import ArtifactStore
+from fluxo.fluxo_core.resources import ResourceUsage
+from fluxo.fluxo_core.tracing import Tracer
+from fluxo.fluxo_core.profiling import Profiler
+from fluxo.fluxo_core.heartbeat import Heartbeat
+from fluxo.fluxo_core.rollups import Rollups
+from fluxo.fluxo_core.metrics import TASK_RUNS, TASK_DURATION
 from fluxo.fluxo_core.database.flow import ModelFlow
 from fluxo.fluxo_core.database.task import ModelTask
 from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
@@ -60,54 +67,107 @@ class Task:
         for tracking task execution.
         '''
         async def wrapper(*args, **kwargs):
-            # Retrieve the 'Flow' information from the database
-            flow_register_db = ModelFlow.get_by_name(
-                self.task_info.get('flow').name)
-
-            # Create a new 'ModelTask' instance and save it to the database
-            task = ModelTask(name=self.task_info.get(
-                'name'), flow_id=flow_register_db.id)
-            new_task = task.save()
-
-            # Params to update LogExecutionFlow
-            _params = {
-                'id_flow': flow_register_db.id,
-                'id_task': new_task.id
-            }
-
-            try:
-                # Call the original function
-                new_task.start_time = current_time_formatted()
-                new_task.update(**new_task.__dict__)
-                self._newlog_execution_flow(**_params)
-
-                # Function executed
-                result = await func(*args, **kwargs)
-
-                new_task.end_time = current_time_formatted()
-                new_task.execution_date = new_task.end_time
-
-                new_task.update(**new_task.__dict__)
-                self._update_log_execution_flow(**_params)
-
-                logger.info(f'Task [{new_task.name}] executed successfully')
-
-                return result
-            except Exception as err:
-                error = traceback.format_exc()
-                new_task.error = f'[Error in task: {new_task.name}]' + \
-                    '\n' + error
-                new_task.end_time = current_time_formatted()
-                new_task.execution_date = new_task.end_time
-
-                new_task.update(**new_task.__dict__)
-                self._update_log_execution_flow(**_params)
-
-                logger.info(f'Task [{new_task.name}] executed with error')
+            with Tracer.span('task', root=True, task=self.task_info.get('name'),
+                             flow=self.task_info.get('flow').name) as span:
+                # Retrieve the 'Flow' information from the database
+                flow_register_db = ModelFlow.get_by_name(
+                    self.task_info.get('flow').name)
+
+                # Create a new 'ModelTask' instance and save it to the database
+                task = ModelTask(name=self.task_info.get(
+                    'name'), flow_id=flow_register_db.id)
+                new_task = task.save()
+
+                # Params to update LogExecutionFlow
+                _params = {
+                    'id_flow': flow_register_db.id,
+                    'id_task': new_task.id
+                }
+
+                usage_start = None
+                try:
+                    # Call the original function
+                    new_task.start_time = current_time_formatted()
+                    log_flow = self._newlog_execution_flow(**_params)
+                    new_task.log_flow_id = log_flow.id
+                    new_task.update(**{key: value for key, value in new_task.__dict__.items() if key != 'error_size'})
+
+                    # Function executed
+                    profile = Profiler.start(flow_register_db.id, flow_register_db.name, new_task.name)
+                    usage_start = ResourceUsage.snapshot()
+                    try:
+                        with Tracer.span('task.body'):
+                            result = await func(*args, **kwargs)
+                    finally:
+                        if profile is not None:
+                            new_task.profile_path = Profiler.stop(profile, new_task.id)
+                    self._set_resource_usage(new_task, ResourceUsage.snapshot().since(usage_start))
+
+                    # Keep the returned value for the next tasks of this execution
+                    ArtifactStore.put(log_flow.id, new_task.name, result)
+
+                    new_task.end_time = current_time_formatted()
+                    new_task.execution_date = new_task.end_time
+
+                    new_task.update(**{key: value for key, value in new_task.__dict__.items() if key != 'error_size'})
+                    self._update_log_execution_flow(**_params)
+
+                    logger.info(f'Task [{new_task.name}] executed successfully')
+                    self._record_metrics(new_task, 'success')
+
+                    return result
+                except Exception as err:
+                    if usage_start is not None and new_task.wall_time is None:
+                        self._set_resource_usage(new_task, ResourceUsage.snapshot().since(usage_start))
+
+                    error = traceback.format_exc()
+                    if span:
+                        span.error = f'{type(err).__name__}: {err}'
+                    new_task.error = f'[Error in task: {new_task.name}]' + \
+                        '\n' + error
+                    new_task.end_time = current_time_formatted()
+                    new_task.execution_date = new_task.end_time
+
+                    new_task.update(**{key: value for key, value in new_task.__dict__.items() if key != 'error_size'})
+                    self._update_log_execution_flow(**_params)
+
+                    logger.info(f'Task [{new_task.name}] executed with error')
+                    self._record_metrics(new_task, 'error')
 
         setattr(wrapper, 'task_info', self.task_info)
         return wrapper
     
+    @staticmethod
+    def _set_resource_usage(task: ModelTask, usage: ResourceUsage):
+        '''
+        Copies the resources used by an invocation to the task register.
+
+        Parameters:
+            - task (ModelTask): The task register to be updated.
+            - usage (ResourceUsage): The resources used by the invocation.
+        '''
+        task.wall_time = usage.wall_time
+        task.cpu_time = usage.cpu_time
+        task.thread_cpu_time = usage.thread_cpu_time
+        task.peak_rss_delta = usage.max_rss
+        task.read_bytes = usage.read_bytes
+        task.write_bytes = usage.write_bytes
+
+    def _record_metrics(self, task: ModelTask, status: str):
+        '''
+        Counts the execution in `fluxo_task_runs_total`, its wall time in `fluxo_task_duration_seconds`,
+        and both in the rollups of the analytics.
+
+        Parameters:
+            - task (ModelTask): The executed task register.
+            - status (str): 'success' or 'error'.
+        '''
+        flow_name = self.task_info.get('flow').name
+        TASK_RUNS.inc(flow_name, task.name, status)
+        if task.wall_time is not None:
+            TASK_DURATION.observe(task.wall_time, flow_name, task.name)
+        Rollups.record_task(flow_name, task)
+
     def _newlog_execution_flow(self, **kwargs):
         '''
         Create the log of flow execution with task information.
@@ -116,6 +176,9 @@ class Task:
             - kwargs: Additional keyword arguments.
 
         This method create the log of flow execution in the database.
+
+        Returns:
+            - ModelLogExecutionFlow: The log of the current flow execution.
         '''
         log_flow = ModelLogExecutionFlow.get_by_idflow_and_endtime_is_none(kwargs['id_flow'])
         flow = ModelFlow.get_by_id(kwargs['id_flow'])
@@ -125,9 +188,12 @@ class Task:
             log_flow = ModelLogExecutionFlow(
                 name=flow.name,
                 id_flow=flow.id,
-                start_time=current_time_formatted()
+                start_time=current_time_formatted(),
+                worker=Heartbeat.worker_id()
             )
             log_flow = log_flow.save()
+
+        return log_flow
     
     def _update_log_execution_flow(self, **kwargs):
         '''
@@ -172,3 +238,7 @@ class Task:
 
             log_flow.end_time = convert_datetime_to_str(max(list_end_time_tasks))
             log_flow.update(**log_flow.__dict__)
+            Rollups.record_execution(flow.name, log_flow)
+
+            # The execution is complete, the values returned by its tasks are no longer needed
+            ArtifactStore.release(log_flow.id)
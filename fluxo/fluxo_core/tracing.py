@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import random
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from fluxo.settings import Tracing
+
+
+_current_span = contextvars.ContextVar('fluxo_current_span', default=None)
+_NOT_SAMPLED = object()
+
+
+class Span:
+    '''
+    A timed operation inside a trace. The root span of a trace is a flow execution;
+    tasks, database statements and module imports are its children.
+
+    Attributes:
+        - name (str): The name of the operation.
+        - trace_id (str): 32 hex digits shared by all spans of the trace.
+        - span_id (str): 16 hex digits identifying the span.
+        - parent_span_id (str): The `span_id` of the parent span, None for the root span.
+        - attributes (dict): Extra information about the operation.
+    '''
+    def __init__(self, name: str, trace_id: str, parent_span_id: str = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes or {}
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_otlp(self):
+        '''
+        Returns the span as a dict in the OTLP/JSON span format.
+        '''
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 'SPAN_KIND_INTERNAL',
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            'status': {'code': 'STATUS_CODE_ERROR', 'message': self.error} if self.error
+                else {'code': 'STATUS_CODE_OK'},
+        }
+        if self.parent_span_id:
+            span['parentSpanId'] = self.parent_span_id
+        return span
+
+
+class Tracer:
+    '''
+    Creates spans and exports them to a rotating JSON-lines file (`Tracing.PATH`), one
+    OTLP/JSON span per line. Tracing is off unless `FLUXO_TRACING=1`, and only a
+    `Tracing.SAMPLE_RATE` fraction of the traces is recorded.
+
+    Methods:
+        - span(name, root, **attributes): Context manager that records a span.
+        - current_span(): Returns the active span, or None.
+
+    Example:
+        ```
+        with Tracer.span('flow.run', root=True, flow='My Flow 1'):
+            with Tracer.span('task', task='My Task 1'):
+                ...
+        ```
+    '''
+    _exporter: logging.Logger = None
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, root: bool = False, **attributes):
+        '''
+        Records a span around the block.
+
+        Parameters:
+            - name (str): The name of the operation.
+            - root (bool): If True and there is no active span, starts a new (sampled) trace.
+                Otherwise the span is only recorded as a child of an active span.
+            - attributes: Extra information about the operation.
+
+        Yields:
+            Span or None: The span, or None when it is not recorded.
+        '''
+        if not Tracing.ENABLED:
+            yield None
+            return
+
+        parent = _current_span.get()
+        if parent is _NOT_SAMPLED or (parent is None and not root):
+            yield None
+            return
+
+        if parent is None and random.random() >= Tracing.SAMPLE_RATE:
+            # Children of a trace left out by the sampling are not recorded either
+            token = _current_span.set(_NOT_SAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+
+        if parent is None:
+            span = Span(name, f'{random.getrandbits(128):032x}', attributes=attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.error = f'{type(err).__name__}: {err}'
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time = time.time_ns()
+            Tracer._export(span)
+
+    @staticmethod
+    def current_span():
+        '''
+        Returns the active span, or None.
+        '''
+        span = _current_span.get()
+        return None if span is _NOT_SAMPLED else span
+
+    @staticmethod
+    def _export(span: Span):
+        '''
+        Writes the span as one JSON line to the traces file.
+        '''
+        if Tracer._exporter is None:
+            exporter = logging.getLogger('fluxo.traces')
+            exporter.propagate = False
+            exporter.setLevel(logging.INFO)
+            exporter.addHandler(RotatingFileHandler(
+                Tracing.PATH, maxBytes=Tracing.MAX_BYTES, backupCount=Tracing.BACKUP_COUNT))
+            Tracer._exporter = exporter
+
+        record = {
+            'resource': {'attributes': [
+                _otlp_attribute('service.name', 'fluxo'),
+                _otlp_attribute('process.pid', os.getpid()),
+            ]},
+            **span.to_otlp()
+        }
+        Tracer._exporter.info(json.dumps(record))
+
+
+def _otlp_attribute(key: str, value):
+    '''
+    Returns an attribute in the OTLP/JSON `{'key': ..., 'value': {'<type>Value': ...}}` format.
+    '''
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    elif isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    elif isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    else:
+        return {'key': key, 'value': {'stringValue': str(value)}}
@@ -0,0 +1,82 @@
+import heapq
+from itertools import islice
+from typing import List, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from fluxo.settings import Scheduling
+from fluxo.fluxo_core.intervals import next_fire_times
+from fluxo.fluxo_core.database.flow_schedule import ModelFlowSchedule
+
+
+@dataclass
+class UpcomingRuns:
+    '''
+    The planned executions of every scheduled flow in a window, projected from their intervals
+    and their last planned fire or the first planned fire of their job (`next_fire_times`),
+    read in one query for all flows.
+
+    Attributes:
+        - start (datetime): The fires after this time.
+        - end (datetime): The fires up to this time.
+        - fires (List[Tuple[datetime, str]]): The fire times and the names of their flows, in order.
+        - truncated (List[str]): The flows with more fires than were projected (`Scheduling.UPCOMING_MAX_FIRES`
+                or `count`), their last fires in the window are missing.
+        - approximate (List[str]): The flows with no planned fire recorded (e.g. scheduled before it was),
+                projected as if their job were created at `start`, so their fires may be off their schedule.
+
+    Methods:
+        - compute(hours, count, start): Projects the next fires of every scheduled flow.
+        - load_per_minute(): The fires of each minute, to find the minutes where flows collide.
+    '''
+    start: datetime = None
+    end: datetime = None
+    fires: List[Tuple[datetime, str]] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    approximate: List[str] = field(default_factory=list)
+
+    @staticmethod
+    def compute(hours: float = 6, count: int = None, start: datetime = None):
+        '''
+        Projects the next fires of every scheduled flow.
+
+        Parameters:
+            - hours (float): The length of the window. None for no end, then `count` is required.
+            - count (int): The number of fires projected per flow. Defaults to `Scheduling.UPCOMING_MAX_FIRES`.
+            - start (datetime): The start of the window. Defaults to now.
+
+        Returns:
+            UpcomingRuns: The fires in the window.
+        '''
+        if hours is None and count is None:
+            raise ValueError('The hours or the count of the fires are required.')
+        if hours is not None and hours <= 0 or count is not None and count <= 0:
+            raise ValueError('The hours and the count of the fires must be positive.')
+
+        start = start or datetime.now()
+        end = start + timedelta(hours=hours) if hours is not None else datetime.max
+        count = count or Scheduling.UPCOMING_MAX_FIRES
+
+        fires_by_flow, truncated, approximate = [], [], []
+        for flow, last_fire, first_fire in ModelFlowSchedule.get_all_scheduled():
+            if not flow.interval:
+                continue
+            if last_fire is None and first_fire is None and not flow.interval.get('cron'):
+                approximate.append(flow.name)
+            fires = list(islice(next_fire_times(flow.interval, start, end, last_fire, first_fire), count + 1))
+            if len(fires) > count and hours is not None:
+                truncated.append(flow.name)
+            fires_by_flow.append([(fire_time, flow.name) for fire_time in fires[:count]])
+
+        return UpcomingRuns(start, end, list(heapq.merge(*fires_by_flow)), truncated, approximate)
+
+    def load_per_minute(self):
+        '''
+        Returns the fires of each minute with fires, to find the minutes where flows collide.
+
+        Returns:
+            List[Tuple[datetime, List[str]]]: The minutes, in order, and the names of the flows fired in each.
+        '''
+        minutes = {}
+        for fire_time, flow_name in self.fires:
+            minutes.setdefault(fire_time.replace(second=0, microsecond=0), []).append(flow_name)
+        return list(minutes.items())
@@ -0,0 +1,388 @@
+import re
+import json
+import time
+import base64
+import threading
+from datetime import datetime
+from dataclasses import asdict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from fluxo.logging import logger
+from fluxo.settings import Api, AppSettings
+from fluxo.fluxo_core.database.db import keep_connection
+from fluxo.fluxo_core.database.data_version import DataVersion
+from fluxo.fluxo_core.database.flow_tag import ModelFlowTag
+from fluxo.fluxo_core.database.dashboard import ModelFlowDashboard
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+from fluxo.fluxo_core.database.task import ModelTask
+from fluxo.fluxo_core.database.rollup import ModelRollup
+from fluxo.fluxo_core.upcoming import UpcomingRuns
+from fluxo.uttils import convert_str_to_datetime, convert_datetime_to_str
+
+
+class NotFound(Exception):
+    pass
+
+
+class Validators:
+    '''
+    The ETag and Last-Modified of the API, from the data version of the database (`DataVersion`):
+    every response is the same until another connection commits, so a poller that sends them
+    back gets a 304 without any query. The data version starts again with the process, so the
+    ETag also has the time the process started.
+
+    Methods:
+        - get(): The ETag and the time of the last change seen.
+    '''
+    _started = format(int(time.time()), 'x')
+    _version = None
+    _modified = time.time() # Nothing is known before the process started
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get():
+        '''
+        Returns the validators of the current state of the database. Read before the query of a
+        response, so a commit made while it runs changes the ETag of the next one.
+
+        Returns:
+            Tuple[str, float]: The ETag, and the time of the last change seen, in epoch seconds.
+        '''
+        version = DataVersion.get()
+        with Validators._lock:
+            if version != Validators._version:
+                if Validators._version is not None:
+                    Validators._modified = time.time()
+                Validators._version = version
+            return f'"{Validators._started}-{version}"', Validators._modified
+
+
+def _encode_cursor(row: ModelFlowDashboard):
+    return base64.urlsafe_b64encode(json.dumps([row.flow.name, row.flow.id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        name, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return name, int(id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor.')
+
+
+def _run_status(log_flow: ModelLogExecutionFlow):
+    if log_flow.end_time is None:
+        return 'running'
+    return 'failed' if log_flow.ids_error_task else 'success'
+
+
+def _task_status(task: ModelTask):
+    if task.end_time is None:
+        return 'running'
+    return 'failed' if task.error else 'success'
+
+
+def _run_to_dict(log_flow: ModelLogExecutionFlow):
+    return {**asdict(log_flow), 'status': _run_status(log_flow)}
+
+
+def _task_to_dict(task: ModelTask):
+    # The error may have been read cut (`error_chars`), the rest is at /api/tasks/<id>/error
+    truncated = task.error is not None and task.error_size is not None and len(task.error) < task.error_size
+    return {**asdict(task), 'status': _task_status(task), 'error_truncated': truncated}
+
+
+def _flow_to_dict(row: ModelFlowDashboard):
+    return {**asdict(row.flow), 'profiling': row.profiling, 'last_runs': [_run_to_dict(log_flow) for log_flow in row.log_flows]}
+
+
+def _rollup_to_dict(rollup: ModelRollup):
+    p50, p95, p99 = rollup.quantiles((0.5, 0.95, 0.99))
+    return {
+        'flow': rollup.flow_name,
+        'task': rollup.task_name or None, # None for the executions of the whole flow
+        'start': rollup.start,
+        'count': rollup.count,
+        'errors': rollup.errors,
+        'failure_rate': rollup.errors / rollup.count if rollup.count else None,
+        'mean': rollup.total_duration / rollup.count if rollup.count else None,
+        'min': rollup.min_duration,
+        'max': rollup.max_duration,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+    }
+
+
+def _int(query: dict, name: str, default: int = None):
+    value = query.get(name, [None])[0]
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.")
+
+
+def _time(query: dict, name: str):
+    value = query.get(name, [None])[0]
+    if not value:
+        return None
+    try:
+        return convert_datetime_to_str(datetime.fromisoformat(value))
+    except ValueError:
+        pass
+    try:
+        return convert_datetime_to_str(convert_str_to_datetime(value))
+    except ValueError:
+        raise ValueError(f"'{name}' must be a time, e.g. 2024-01-31T12:00.")
+
+
+def _limit(query: dict):
+    limit = _int(query, 'limit', Api.PAGE_SIZE)
+    if not 1 <= limit <= Api.MAX_PAGE_SIZE:
+        raise ValueError(f"'limit' must be between 1 and {Api.MAX_PAGE_SIZE}.")
+    return limit
+
+
+def _last_runs(query: dict, default: int):
+    last_runs = _int(query, 'last_runs', default)
+    if not 1 <= last_runs <= Api.MAX_PAGE_SIZE:
+        raise ValueError(f"'last_runs' must be between 1 and {Api.MAX_PAGE_SIZE}.")
+    return last_runs
+
+
+def status(query: dict):
+    return {
+        'version': AppSettings.VERSION,
+        'flows': ModelFlowDashboard.get_counts(),
+        'running_executions': len(ModelLogExecutionFlow.get_all_endtime_is_none()),
+    }
+
+
+def flows(query: dict):
+    limit = _limit(query)
+    after = query.get('after', [None])[0]
+    rows = ModelFlowDashboard.get_page(
+        search=query.get('search', [None])[0],
+        status=query.get('status', [None])[0],
+        tag=query.get('tag', [None])[0],
+        sort=query.get('sort', ['name'])[0],
+        after=_decode_cursor(after) if after else None,
+        limit=limit,
+        last_executions=_last_runs(query, 1)
+    )
+    return {
+        'items': [_flow_to_dict(row) for row in rows],
+        'next': _encode_cursor(rows[-1]) if len(rows) == limit else None, # None on the last page
+    }
+
+
+def flow(query: dict, id: int):
+    rows = ModelFlowDashboard.get_all(last_executions=_last_runs(query, 10), flow_ids=[id])
+    if not rows:
+        raise NotFound()
+    return {**_flow_to_dict(rows[0]), 'tags': ModelFlowTag.get_by_flow_id(id)}
+
+
+def runs(query: dict):
+    # The cursor only moves forward, so a run first read unfinished is not read again when it
+    # finishes: the pollers read the unfinished ones again from the start, with `unfinished=1`
+    after = _int(query, 'after', 0)
+    log_flows = ModelLogExecutionFlow.get_page(
+        id_flow=_int(query, 'flow_id'),
+        unfinished=query.get('unfinished', ['0'])[0] == '1',
+        after=after,
+        limit=_limit(query)
+    )
+    return {
+        'items': [_run_to_dict(log_flow) for log_flow in log_flows],
+        'next': log_flows[-1].id if log_flows else after, # Polled again for the new executions
+    }
+
+
+def run(query: dict, id: int):
+    log_flow = ModelLogExecutionFlow.get_by_id(id)
+    if log_flow is None:
+        raise NotFound()
+    rows = ModelTask.get_all_by_log_flow_id(log_flow.id, log_flow.ids_task, error_chars=AppSettings.ERROR_PREVIEW_CHARS)
+    return {**_run_to_dict(log_flow), 'tasks': [_task_to_dict(row) for row in rows]}
+
+
+def tasks(query: dict):
+    after = _int(query, 'after', 0)
+    page = ModelTask.get_page(
+        flow_id=_int(query, 'flow_id'), after=after, limit=_limit(query), error_chars=AppSettings.ERROR_PREVIEW_CHARS)
+    return {
+        'items': [_task_to_dict(row) for row in page],
+        'next': page[-1].id if page else after,
+    }
+
+
+def task(query: dict, id: int):
+    preview = ModelTask.get_by_id_with_error_preview(id, AppSettings.ERROR_PREVIEW_CHARS, AppSettings.ERROR_PREVIEW_CHARS)
+    if preview is None:
+        raise NotFound()
+    row, error_tail = preview
+    return {**_task_to_dict(row), 'error_tail': error_tail}
+
+
+def task_error(query: dict, id: int):
+    start = _int(query, 'start', 0)
+    length = _int(query, 'length', AppSettings.ERROR_CHUNK_CHARS)
+    if start < 0 or not 1 <= length <= AppSettings.ERROR_CHUNK_CHARS:
+        raise ValueError(f"'start' must be positive and 'length' between 1 and {AppSettings.ERROR_CHUNK_CHARS}.")
+    text = ModelTask.get_error_chunk(id, start, length)
+    if text is None:
+        raise NotFound()
+    return {'id': id, 'start': start, 'text': text}
+
+
+def analytics(query: dict):
+    rollups = ModelRollup.get_summary(
+        period=query.get('period', ['day'])[0], start=_time(query, 'start'), end=_time(query, 'end'))
+    return {'items': [_rollup_to_dict(rollup) for rollup in rollups]}
+
+
+def analytics_trend(query: dict):
+    flow_name = query.get('flow', [None])[0]
+    if not flow_name:
+        raise ValueError("'flow' is required.")
+    rollups = ModelRollup.get_trend(
+        flow_name,
+        task_name=query.get('task', [''])[0],
+        period=query.get('period', ['hour'])[0],
+        start=_time(query, 'start'),
+        end=_time(query, 'end')
+    )
+    return {'items': [_rollup_to_dict(rollup) for rollup in rollups]}
+
+
+def upcoming(query: dict):
+    hours = query.get('hours', ['6'])[0]
+    try:
+        hours = float(hours) if hours else None
+    except ValueError:
+        raise ValueError("'hours' must be a number.")
+    runs = UpcomingRuns.compute(hours=hours, count=_int(query, 'count'))
+    return {
+        'start': convert_datetime_to_str(runs.start),
+        'end': convert_datetime_to_str(runs.end) if hours else None,
+        'items': [{'time': convert_datetime_to_str(fire_time), 'flow': flow_name} for fire_time, flow_name in runs.fires],
+        'load': [
+            {'minute': convert_datetime_to_str(minute), 'count': len(flow_names), 'flows': flow_names}
+            for minute, flow_names in runs.load_per_minute()
+        ],
+        'truncated': runs.truncated,
+        'approximate': runs.approximate,
+    }
+
+
+# Endpoints whose response changes with the time, not only with the database, so without ETag
+TIME_DEPENDENT = {upcoming}
+
+# (path, endpoint), the groups of the path are the IDs given to the endpoint
+ROUTES = [
+    (re.compile(r'/api/status'), status),
+    (re.compile(r'/api/flows'), flows),
+    (re.compile(r'/api/flows/(\d+)'), flow),
+    (re.compile(r'/api/runs'), runs),
+    (re.compile(r'/api/runs/(\d+)'), run),
+    (re.compile(r'/api/tasks'), tasks),
+    (re.compile(r'/api/tasks/(\d+)'), task),
+    (re.compile(r'/api/tasks/(\d+)/error'), task_error),
+    (re.compile(r'/api/analytics'), analytics),
+    (re.compile(r'/api/analytics/trend'), analytics_trend),
+    (re.compile(r'/api/upcoming'), upcoming),
+]
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        for path, endpoint in ROUTES:
+            match = path.fullmatch(url.path.rstrip('/'))
+            if match:
+                break
+        else:
+            self._send_json(404, {'error': 'Not found.'})
+            return
+
+        if endpoint in TIME_DEPENDENT:
+            headers = {'Cache-Control': 'no-store'}
+        else:
+            etag, modified = Validators.get()
+            headers = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True), 'Cache-Control': 'no-cache'}
+        if 'ETag' in headers and self._not_modified(etag, modified):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        try:
+            body = endpoint(parse_qs(url.query), *map(int, match.groups()))
+        except NotFound:
+            self._send_json(404, {'error': 'Not found.'})
+        except ValueError as err:
+            self._send_json(400, {'error': str(err)})
+        except Exception as err:
+            logger.error(f'Error in the API at {self.path}: {err}')
+            self._send_json(500, {'error': 'Internal error.'})
+        else:
+            self._send_json(200, body, headers)
+
+    def _not_modified(self, etag: str, modified: float):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None: # Takes precedence over If-Modified-Since
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _send_json(self, code: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _PooledHTTPServer(ThreadingMixIn, HTTPServer):
+    '''
+    Answers the requests on a fixed pool of threads, each with a persistent read only
+    connection, instead of a new thread and connection per request.
+    '''
+    def __init__(self, address, handler, threads: int):
+        super().__init__(address, handler)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='fluxo-api', initializer=keep_connection)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+
+def start_api_server(port: int = Api.PORT, host: str = Api.HOST):
+    '''
+    Serves the read only JSON API at `http://<host>:<port>/api/` in a background thread.
+
+    Parameters:
+        - port (int): The port to listen on. Defaults to `Api.PORT`.
+        - host (str): The address to listen on. Defaults to `Api.HOST`.
+    '''
+    server = _PooledHTTPServer((host, port), ApiHandler, Api.THREADS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f'API available at http://{host}:{port}/api/')
+    return server
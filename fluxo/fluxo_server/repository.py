@@ -0,0 +1,117 @@
+import asyncio
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from fluxo.settings import AppSettings
+from fluxo.fluxo_core.database.db import keep_connection
+from fluxo.fluxo_core.database.data_version import DataVersion
+
+
+class Repository:
+    '''
+    Runs the database calls of the pages out of the event loop, so a slow query never
+    freezes the other browsers connected to the server.
+
+        - Reads run on a pool of `AppSettings.DB_READ_THREADS` threads, each with a
+          persistent read only connection, so independent reads run together
+          (e.g. with `asyncio.gather`).
+        - Writes run one at a time on their own thread, with a connection per call as
+          everywhere else, so they never wait for each other's locks.
+        - Reads of the pages shared by every browser go through a cache of the last
+          `AppSettings.CACHE_SIZE` results, emptied whenever the database changes
+          (`DataVersion`, which sees the commits of every process) or the server writes.
+
+    Methods:
+        - read(function, *args, **kwargs): Runs a function that only reads the database.
+        - cached_read(function, *args, **kwargs): Same as `read`, but shares the result with the other callers.
+        - invalidate(): Empties the cache.
+        - write(function, *args, **kwargs): Runs a function that writes to the database.
+    '''
+    _readers = ThreadPoolExecutor(
+        max_workers=AppSettings.DB_READ_THREADS,
+        thread_name_prefix='fluxo-db-read',
+        initializer=keep_connection
+    )
+    _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fluxo-db-write')
+    _cache = OrderedDict() # Futures of the results, least recently used first
+    _cache_version = None # The data version the cached results were read at
+
+    @staticmethod
+    async def read(function, *args, **kwargs):
+        '''
+        Runs a function that only reads the database, e.g. `ModelTask.get_by_id`, on a reader thread.
+
+        Parameters:
+            - function (callable): The function.
+            - args, kwargs: Its arguments.
+
+        Returns:
+            The result of the function.
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(Repository._readers, functools.partial(function, *args, **kwargs))
+
+    @staticmethod
+    async def cached_read(function, *args, **kwargs):
+        '''
+        Same as `read`, but the result is shared with the other callers of the same function
+        and arguments until the database changes, including callers waiting for the same
+        query, which then runs once. The result is shared, so it must not be modified.
+
+        Parameters:
+            - function (callable): The function.
+            - args, kwargs: Its arguments.
+
+        Returns:
+            The result of the function.
+        '''
+        # Read before the query, so a commit made while it runs empties the cache on the next call
+        version = await Repository.read(DataVersion.get)
+        if Repository._cache_version is None or version > Repository._cache_version:
+            Repository._cache.clear()
+            Repository._cache_version = version
+        elif version < Repository._cache_version: # Overtaken by a caller that saw a newer version
+            return await Repository.read(function, *args, **kwargs)
+
+        key = (function, repr(args), repr(sorted(kwargs.items())))
+        future = Repository._cache.get(key)
+        if future is None:
+            future = asyncio.ensure_future(Repository.read(function, *args, **kwargs))
+            Repository._cache[key] = future
+            if len(Repository._cache) > AppSettings.CACHE_SIZE:
+                Repository._cache.popitem(last=False)
+        else:
+            Repository._cache.move_to_end(key)
+
+        try:
+            # Shielded, so a caller that leaves the page does not cancel the query of the others
+            return await asyncio.shield(future)
+        except Exception:
+            if Repository._cache.get(key) is future: # Not cached, the next call tries again
+                del Repository._cache[key]
+            raise
+
+    @staticmethod
+    def invalidate():
+        '''
+        Empties the cache, e.g. after a write.
+        '''
+        Repository._cache.clear()
+
+    @staticmethod
+    async def write(function, *args, **kwargs):
+        '''
+        Runs a function that writes to the database, e.g. `ModelProfileRequest.save`, on the writer thread.
+
+        Parameters:
+            - function (callable): The function.
+            - args, kwargs: Its arguments.
+
+        Returns:
+            The result of the function.
+        '''
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(Repository._writer, functools.partial(function, *args, **kwargs))
+        finally:
+            Repository.invalidate()
@@ -4,6 +4,7 @@ from fluxo.settings import AppThemeColors
 from fluxo.fluxo_server.screens.app_bar import AppBar
 from fluxo.fluxo_server.screens.footer import Footer
 from fluxo.fluxo_server.screens.flow_execution.task import Task
+from fluxo.fluxo_server.repository import Repository
 from fluxo.fluxo_core.database.flow import ModelFlow
 from fluxo.fluxo_core.database.task import ModelTask
 from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
@@ -77,7 +78,7 @@ class FlowExecution(ft.UserControl):
         await self.page.go_async('/')
 
     async def _load_log_flow(self):
-        log_flow = ModelLogExecutionFlow.get_by_id(self.log_flow_id)
+        log_flow = await Repository.cached_read(ModelLogExecutionFlow.get_by_id, self.log_flow_id)
 
         # Update name and date execution
         self.text_name_flow.current.value = log_flow.name
@@ -91,15 +92,19 @@ class FlowExecution(ft.UserControl):
         else:
             self.container_status_execution.current.bgcolor = AppThemeColors.GREEN
 
-        # Update tasks
-        flow = ModelFlow.get_by_id(log_flow.id_flow)
-        name_tasks_flow = flow.list_names_tasks
+        # Update tasks: the flow and the tasks of this execution, read together
+        flow, tasks = await asyncio.gather(
+            Repository.cached_read(ModelFlow.get_by_id, log_flow.id_flow),
+            # The cards only tell if a task failed, its error is read by the task page
+            Repository.cached_read(ModelTask.get_all_by_log_flow_id, log_flow.id, log_flow.ids_task, error_chars=1)
+        )
+        tasks_by_name = {task.name: task for task in tasks} # The last run of each task name
 
-        for name_task in name_tasks_flow:
+        for name_task in flow.list_names_tasks:
             self.responsiverow_tasks.current.controls.append(
-                Task(log_flow, name_task)
+                Task(name_task, tasks_by_name.get(name_task))
             )
-            await self.update_async()
+        await self.update_async()
 
         self.page.session.set('log_flow_id', self.log_flow_id)
 
@@ -1,18 +1,27 @@
 import flet as ft
-import asyncio
-from fluxo.settings import AppThemeColors
+from typing import List
+from fluxo.settings import AppThemeColors, Profiling
 from fluxo.fluxo_core.flows_executor import FlowsExecutor
+from fluxo.fluxo_core.intervals import describe_interval
 from fluxo.fluxo_core.database.flow import ModelFlow
 from fluxo.fluxo_core.database.task import ModelTask
 from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+from fluxo.fluxo_core.database.profile_request import ModelProfileRequest
+from fluxo.fluxo_core.database.flow_schedule import ModelFlowSchedule
+from fluxo.fluxo_core.database.flow_tag import ModelFlowTag
+from fluxo.fluxo_core.database.dashboard import ModelFlowDashboard
 from fluxo.fluxo_server.screens.home.status_execution import StatusExecution
+from fluxo.fluxo_server.repository import Repository
 
 
 class Flow(ft.UserControl):
-    def __init__(self, flow: ModelFlow, flows_executor: FlowsExecutor):
+    def __init__(self, flow: ModelFlow, flows_executor: FlowsExecutor,
+                 log_flows: List[ModelLogExecutionFlow] = None, profiling: bool = False):
         super().__init__()
         self.flow = flow
         self.flows_executor = flows_executor
+        self.log_flows = log_flows or [] # The last executions, read by the dashboard query
+        self.profiling = profiling
 
     def build(self):
         self.row_flow = ft.Ref[ft.Row]()
@@ -24,8 +33,9 @@ class Flow(ft.UserControl):
 
         self.iconbutton_delete = ft.Ref[ft.IconButton]()
         self.iconbutton_run_now = ft.Ref[ft.IconButton]()
+        self.iconbutton_profile = ft.Ref[ft.IconButton]()
 
-        return ft.Container(
+        container = ft.Container(
             content=ft.Row(
                 ref=self.row_flow,
                 controls=[
@@ -91,6 +101,16 @@ class Flow(ft.UserControl):
                         ),
                         bgcolor=AppThemeColors.QUARTENARY
                     ),
+                    ft.Tooltip(
+                        message=f'Profile Next {Profiling.DEFAULT_RUNS} Runs',
+                        content=ft.IconButton(
+                            ref=self.iconbutton_profile,
+                            icon=ft.icons.SPEED_ROUNDED,
+                            icon_color=AppThemeColors.BLACK_TERTIARY,
+                            on_click=self.on_click_iconbutton_profile
+                        ),
+                        bgcolor=AppThemeColors.QUARTENARY
+                    ),
                     ft.Tooltip(
                         message='Delete Flow',
                         content=ft.IconButton(
@@ -110,19 +130,18 @@ class Flow(ft.UserControl):
             height=60,
             padding=ft.padding.only(left=15, top=0, right=15, bottom=0)
         ) # Container
-    
-    async def _load_attributes_flow(self):
+
+        # Filled before the first render, so the whole list is sent in one update
+        self._load_attributes_flow()
+        self._load_status_executions()
+        return container
+
+    def _load_attributes_flow(self):
         # Name
         self.text_name.current.value = self.flow.name
 
         # Interval
-        interval = self.flow.interval
-        if interval.get('minutes'):
-            self.text_interval.current.value = f'every {interval.get("minutes")} min(s) at {interval.get("at")[1:]}s'
-        elif interval.get('hours'):
-            self.text_interval.current.value = f'every {interval.get("hours")} hour(s) at {interval.get("at")[1:]}m'
-        elif interval.get('days'):
-            self.text_interval.current.value = f'every {interval.get("days")} day(s) at {interval.get("at")}'
+        self.text_interval.current.value = describe_interval(self.flow.interval)
         
         # switch_start_stop_flow
         if self.flow.running:
@@ -139,50 +158,59 @@ class Flow(ft.UserControl):
             self.iconbutton_run_now.current.disabled = False
             self.iconbutton_run_now.current.icon = ft.icons.PLAY_ARROW_ROUNDED
             self.iconbutton_delete.current.disabled = False
-        await self.update_async()
 
-    async def _load_status_executions(self):
-        log_flows = ModelLogExecutionFlow.get_all_by_id_flow(self.flow.id)
-
-        if log_flows:
-            # Organize task list by date
-            sorted_log_flows = sorted(log_flows, key=lambda x: x.date_of_creation, reverse=False)
-
-            for log_flow in sorted_log_flows:
-                self.row_executions.current.controls.append(StatusExecution(log_flow))
-                        
-            if len(log_flows) < 10:
-                n = 10 - len(log_flows)
-                for _ in range(n):
-                    self.row_executions.current.controls.insert(
-                        0,
-                        ft.Container(
-                            bgcolor=AppThemeColors.WHITE,
-                            height=23,
-                            width=23,
-                            border_radius=ft.border_radius.all(15),
-                            tooltip=''
-                        ), # Container
-                    )
+        # Profile requested and not consumed yet
+        if self.profiling:
+            self.iconbutton_profile.current.icon_color = AppThemeColors.PRIMARY
         else:
-            for _ in range(10):
-                self.row_executions.current.controls.insert(
-                    0,
-                    ft.Container(
-                        bgcolor=AppThemeColors.WHITE,
-                        height=23,
-                        width=23,
-                        border_radius=ft.border_radius.all(15),
-                        tooltip=''
-                    ), # Container
-                )
-        await self.update_async()
+            self.iconbutton_profile.current.icon_color = AppThemeColors.BLACK_TERTIARY
+
+    def _load_status_executions(self):
+        # Controls already shown are kept when their execution did not change, so a refresh
+        # only sends the new dots
+        previous = self.row_executions.current.controls
+        empty_slots = [control for control in previous if not isinstance(control, StatusExecution)]
+        dots = {control.log_flow.id: control for control in previous if isinstance(control, StatusExecution)}
+
+        controls = []
+        # Empty slots first, so the last execution is always on the right
+        for slot in range(10 - len(self.log_flows)):
+            controls.append(
+                empty_slots[slot] if slot < len(empty_slots) else ft.Container(
+                    bgcolor=AppThemeColors.WHITE,
+                    height=23,
+                    width=23,
+                    border_radius=ft.border_radius.all(15),
+                    tooltip=''
+                ), # Container
+            )
+
+        for log_flow in self.log_flows:
+            dot = dots.get(log_flow.id)
+            if dot is None or (dot.log_flow.end_time, dot.log_flow.ids_error_task) != (log_flow.end_time, log_flow.ids_error_task):
+                dot = StatusExecution(log_flow)
+            controls.append(dot)
+        self.row_executions.current.controls = controls
+
+    def refresh(self, row: ModelFlowDashboard):
+        '''
+        Shows a newer state of the flow, changing only the controls that differ.
+        The caller sends the update.
+
+        Parameters:
+            - row (ModelFlowDashboard): The flow, its last executions and whether a profile is pending.
+        '''
+        self.flow = row.flow
+        self.log_flows = row.log_flows
+        self.profiling = row.profiling
+        self._load_attributes_flow()
+        self._load_status_executions()
 
     async def on_change_switch_running(self, e):
-        flow = ModelFlow.get_by_id(self.flow.id)
+        flow = await Repository.read(ModelFlow.get_by_id, self.flow.id)
 
         if flow.running: # Stop Flow
-            self.flows_executor.stop_flow_execution([flow])
+            await Repository.write(self.flows_executor.stop_flow_execution, [flow])
             e.control.value = False
             e.control.label = 'OFF'
 
@@ -191,7 +219,7 @@ class Flow(ft.UserControl):
             self.iconbutton_delete.current.disabled = False
 
         else: # Start Flow
-            self.flows_executor.execute_parallel_flows([flow])
+            await Repository.write(self.flows_executor.execute_parallel_flows, [flow])
             e.control.value = True
             e.control.label = 'ON'
 
@@ -201,7 +229,7 @@ class Flow(ft.UserControl):
         await self.update_async()
 
     async def on_click_iconbutton_run_now(self, e):
-        self.flows_executor.execute_flow_now([self.flow])
+        await Repository.write(self.flows_executor.execute_flow_now, [self.flow])
 
         e.control.disabled = True
         e.control.icon = ft.icons.STOP_ROUNDED
@@ -209,11 +237,23 @@ class Flow(ft.UserControl):
         
         await self.update_async()
 
+    async def on_click_iconbutton_profile(self, e):
+        await Repository.write(ModelProfileRequest(flow_id=self.flow.id, remaining=Profiling.DEFAULT_RUNS).save)
+
+        e.control.icon_color = AppThemeColors.PRIMARY
+        await self.update_async()
+
     async def on_click_iconbutton_delete_flow(self, e):
         e.control.disabled = True
         await self.update_async()
 
+        await Repository.write(self._delete_flow)
+        await self.clean_async()
+
+    def _delete_flow(self):
         ModelFlow.delete(self.flow.id)
+        ModelFlowSchedule.delete(self.flow.id)
+        ModelFlowTag.delete(self.flow.id)
 
         list_log_flow = ModelLogExecutionFlow.get_all_by_id_flow(self.flow.id)
         if list_log_flow:
@@ -223,13 +263,4 @@ class Flow(ft.UserControl):
         list_task = ModelTask.get_all_by_fluxo_id(self.flow.id)
         if list_task:
             for task in list_task:
-                ModelTask.delete(task.id)
-        await self.clean_async()
-
-    async def did_mount_async(self):
-        self.task_load_attributes_flow = asyncio.create_task(self._load_attributes_flow())
-        self.task_load_status_executions = asyncio.create_task(self._load_status_executions())
-
-    async def will_unmount_async(self):
-        self.task_load_attributes_flow.cancel()
-        self.task_load_status_executions.cancel()
\ No newline at end of file
+                ModelTask.delete(task.id)
\ No newline at end of file
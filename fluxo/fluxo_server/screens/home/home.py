@@ -1,22 +1,37 @@
 import flet as ft
 import asyncio
-from fluxo.settings import AppThemeColors
+import sqlite3
+from fluxo.settings import AppThemeColors, AppSettings
+from fluxo.logging import logger
 from fluxo.fluxo_server.screens.home.flow import Flow
 from fluxo.fluxo_server.screens.app_bar import AppBar
 from fluxo.fluxo_server.screens.footer import Footer
+from fluxo.fluxo_server.repository import Repository
 from fluxo.fluxo_core.flows_executor import FlowsExecutor
-from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.dashboard import ModelFlowDashboard
+from fluxo.fluxo_core.database.data_version import DataVersion
 from fluxo.fluxo_core.database.app import ModelApp
 
 
 class Home(ft.UserControl):
     def __init__(self):
-        super().__init__()
+        super().__init__(expand=True)
         self.flows_executor = FlowsExecutor()
+        self.flow_controls = {} # Flow controls shown, by flow ID
+        self.fingerprints = {} # What the shown flows were built from, see `ModelFlowDashboard.get_fingerprints`
+        self.data_version = None
+
+        # The search, see `ModelFlowDashboard.get_page`, and the flows loaded from it
+        self.filters = {'search': None, 'status': None, 'tag': None, 'sort': 'name'}
+        self.cursor = None # (name, id) of the last flow loaded
+        self.has_more_flows = False
+        self.loading_flows = False
+        self.search_id = 0 # Changes with the search, so the pages of the previous one are dropped
+        self.task_filter = None
 
     def build(self):
         self.column_flows = ft.Ref[ft.Column]()
-        self.responsiverow_flows = ft.Ref[ft.ResponsiveRow]()
+        self.listview_flows = ft.Ref[ft.ListView]()
 
         return ft.Column(
             ref=self.column_flows,
@@ -47,6 +62,20 @@ class Home(ft.UserControl):
                                 ),
                                 bgcolor=AppThemeColors.QUARTENARY
                             ),
+                            ft.Tooltip(
+                                message='Upcoming runs',
+                                content=ft.FloatingActionButton(
+                                    content=ft.Icon(
+                                        name=ft.icons.CALENDAR_MONTH,
+                                        color=AppThemeColors.WHITE
+                                    ),
+                                    bgcolor=AppThemeColors.PRIMARY,
+                                    width=50,
+                                    height=27,
+                                    on_click=self.on_click_floatingactionbutton_upcoming
+                                ),
+                                bgcolor=AppThemeColors.QUARTENARY
+                            ),
                             ft.Tooltip(
                                 message='Synchronize',
                                 content=ft.FloatingActionButton(
@@ -66,45 +95,212 @@ class Home(ft.UserControl):
                     width=900
                 ), # Container
                 ft.Container(
-                    content=ft.ResponsiveRow(
-                        ref=self.responsiverow_flows,
+                    content=ft.Row(
+                        controls=[
+                            ft.TextField(
+                                label='Search by name',
+                                prefix_icon=ft.icons.SEARCH,
+                                dense=True,
+                                expand=True,
+                                on_change=self.on_change_textfield_search
+                            ), # TextField
+                            ft.TextField(
+                                label='Tag',
+                                dense=True,
+                                width=150,
+                                on_change=self.on_change_textfield_tag
+                            ), # TextField
+                            ft.Dropdown(
+                                label='Status',
+                                dense=True,
+                                width=140,
+                                value='all',
+                                options=[
+                                    ft.dropdown.Option('all', 'All'),
+                                    ft.dropdown.Option('on', 'On'),
+                                    ft.dropdown.Option('off', 'Off'),
+                                    ft.dropdown.Option('executing', 'Executing'),
+                                    ft.dropdown.Option('failed', 'Failed'),
+                                ],
+                                on_change=self.on_change_dropdown_status
+                            ), # Dropdown
+                            ft.Dropdown(
+                                label='Sort',
+                                dense=True,
+                                width=140,
+                                value='name',
+                                options=[
+                                    ft.dropdown.Option('name', 'Name'),
+                                    ft.dropdown.Option('newest', 'Newest'),
+                                ],
+                                on_change=self.on_change_dropdown_sort
+                            ), # Dropdown
+                        ]
+                    ),
+                    width=900
+                ), # Container
+                ft.Container(
+                    content=ft.ListView(
+                        ref=self.listview_flows,
                         controls=[
 
                         ], # controls
-                        alignment=ft.MainAxisAlignment.CENTER
-                    ), # ResponsiveRow
+                        spacing=10,
+                        on_scroll=self.on_scroll_listview_flows,
+                        on_scroll_interval=100,
+                        expand=True
+                    ), # ListView
                     alignment=ft.alignment.center,
-                    width=900
+                    width=900,
+                    expand=True
                 ), # Container
             ], # controls
-            scroll=ft.ScrollMode.AUTO,
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            expand=True
         ) # Column
     
+    def _new_flow(self, row: ModelFlowDashboard):
+        control = Flow(
+            flow=row.flow,
+            flows_executor=self.flows_executor,
+            log_flows=row.log_flows,
+            profiling=row.profiling
+        )
+        self.flow_controls[row.flow.id] = control
+        return control
+
     async def _load_flows(self):
-        self.responsiverow_flows.current.controls.clear()
-        flows = ModelFlow.get_all()
-        if flows:
-            for flow in flows:
-                flow = ModelFlow.get_by_name(flow.name)
-                self.responsiverow_flows.current.controls.append(Flow(flow=flow, flows_executor=self.flows_executor))
-                await self.update_async()
+        # Read before the flows: a change made meanwhile is shown by the next check
+        self.data_version = await Repository.read(DataVersion.get)
 
-    async def on_click_floatingactionbutton_update_new_flow(self, e):
-        self.flows_executor.update_new_flow_in_python_files()
+        self.search_id += 1
+        self.flow_controls = {}
+        self.fingerprints = {}
+        self.cursor = None
+        self.has_more_flows = True
+        self.loading_flows = False
+        self.listview_flows.current.controls = []
+        await self._load_next_page()
+
+    async def _load_next_page(self):
+        '''
+        Loads the next flows of the search, in one query and one update.
+        '''
+        if self.loading_flows or not self.has_more_flows:
+            return
+        self.loading_flows = True
+        search_id = self.search_id
+        try:
+            rows = await Repository.cached_read(
+                ModelFlowDashboard.get_page,
+                **self.filters,
+                after=self.cursor,
+                limit=AppSettings.PAGE_SIZE,
+                last_executions=10
+            )
+            if search_id != self.search_id:
+                return
+            for row in rows:
+                self.fingerprints[row.flow.id] = row.fingerprint
+                self.listview_flows.current.controls.append(self._new_flow(row))
+            if rows:
+                self.cursor = (rows[-1].flow.name, rows[-1].flow.id)
+            self.has_more_flows = len(rows) == AppSettings.PAGE_SIZE
+            await self.update_async()
+        finally:
+            if search_id == self.search_id:
+                self.loading_flows = False
+
+    async def _watch_changes(self):
+        '''
+        Shows the changes made by the schedulers and workers as they happen. The database
+        is only read after a commit (`DataVersion`), and only the flows whose fingerprint
+        changed are read again and redrawn, in one update.
+        '''
+        while True:
+            await asyncio.sleep(AppSettings.LIVE_UPDATE_INTERVAL)
+            try:
+                await self._apply_changes()
+            except sqlite3.Error as err: # E.g. locked by a long write, retried on the next check
+                logger.warning(f'Live update of the flows failed: {err}')
+
+    async def _apply_changes(self):
+        data_version = await Repository.read(DataVersion.get)
+        if self.data_version is None or data_version == self.data_version: # Not loaded yet, or no commit
+            return
+        self.data_version = data_version
 
-        await self.clean_async()
+        # Only the flows loaded; new flows are shown when the list is loaded again
+        fingerprints = await Repository.cached_read(
+            ModelFlowDashboard.get_fingerprints, flow_ids=sorted(self.fingerprints))
+        changed = [flow_id for flow_id, fingerprint in fingerprints.items() if self.fingerprints.get(flow_id) != fingerprint]
+        removed = [flow_id for flow_id in self.fingerprints if flow_id not in fingerprints]
+        if not changed and not removed:
+            return
+
+        for flow_id in removed:
+            del self.fingerprints[flow_id]
+            control = self.flow_controls.pop(flow_id, None)
+            if control in self.listview_flows.current.controls:
+                self.listview_flows.current.controls.remove(control)
+
+        rows = await Repository.cached_read(ModelFlowDashboard.get_all, last_executions=10, flow_ids=changed) if changed else []
+        for row in rows:
+            if row.flow.id in self.flow_controls:
+                self.fingerprints[row.flow.id] = row.fingerprint
+                self.flow_controls[row.flow.id].refresh(row)
+        await self.update_async()
+
+    async def _filter_flows(self, delay: float = 0):
+        # Typing waits for a pause before searching
+        if self.task_filter:
+            self.task_filter.cancel()
+        self.task_filter = asyncio.create_task(self._load_flows_after(delay))
+
+    async def _load_flows_after(self, delay: float):
+        await asyncio.sleep(delay)
+        await self._load_flows()
+
+    async def on_change_textfield_search(self, e):
+        self.filters['search'] = e.control.value.strip() or None
+        await self._filter_flows(delay=0.3)
+
+    async def on_change_textfield_tag(self, e):
+        self.filters['tag'] = e.control.value.strip() or None
+        await self._filter_flows(delay=0.3)
+
+    async def on_change_dropdown_status(self, e):
+        self.filters['status'] = None if e.control.value == 'all' else e.control.value
+        await self._filter_flows()
+
+    async def on_change_dropdown_sort(self, e):
+        self.filters['sort'] = e.control.value
+        await self._filter_flows()
+
+    async def on_scroll_listview_flows(self, e: ft.OnScrollEvent):
+        # Near the end of the flows loaded
+        if e.pixels >= e.max_scroll_extent - e.viewport_dimension:
+            await self._load_next_page()
+
+    async def on_click_floatingactionbutton_update_new_flow(self, e):
+        await Repository.write(self.flows_executor.update_new_flow_in_python_files)
         await self._load_flows()
 
     async def on_click_floatingactionbutton_sync(self, e):
-        await self.clean_async()
-        await self.did_mount_async()
+        await self._load_flows()
+
+    async def on_click_floatingactionbutton_upcoming(self, e):
+        await self.page.go_async('upcoming')
 
     async def did_mount_async(self):
         self.task_load_flows = asyncio.create_task(self._load_flows())
+        self.task_watch_changes = asyncio.create_task(self._watch_changes())
 
     async def will_unmount_async(self):
         self.task_load_flows.cancel()
+        self.task_watch_changes.cancel()
+        if self.task_filter:
+            self.task_filter.cancel()
 
 
 def view_home():
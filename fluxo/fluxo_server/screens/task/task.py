@@ -1,13 +1,16 @@
 import flet as ft
 import asyncio
 from datetime import timedelta
-from fluxo.settings import AppThemeColors
-from fluxo.uttils import convert_str_to_datetime
+from fluxo.settings import AppSettings, AppThemeColors, Profiling
+from fluxo.uttils import convert_str_to_datetime, format_bytes
 from fluxo.fluxo_server.screens.app_bar import AppBar
 from fluxo.fluxo_server.screens.footer import Footer
+from fluxo.fluxo_server.repository import Repository
 from fluxo.fluxo_core.database.task import ModelTask
 from fluxo.fluxo_core.database.flow import ModelFlow
 from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+from fluxo.fluxo_core.database.profile_request import ModelProfileRequest
+from fluxo.fluxo_core.profiling import Profiler
 
 
 class Task(ft.UserControl):
@@ -23,7 +26,13 @@ class Task(ft.UserControl):
         self.text_start_time = ft.Ref[ft.Text]()
         self.text_end_time = ft.Ref[ft.Text]()
         self.text_duration = ft.Ref[ft.Text]()
+        self.text_cpu_time = ft.Ref[ft.Text]()
+        self.text_memory_io = ft.Ref[ft.Text]()
+        self.text_profile = ft.Ref[ft.Text]()
+        self.text_profile_summary = ft.Ref[ft.Text]()
+        self.button_profile = ft.Ref[ft.TextButton]()
         self.text_error = ft.Ref[ft.Text]()
+        self.button_error_more = ft.Ref[ft.TextButton]()
 
         return ft.Column(
             controls=[
@@ -96,6 +105,58 @@ class Task(ft.UserControl):
                                 ), # Row
                                 padding=ft.padding.only(left=50)
                             ),
+                            ft.Container(
+                                content=ft.Row(
+                                    controls=[
+                                        ft.Text(
+                                            ref=self.text_cpu_time,
+                                            color=AppThemeColors.BLACK,
+                                            size=15
+                                        ), # Text
+                                    ], # controls
+                                ), # Row
+                                padding=ft.padding.only(left=50)
+                            ),
+                            ft.Container(
+                                content=ft.Row(
+                                    controls=[
+                                        ft.Text(
+                                            ref=self.text_memory_io,
+                                            color=AppThemeColors.BLACK,
+                                            size=15
+                                        ), # Text
+                                    ], # controls
+                                ), # Row
+                                padding=ft.padding.only(left=50)
+                            ),
+                            ft.Container(
+                                content=ft.Row(
+                                    controls=[
+                                        ft.Text(
+                                            ref=self.text_profile,
+                                            color=AppThemeColors.BLACK,
+                                            selectable=True,
+                                            size=15
+                                        ), # Text
+                                        ft.TextButton(
+                                            ref=self.button_profile,
+                                            text=f'Profile next {Profiling.DEFAULT_RUNS} runs',
+                                            on_click=self.on_click_button_profile
+                                        ), # TextButton
+                                    ], # controls
+                                ), # Row
+                                padding=ft.padding.only(left=50)
+                            ),
+                            ft.Container(
+                                content=ft.Text(
+                                    ref=self.text_profile_summary,
+                                    color=AppThemeColors.BLACK_SECONDARY,
+                                    font_family='monospace',
+                                    selectable=True,
+                                    size=12
+                                ), # Text
+                                padding=ft.padding.only(left=50)
+                            ),
                             ft.Container(
                                 content=ft.Row(
                                     controls=[
@@ -111,6 +172,11 @@ class Task(ft.UserControl):
                                                         ref=self.text_error,
                                                         color=AppThemeColors.BLACK
                                                     ), # Text
+                                                    ft.TextButton(
+                                                        ref=self.button_error_more,
+                                                        visible=False,
+                                                        on_click=self.on_click_button_error_more
+                                                    ), # TextButton
                                                 ], # controls
                                                 scroll=ft.ScrollMode.ALWAYS,
                                             ), # Column
@@ -135,8 +201,10 @@ class Task(ft.UserControl):
         ) # Column
     
     async def _load_attributes_task(self):
-        task = ModelTask.get_by_id(self.task_id)
-        flow = ModelFlow.get_by_id(task.flow_id)
+        # Only the start and the end of a large error, the rest is read when asked for
+        task, error_tail = await Repository.cached_read(
+            ModelTask.get_by_id_with_error_preview, self.task_id, AppSettings.ERROR_PREVIEW_CHARS, AppSettings.ERROR_PREVIEW_CHARS)
+        flow = await Repository.cached_read(ModelFlow.get_by_id, task.flow_id)
 
         self.text_name_flow.current.value = flow.name
         self.text_name_task.current.value = task.name
@@ -146,6 +214,8 @@ class Task(ft.UserControl):
             self.text_start_time.current.value = f'Start time: {task.start_time}'
             self.text_end_time.current.value = f'End time: -'
             self.text_duration.current.value = f'Duration: -'
+            self.text_cpu_time.current.value = f'CPU time: -'
+            self.text_memory_io.current.value = f'Peak memory / I/O: -'
 
         elif task.end_time and task.error:
             data_start_time = convert_str_to_datetime(task.start_time)
@@ -156,7 +226,8 @@ class Task(ft.UserControl):
             self.text_start_time.current.value = f'Start time: {task.start_time}'
             self.text_end_time.current.value = f'End time: {task.end_time}'
             self.text_duration.current.value = f'Duration: {diference.total_seconds()} seconds'
-            self.text_error.current.value = task.error
+            self._load_resource_usage(task)
+            self._load_error(task, error_tail)
 
         else:
             data_start_time = convert_str_to_datetime(task.start_time)
@@ -167,8 +238,77 @@ class Task(ft.UserControl):
             self.text_start_time.current.value = f'Start time: {task.start_time}'
             self.text_end_time.current.value = f'End time: {task.end_time}'
             self.text_duration.current.value = f'Duration: {diference.total_seconds()} seconds'
-            self.text_error.current.value = task.error
+            self._load_resource_usage(task)
+            self._load_error(task, error_tail)
+
+        await self._load_profile(task)
+        await self.update_async()
+
+    def _load_error(self, task: ModelTask, error_tail: str):
+        self.error_head = task.error or ''
+        self.error_tail = error_tail or ''
+        self.error_size = task.error_size or 0
+        self._show_error()
+
+    def _show_error(self):
+        hidden = self.error_size - len(self.error_head) - len(self.error_tail)
+        if hidden <= 0:
+            self.text_error.current.value = self.error_head + self.error_tail
+            self.button_error_more.current.visible = False
+            return
+
+        self.text_error.current.value = \
+            f'{self.error_head}\n\n[... {hidden} characters hidden ...]\n\n{self.error_tail}'
+        self.button_error_more.current.text = f'Show {min(hidden, AppSettings.ERROR_CHUNK_CHARS)} more characters'
+        self.button_error_more.current.visible = True
+
+    async def on_click_button_error_more(self, e):
+        hidden = self.error_size - len(self.error_head) - len(self.error_tail)
+        chunk = await Repository.read(
+            ModelTask.get_error_chunk, self.task_id, len(self.error_head), min(hidden, AppSettings.ERROR_CHUNK_CHARS))
+        if not chunk: # The task was deleted
+            return
+
+        self.error_head += chunk
+        self._show_error()
+        await self.update_async()
+
+    def _load_resource_usage(self, task: ModelTask):
+        # Tasks executed before the resource accounting only have start and end times
+        if task.wall_time is None:
+            self.text_cpu_time.current.value = f'CPU time: -'
+            self.text_memory_io.current.value = f'Peak memory / I/O: -'
+            return
+
+        self.text_duration.current.value = f'Duration: {task.wall_time:.3f} seconds'
+        self.text_cpu_time.current.value = \
+            f'CPU time: {task.cpu_time:.3f} seconds (thread: {task.thread_cpu_time:.3f} seconds)'
+        self.text_memory_io.current.value = \
+            f'Peak memory: +{format_bytes(task.peak_rss_delta)} | ' \
+            f'Read: {format_bytes(task.read_bytes)} | Written: {format_bytes(task.write_bytes)}'
+
+    async def _load_profile(self, task: ModelTask):
+        if task.profile_path is None:
+            self.text_profile.current.value = 'Profile: -'
+            return
+
+        self.text_profile.current.value = f'Profile: {task.profile_path}'
+        functions = await Repository.read(Profiler.top_functions, task.profile_path) # Parsing the stats takes a while
+        if functions:
+            lines = [f'{"cumulative":>10} {"own":>10} {"calls":>8}  function']
+            lines += [
+                f'{function["cumulative_time"]:>9.3f}s {function["total_time"]:>9.3f}s {function["calls"]:>8}  {function["function"]}'
+                for function in functions
+            ]
+            self.text_profile_summary.current.value = '\n'.join(lines)
+
+    async def on_click_button_profile(self, e):
+        task = await Repository.read(ModelTask.get_by_id, self.task_id)
+        await Repository.write(
+            ModelProfileRequest(flow_id=task.flow_id, task_name=task.name, remaining=Profiling.DEFAULT_RUNS).save)
 
+        e.control.disabled = True
+        e.control.text = f'The next {Profiling.DEFAULT_RUNS} runs will be profiled'
         await self.update_async()
 
     async def iconbutton_go_back(self, e):
@@ -0,0 +1,159 @@
+import flet as ft
+import asyncio
+from collections import Counter
+from datetime import datetime
+from fluxo.settings import AppThemeColors
+from fluxo.fluxo_server.screens.app_bar import AppBar
+from fluxo.fluxo_server.screens.footer import Footer
+from fluxo.fluxo_server.repository import Repository
+from fluxo.fluxo_core.upcoming import UpcomingRuns
+
+
+class Upcoming(ft.UserControl):
+    def __init__(self):
+        super().__init__(expand=True)
+        self.hours = 6
+
+    def build(self):
+        self.text_summary = ft.Ref[ft.Text]()
+        self.listview_minutes = ft.Ref[ft.ListView]()
+
+        return ft.Column(
+            controls=[
+                ft.Container(
+                    content=ft.Row(
+                        controls=[
+                            ft.IconButton(
+                                icon=ft.icons.ARROW_BACK_ROUNDED,
+                                on_click=self.iconbutton_go_back,
+                                icon_color=AppThemeColors.BLACK,
+                                icon_size=30
+                            ),
+                            ft.Text(
+                                value='Upcoming runs',
+                                weight=ft.FontWeight.BOLD,
+                                color=AppThemeColors.BLACK,
+                                size=25,
+                                expand=True
+                            ), # Text
+                            ft.Dropdown(
+                                label='Next',
+                                dense=True,
+                                width=140,
+                                value=str(self.hours),
+                                options=[
+                                    ft.dropdown.Option('1', '1 hour'),
+                                    ft.dropdown.Option('6', '6 hours'),
+                                    ft.dropdown.Option('24', '24 hours'),
+                                ],
+                                on_change=self.on_change_dropdown_hours
+                            ), # Dropdown
+                        ]
+                    ),
+                    width=900
+                ), # Container
+                ft.Container(
+                    content=ft.Text(
+                        ref=self.text_summary,
+                        color=AppThemeColors.BLACK_SECONDARY,
+                        size=15
+                    ), # Text
+                    width=900
+                ), # Container
+                ft.Container(
+                    content=ft.ListView(
+                        ref=self.listview_minutes,
+                        controls=[
+
+                        ], # controls
+                        spacing=5,
+                        expand=True
+                    ), # ListView
+                    width=900,
+                    expand=True
+                ), # Container
+            ], # controls
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            expand=True
+        ) # Column
+
+    async def _load_upcoming(self):
+        # The start is cut to the minute, so the browsers open in the same minute share the result
+        start = datetime.now().replace(second=0, microsecond=0)
+        runs = await Repository.cached_read(UpcomingRuns.compute, hours=self.hours, start=start)
+        minutes = runs.load_per_minute()
+
+        summary = f'{len(runs.fires)} runs of {len({flow_name for _, flow_name in runs.fires})} flows'
+        if minutes:
+            busiest, flow_names = max(minutes, key=lambda minute: len(minute[1]))
+            summary += f' | Busiest minute: {busiest:%H:%M} with {len(flow_names)} runs'
+        if runs.truncated:
+            summary += f' | Only the first runs of {", ".join(runs.truncated)}'
+        if runs.approximate:
+            summary += f' | Approximate times for {", ".join(runs.approximate)}'
+        self.text_summary.current.value = summary
+
+        self.listview_minutes.current.controls = [self._minute_row(minute, flow_names) for minute, flow_names in minutes]
+        await self.update_async()
+
+    def _minute_row(self, minute: datetime, flow_names: list):
+        counts = Counter(flow_names)
+        return ft.Row(
+            controls=[
+                ft.Text(
+                    value=f'{minute:%d/%m %H:%M}',
+                    color=AppThemeColors.BLACK,
+                    font_family='monospace',
+                    width=100
+                ), # Text
+                ft.Container(
+                    bgcolor=AppThemeColors.RED if len(counts) > 1 else AppThemeColors.PRIMARY, # Flows collide
+                    height=15,
+                    width=min(10 * len(flow_names), 200),
+                    border_radius=ft.border_radius.all(15),
+                    tooltip=f'{len(flow_names)} runs'
+                ), # Container
+                ft.Text(
+                    value=', '.join(f'{name} (x{count})' if count > 1 else name for name, count in counts.items()),
+                    color=AppThemeColors.BLACK_SECONDARY,
+                    expand=True
+                ), # Text
+            ]
+        )
+
+    async def _refresh(self):
+        # The window moves with the time, so it is projected again every minute
+        while True:
+            await self._load_upcoming()
+            await asyncio.sleep(60)
+
+    async def on_change_dropdown_hours(self, e):
+        self.hours = int(e.control.value)
+        await self._load_upcoming()
+
+    async def iconbutton_go_back(self, e):
+        await self.page.go_async('/')
+
+    async def did_mount_async(self):
+        self.task_refresh = asyncio.create_task(self._refresh())
+
+    async def will_unmount_async(self):
+        self.task_refresh.cancel()
+
+
+def view_upcoming():
+
+    return ft.View(
+        route='upcoming',
+        controls=[
+            AppBar(),
+            ft.Container(
+                content=Upcoming(),
+                expand=True,
+                padding=ft.padding.all(15)
+            ),
+            Footer()
+        ],
+        padding=ft.padding.all(0),
+        bgcolor=AppThemeColors.WHITE,
+    )
@@ -1,8 +1,18 @@
 from fluxo.fluxo_core.flows_executor import FlowsExecutor
+from fluxo.fluxo_core.dispatcher import Dispatcher
+from fluxo.fluxo_core.metrics import start_http_server
+from fluxo.settings import Metrics, Scheduling
 from fluxo.logging import logger
 
 
 if __name__ == '__main__':
+    if Metrics.ENABLED:
+        start_http_server(Metrics.PORT_SCHEDULE)
+
+    if Scheduling.DISPATCHER:
+        Dispatcher().run()
+        raise SystemExit
+
     flows_executor = FlowsExecutor()
     try:
         flows_executor.execute_parallel_flows()
@@ -1,8 +1,11 @@
 import flet as ft
-from fluxo.settings import FONTS, AppThemeColors, AppSettings
+from fluxo.settings import FONTS, AppThemeColors, AppSettings, Metrics, Api
+from fluxo.fluxo_core.metrics import start_http_server
+from fluxo.fluxo_server.api import start_api_server
 from fluxo.fluxo_server.screens.home.home import view_home
 from fluxo.fluxo_server.screens.flow_execution.flow_execution import view_flow_execution
 from fluxo.fluxo_server.screens.task.task import view_task
+from fluxo.fluxo_server.screens.upcoming.upcoming import view_upcoming
 
 
 class App:
@@ -29,6 +32,9 @@ class App:
             elif t_route.match('task/:id'):
                 self.page.views.append(view_task(t_route.id))
 
+            elif t_route.match('upcoming'):
+                self.page.views.append(view_upcoming())
+
             await self.page.update_async()
 
         async def view_pop(view):
@@ -45,6 +51,11 @@ async def main(page: ft.Page):
     await App(page).init()
 
 if __name__ == '__main__':
+    if Metrics.ENABLED:
+        start_http_server(Metrics.PORT_SERVER)
+    if Api.ENABLED:
+        start_api_server(Api.PORT)
+
     ft.app(target=main, 
            view=ft.AppView.WEB_BROWSER,
            port=AppSettings.PORT,
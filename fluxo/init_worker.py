@@ -0,0 +1,29 @@
+import signal
+import multiprocessing
+from fluxo.fluxo_core.database.db import _verify_if_db_exists
+from fluxo.fluxo_core.dispatcher import start_lease_workers
+from fluxo.settings import PathFilesPython, Scheduling
+from fluxo.logging import logger
+
+
+if __name__ == '__main__':
+    # A worker node: runs the executions queued by a dispatcher started with FLUXO_BROKER=1
+    _verify_if_db_exists()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    stop_event = multiprocessing.Event()
+    workers = start_lease_workers(PathFilesPython.PATH_FILES_PYTHON, Scheduling.WORKERS, stop_event)
+    logger.info(f'Worker node started with {Scheduling.WORKERS} worker(s)')
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        logger.warning('Program interrupted by the user')
+    finally:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        logger.info('Worker node stopped')
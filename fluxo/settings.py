@@ -7,6 +7,18 @@ class AppSettings:
     VERSION = 'v0.14.2'
     PORT = 7777
     ASSETS_DIR = 'fluxo_server/assets'
+    # How often the open pages check the database for changes to show
+    LIVE_UPDATE_INTERVAL = float(os.environ.get('FLUXO_LIVE_UPDATE_INTERVAL', '1.0')) # seconds
+    # Threads reading the database for the pages, each with its own connection
+    DB_READ_THREADS = int(os.environ.get('FLUXO_SERVER_DB_THREADS', '4'))
+    # Results of the page queries shared by the browsers until the database changes
+    CACHE_SIZE = int(os.environ.get('FLUXO_SERVER_CACHE_SIZE', '256'))
+    # Flows loaded at a time by the flows page, the next ones when scrolled to the end
+    PAGE_SIZE = 50
+    # Characters of the start and of the end of an error shown by the task page, the rest on demand
+    ERROR_PREVIEW_CHARS = 2000
+    # Characters of an error loaded each time 'Show more' is clicked
+    ERROR_CHUNK_CHARS = 20000
 
 class AppThemeColors:
     '''Cores do tema da aplicação Fluxo'''
@@ -28,6 +40,101 @@ class Db:
     NAME = 'database_fluxo.sqlite3'
     PATH = os.path.join(os.getcwd(), NAME)
 
+class Scheduling:
+    '''Agendamento das execuções dos flows'''
+    # A fire that is late by more than this (e.g. the scheduler was down) is a misfire
+    MISFIRE_GRACE_TIME = 60 # seconds
+    # At most this many missed fires are run by the 'all' misfire policy, the oldest are skipped
+    MAX_CATCH_UP_RUNS = 100
+    # Fires of each flow are moved by a hash of its name within this window (seconds), 0 disables it.
+    # Flow(spread_window=...) overrides it per flow
+    SPREAD_WINDOW = int(os.environ.get('FLUXO_SPREAD_WINDOW', '0'))
+    # One dispatcher process sends the fires of all flows to a pool of workers
+    DISPATCHER = os.environ.get('FLUXO_DISPATCHER', '0') == '1' or os.environ.get('FLUXO_BROKER', '0') == '1'
+    WORKERS = int(os.environ.get('FLUXO_WORKERS', str(os.cpu_count() or 4)))
+    # An execution waiting for a worker of the dispatcher gains one priority level every this many seconds
+    PRIORITY_AGING = float(os.environ.get('FLUXO_PRIORITY_AGING', '60'))
+    # How often the dispatcher reads the flows switched on and off in the UI
+    RECONCILE_INTERVAL = 2.0 # seconds
+    # The dispatcher queues the executions in the database, for worker nodes (`python -m fluxo.init_worker`)
+    BROKER = os.environ.get('FLUXO_BROKER', '0') == '1'
+    # A node renews the lease of its execution every third of this; an expired lease is claimed by another node
+    LEASE_TTL = float(os.environ.get('FLUXO_LEASE_TTL', '30')) # seconds
+    # An execution whose lease expired this many times is failed
+    MAX_ATTEMPTS = 3
+    # How often idle nodes look for executions, and the dispatcher for finished ones
+    BROKER_POLL_INTERVAL = 0.5 # seconds
+    # The leader dispatcher renews its lease every third of this; standbys of other machines take over when it expires
+    LEADER_TTL = float(os.environ.get('FLUXO_LEADER_TTL', '10')) # seconds
+    # Processes running flows write a heartbeat this often; one of another host silent for HEARTBEAT_TIMEOUT is dead
+    HEARTBEAT_INTERVAL = 5.0 # seconds
+    HEARTBEAT_TIMEOUT = float(os.environ.get('FLUXO_HEARTBEAT_TIMEOUT', '30')) # seconds
+    # How often the scheduler closes the executions and flows left behind by dead processes
+    REAP_INTERVAL = 15.0 # seconds
+    # Starts again the schedule of a flow whose process died
+    REAP_RESTART = os.environ.get('FLUXO_REAP_RESTART', '0') == '1'
+    # Fires of each flow projected by the upcoming runs, the next ones are left out
+    UPCOMING_MAX_FIRES = 1000
+
+class Concurrency:
+    '''Limites de execuções simultâneas dos flows, entre todos os processos'''
+    # Flows running at the same time on the machine, 0 is unlimited
+    MAX_RUNNING = int(os.environ.get('FLUXO_MAX_RUNNING', '0'))
+    # Flows running at the same time with each tag. Ex: FLUXO_TAG_LIMITS='warehouse=2;api=1'
+    TAG_LIMITS = os.environ.get('FLUXO_TAG_LIMITS', '')
+    DIR = os.path.join(os.path.dirname(Db.PATH), 'fluxo_locks')
+    # How often the first flow waiting for a limit checks for a free slot
+    POLL_INTERVAL = 0.1 # seconds
+
+class Artifacts:
+    '''Armazenamento dos valores retornados pelas tasks'''
+    # Values up to this size are pickled into the database, bigger ones go to shared memory
+    INLINE_MAX_BYTES = 64 * 1024
+
+class Tracing:
+    '''Rastreamento (spans) das execuções dos flows'''
+    ENABLED = os.environ.get('FLUXO_TRACING', '0') == '1'
+    # Fraction of the flow executions that are traced (0.0 to 1.0)
+    SAMPLE_RATE = float(os.environ.get('FLUXO_TRACING_SAMPLE_RATE', '1.0'))
+    PATH = os.path.join(os.getcwd(), 'fluxo_traces.jsonl')
+    MAX_BYTES = 10 * 1024 * 1024
+    BACKUP_COUNT = 5
+
+class Metrics:
+    '''Métricas no formato de texto do Prometheus'''
+    ENABLED = os.environ.get('FLUXO_METRICS', '0') == '1'
+    HOST = os.environ.get('FLUXO_METRICS_HOST', '127.0.0.1')
+    PORT_SCHEDULE = int(os.environ.get('FLUXO_METRICS_PORT_SCHEDULE', '9464'))
+    PORT_SERVER = int(os.environ.get('FLUXO_METRICS_PORT_SERVER', '9465'))
+    # Each process writes its metrics here, the endpoints aggregate all files
+    DIR = os.path.join(os.getcwd(), 'fluxo_metrics')
+    FLUSH_INTERVAL = 1.0 # seconds
+
+class Api:
+    '''API HTTP (JSON, somente leitura) do estado do Fluxo, servida junto com o servidor'''
+    ENABLED = os.environ.get('FLUXO_API', '0') == '1'
+    HOST = os.environ.get('FLUXO_API_HOST', '127.0.0.1')
+    PORT = int(os.environ.get('FLUXO_API_PORT', '7778'))
+    # Requests answered at the same time, each thread with its own read only connection
+    THREADS = int(os.environ.get('FLUXO_API_THREADS', '4'))
+    PAGE_SIZE = 100 # Items of a page when 'limit' is not given
+    MAX_PAGE_SIZE = 1000
+
+class Analytics:
+    '''Agregados (por hora e por dia) das durações e falhas das execuções'''
+    # Every percentile is within this relative error of the true duration (DDSketch)
+    RELATIVE_ACCURACY = 0.01
+    # Shorter durations are counted as this one
+    MIN_DURATION = 0.001 # seconds
+
+class Profiling:
+    '''Perfilamento (cProfile) das tasks sob demanda'''
+    DIR = os.path.join(os.path.dirname(Db.PATH), 'fluxo_profiles')
+    # Number of invocations profiled when requested from the UI
+    DEFAULT_RUNS = 5
+    # Ex: FLUXO_PROFILE='My Flow 1=3;My Flow 2/My Task 1=5'
+    FROM_ENV = os.environ.get('FLUXO_PROFILE', '')
+
 class PathFilesPython:
     FOLDER = 'python_files'
     PATH_FILES_PYTHON = os.path.join(os.getcwd(), FOLDER)
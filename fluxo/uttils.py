@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta
 
 
@@ -48,3 +49,43 @@ def add_minutes_to_utc_time(minutes: int, time=None):
     format_str = "%Y/%m/%d %H:%M:%S"
     formatted_time = new_time.strftime(format_str)
     return formatted_time
+
+
+def format_bytes(size: int):
+    '''
+    Formats a number of bytes as a human readable string.
+
+    Parameters:
+    - size (int): The number of bytes.
+
+    Returns:
+    str: The formatted size, e.g. '12.3 MB', or '-' when the size is unknown.
+    '''
+    if size is None:
+        return '-'
+
+    value = float(size)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(value) < 1024 or unit == 'GB':
+            break
+        value /= 1024
+    return f'{value:.0f} {unit}' if unit == 'B' else f'{value:.1f} {unit}'
+
+
+def is_process_alive(pid: int):
+    '''
+    Returns whether a process of this host exists, without signaling it.
+
+    Parameters:
+    - pid (int): The ID of the process.
+
+    Returns:
+    bool: False only when no process has this ID.
+    '''
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # It exists, but belongs to another user
+    return True
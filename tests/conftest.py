@@ -0,0 +1,14 @@
+import pytest
+from fluxo.settings import Db
+from fluxo.fluxo_core.database.db import create_db
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    '''
+    A new database for the test, used by `connect()` instead of the one of the project.
+    '''
+    path = str(tmp_path / 'fluxo.db')
+    monkeypatch.setattr(Db, 'PATH', path)
+    create_db(path)
+    return path
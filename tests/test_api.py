@@ -0,0 +1,43 @@
+import pytest
+from fluxo.uttils import current_time_formatted
+from fluxo.fluxo_server import api
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+
+@pytest.fixture
+def flow(db):
+    ModelFlow(name='Flow', interval={'minutes': 1, 'at': ':00'}, list_names_tasks=['Task']).save()
+    return ModelFlow.get_by_name('Flow')
+
+
+def _run(flow):
+    return ModelLogExecutionFlow(name=flow.name, id_flow=flow.id, start_time=current_time_formatted()).save()
+
+
+@pytest.mark.parametrize('last_runs', ['0', '-3', str(10 ** 6), 'x'])
+def test_last_runs_is_validated(flow, last_runs):
+    with pytest.raises(ValueError):
+        api.flows({'last_runs': [last_runs]})
+    with pytest.raises(ValueError):
+        api.flow({'last_runs': [last_runs]}, flow.id)
+
+
+def test_last_runs(flow):
+    ids = [_run(flow).id for _ in range(3)]
+    assert [run['id'] for run in api.flow({'last_runs': ['2']}, flow.id)['last_runs']] == ids[1:]
+    assert [run['id'] for run in api.flows({})['items'][0]['last_runs']] == ids[2:]
+
+
+def test_unfinished_runs_are_polled_again(flow):
+    first, second = _run(flow), _run(flow)
+    page = api.runs({})
+    assert [run['status'] for run in page['items']] == ['running', 'running']
+
+    first.end_time = current_time_formatted()
+    first.update(**first.__dict__)
+
+    # The cursor does not return the finished run, the unfinished ones show it is gone
+    assert api.runs({'after': [str(page['next'])]})['items'] == []
+    assert [run['id'] for run in api.runs({'unfinished': ['1']})['items']] == [second.id]
+    assert api.run({}, first.id)['status'] == 'success'
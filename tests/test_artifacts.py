@@ -0,0 +1,66 @@
+import ctypes
+import gc
+import pytest
+from fluxo.settings import Artifacts
+from fluxo.fluxo_core.artifacts import ArtifactStore
+from fluxo.fluxo_core.database.artifact import ModelArtifact
+
+LARGE = b'x' * (Artifacts.INLINE_MAX_BYTES + 1)
+
+pytestmark = pytest.mark.filterwarnings('error::pytest.PytestUnraisableExceptionWarning')
+
+
+@pytest.fixture(autouse=True)
+def store(db):
+    yield
+    ArtifactStore._unclosed.clear()
+    gc.collect()
+
+
+def test_inline_and_shared_memory_values(db):
+    assert ArtifactStore.put(1, 'Small', {'a': 1}).storage == 'inline'
+    assert ArtifactStore.put(1, 'Large', LARGE).storage == 'shared_memory'
+    assert ArtifactStore.put(1, 'Objects', list(range(100000))).storage == 'shared_memory'
+    assert ArtifactStore.put(1, 'Nothing', None) is None
+
+    assert ArtifactStore.get(1, 'Small') == {'a': 1}
+    assert ArtifactStore.get(1, 'Large') == LARGE
+    assert ArtifactStore.get(1, 'Objects') == list(range(100000))
+    assert ArtifactStore.get(1, 'Nothing') is None
+
+    ArtifactStore.release(1)
+    assert ModelArtifact.get_all_by_id_log_flow(1) is None
+    assert ArtifactStore._segments == {} and ArtifactStore._views == {}
+
+
+def test_release_invalidates_the_views(db):
+    ArtifactStore.put(1, 'Large', LARGE)
+    view = ArtifactStore.get(1, 'Large')
+
+    ArtifactStore.release(1)
+    with pytest.raises(ValueError):
+        view[0]
+    assert ArtifactStore._unclosed == []
+
+
+def test_release_while_a_view_is_exported(db):
+    ArtifactStore.put(1, 'Large', LARGE)
+    array = (ctypes.c_char * len(LARGE)).from_buffer(ArtifactStore.get(1, 'Large'))
+
+    ArtifactStore.release(1)
+    assert len(ArtifactStore._unclosed) == 1
+    assert array[0] == b'x' # Still mapped
+
+    del array
+    ArtifactStore.release(2)
+    assert ArtifactStore._unclosed == []
+
+
+def test_storage_failure_is_not_raised(db, monkeypatch):
+    def fail(self):
+        raise RuntimeError('database is locked')
+    monkeypatch.setattr(ModelArtifact, 'save', fail)
+
+    assert ArtifactStore.put(1, 'Small', b'x') is None
+    assert ArtifactStore.put(1, 'Large', LARGE) is None
+    assert ArtifactStore._segments == {}
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+import pytest
+from fluxo.fluxo_core.cron import CronExpression
+
+
+def _values(bits: int):
+    return [value for value in range(bits.bit_length()) if bits >> value & 1]
+
+
+@pytest.mark.parametrize('field, expected', [
+    ('*', list(range(60))),
+    ('5', [5]),
+    ('10-13', [10, 11, 12, 13]),
+    ('*/15', [0, 15, 30, 45]),
+    ('10-30/10', [10, 20, 30]),
+    ('50/4', [50, 54, 58]),
+    ('1,3,5-6', [1, 3, 5, 6]),
+])
+def test_parse_minutes(field, expected):
+    assert _values(CronExpression(f'{field} * * * *').minutes) == expected
+
+
+def test_parse_names():
+    cron = CronExpression('0 0 * jan,MAR-may mon-Fri')
+    assert _values(cron.months) == [1, 3, 4, 5]
+    assert _values(cron.days_of_week) == [1, 2, 3, 4, 5]
+
+
+def test_parse_seven_is_sunday():
+    assert _values(CronExpression('0 0 * * 7').days_of_week) == [0]
+    assert _values(CronExpression('0 0 * * 5-7').days_of_week) == [0, 5, 6]
+    assert CronExpression('0 0 * * 7').next_fire(datetime(2024, 6, 3)) == datetime(2024, 6, 9)
+
+
+def test_parse_macros():
+    assert CronExpression('@hourly').next_fire(datetime(2024, 6, 3, 10, 30)) == datetime(2024, 6, 3, 11, 0)
+    assert CronExpression('@weekly').next_fire(datetime(2024, 6, 3)) == datetime(2024, 6, 9)
+
+
+@pytest.mark.parametrize('expression', [
+    '* * * *',
+    '* * * * * *',
+    '60 * * * *',
+    '* 24 * * *',
+    '* * 0 * *',
+    '* * 32 * *',
+    '* * * 13 *',
+    '* * * * 8',
+    '30-10 * * * *',
+    '*/0 * * * *',
+    '-5 * * * *',
+    'a * * * *',
+    '* * * FOO *',
+    '',
+])
+def test_parse_invalid(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_parse_is_cached():
+    assert CronExpression.parse('*/5 * * * *') is CronExpression.parse('*/5 * * * *')
+
+
+def test_next_fire_is_strictly_after():
+    cron = CronExpression('*/5 * * * *')
+    assert cron.next_fire(datetime(2024, 6, 3, 10, 0)) == datetime(2024, 6, 3, 10, 5)
+    assert cron.next_fire(datetime(2024, 6, 3, 10, 4, 59, 999999)) == datetime(2024, 6, 3, 10, 5)
+
+
+def test_next_fire_rolls_over_the_year():
+    assert CronExpression('59 23 31 12 *').next_fire(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 12, 31, 23, 59)
+    assert CronExpression('0 0 1 1 *').next_fire(datetime(2024, 12, 31, 23, 59)) == datetime(2025, 1, 1)
+
+
+def test_next_fire_skips_short_months():
+    cron = CronExpression('0 12 31 * *')
+    fires = list(cron.fire_times(datetime(2024, 1, 31, 12), datetime(2024, 12, 31, 12)))
+    assert [fire.month for fire in fires] == [3, 5, 7, 8, 10, 12]
+
+
+def test_next_fire_never_fires():
+    with pytest.raises(ValueError):
+        CronExpression('0 0 30 2 *').next_fire(datetime(2024, 1, 1))
+
+
+def test_next_fire_february_29():
+    cron = CronExpression('0 0 29 2 *')
+    assert cron.next_fire(datetime(2023, 3, 1)) == datetime(2024, 2, 29)
+    assert cron.next_fire(datetime(2024, 2, 29)) == datetime(2028, 2, 29)
+    # 2100 is not a leap year
+    assert cron.next_fire(datetime(2096, 2, 29)) == datetime(2104, 2, 29)
+
+
+def test_next_fire_day_fields_or_rule():
+    # Both restricted: the 13th OR a Friday
+    cron = CronExpression('0 0 13 * 5')
+    fires = list(cron.fire_times(datetime(2024, 9, 1), datetime(2024, 9, 30)))
+    assert [fire.day for fire in fires] == [6, 13, 20, 27]
+
+    cron = CronExpression('0 0 1 * 1')
+    fires = list(cron.fire_times(datetime(2024, 6, 30), datetime(2024, 7, 31)))
+    assert [fire.day for fire in fires] == [1, 8, 15, 22, 29]
+
+
+def test_next_fire_star_step_day_fields_and_rule():
+    # A day field starting with '*' is not restricted, so both fields must match
+    cron = CronExpression('0 0 */2 * 1')
+    fires = list(cron.fire_times(datetime(2024, 6, 30), datetime(2024, 7, 31)))
+    assert [fire.day for fire in fires] == [1, 15, 29] # Odd days that are Mondays
+
+    cron = CronExpression('0 0 10 * */3')
+    fires = list(cron.fire_times(datetime(2024, 6, 30), datetime(2024, 10, 31)))
+    assert fires == [datetime(2024, 7, 10), datetime(2024, 8, 10)] # The 10th when it is a Sun, Wed or Sat
+
+
+@pytest.mark.parametrize('expression', [
+    '*/7 */5 * * *',
+    '15 3 1-7 * 1',
+    '0 6 */3 * *',
+    '30 12 * 2 sun',
+    '0 0 28-31 * *',
+])
+def test_fire_times_match_a_minute_scan(expression):
+    cron = CronExpression(expression)
+    after, until = datetime(2024, 1, 30, 22, 13), datetime(2024, 3, 5)
+
+    def matches(time: datetime):
+        day = cron.days >> time.day & 1
+        day_of_week = cron.days_of_week >> (time.isoweekday() % 7) & 1
+        if cron._days_restricted and cron._days_of_week_restricted:
+            day_matches = day or day_of_week
+        else:
+            day_matches = day and day_of_week
+        return (cron.minutes >> time.minute & 1 and cron.hours >> time.hour & 1
+                and cron.months >> time.month & 1 and day_matches)
+
+    expected, time = [], after.replace(second=0) + timedelta(minutes=1)
+    while time <= until:
+        if matches(time):
+            expected.append(time)
+        time += timedelta(minutes=1)
+
+    assert list(cron.fire_times(after, until)) == expected
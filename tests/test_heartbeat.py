@@ -0,0 +1,63 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from fluxo.settings import Scheduling
+from fluxo.uttils import current_time_formatted
+from fluxo.fluxo_core.heartbeat import Reaper
+from fluxo.fluxo_core.database.db import connect
+from fluxo.fluxo_core.database.heartbeat import ModelHeartbeat
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+HOST = socket.gethostname()
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+def _beat(host: str, pid: int, age: float = 0):
+    worker = f'{host}:{pid}'
+    ModelHeartbeat.beat(worker, host, pid)
+    conn = connect()
+    conn.execute('UPDATE TB_Heartbeat SET last_beat=? WHERE worker=?', (time.time() - age, worker))
+    conn.commit()
+    conn.close()
+    return worker
+
+
+def _execution(worker: str):
+    return ModelLogExecutionFlow(name='Flow', id_flow=1, start_time=current_time_formatted(), worker=worker).save()
+
+
+def _is_open(log_flow):
+    return ModelLogExecutionFlow.get_by_id(log_flow.id).end_time is None
+
+
+def test_reap_same_host_by_pid(db):
+    stale = Scheduling.HEARTBEAT_TIMEOUT * 2
+    live = _execution(_beat(HOST, os.getpid(), age=stale)) # A task holding the GIL delays the heartbeats
+    dead = _execution(_beat(HOST, _dead_pid()))
+    exited = _execution(f'{HOST}:{_dead_pid()}') # Its heartbeat was already removed
+
+    reaped = Reaper.reap()
+
+    assert [heartbeat.worker for heartbeat in reaped] == [dead.worker]
+    assert _is_open(live)
+    assert not _is_open(dead) and not _is_open(exited)
+
+
+def test_reap_other_host_by_heartbeat(db):
+    stale = _execution(_beat('other', 1, age=Scheduling.HEARTBEAT_TIMEOUT * 2))
+    recent = _execution(_beat('other', 2))
+    # Started after the heartbeats were read, or unknown: never closed without proof it died
+    unknown = _execution('other:3')
+
+    reaped = Reaper.reap()
+
+    assert [heartbeat.worker for heartbeat in reaped] == [stale.worker]
+    assert not _is_open(stale)
+    assert _is_open(recent) and _is_open(unknown)
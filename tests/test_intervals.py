@@ -0,0 +1,82 @@
+import datetime as dt
+from types import SimpleNamespace
+import pytest
+import schedule
+from fluxo.fluxo_core.intervals import (
+    Seconds, Minutes, Hours, Days, Cron, next_fire_times, missed_fire_times, last_missed_fire_times)
+
+
+def _schedule_first_run(monkeypatch, interval: dict, now: dt.datetime):
+    '''
+    The first run that `schedule` plans for a job of the interval created at `now`, built
+    as `FlowsExecutor` builds the jobs.
+    '''
+    class FrozenDatetime(dt.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(schedule, 'datetime', SimpleNamespace(
+        datetime=FrozenDatetime, timedelta=dt.timedelta, time=dt.time, date=dt.date))
+
+    unit = next(unit for unit in ('minutes', 'hours', 'days') if interval.get(unit))
+    job = getattr(schedule.Job(interval.get(unit), schedule.Scheduler()), unit).at(interval.get('at'))
+    job.do(lambda: None)
+    return job.next_run
+
+
+NOW = dt.datetime(2024, 2, 28, 14, 30, 15, 500000)
+
+
+@pytest.mark.parametrize('interval', [
+    Minutes(1, 10), Minutes(1, 15), Minutes(1, 45), Minutes(5, 10), Minutes(5, 45),
+    Hours(1, 10), Hours(1, 30), Hours(1, 50), Hours(3, 10), Hours(3, 50),
+    Days(1, (9, 0)), Days(1, (14, 30)), Days(1, (18, 0)),
+    Days(2, (9, 0)), Days(2, (14, 30)), Days(2, (18, 0)), Days(7, (23, 59)),
+])
+def test_first_fire_matches_schedule(monkeypatch, interval):
+    interval = interval.format()
+    expected = _schedule_first_run(monkeypatch, interval, NOW)
+
+    fires = list(next_fire_times(interval, NOW, NOW + dt.timedelta(days=30)))
+    assert fires[0] == expected
+
+
+def test_fires_follow_the_last_fire():
+    interval = Minutes(5, 0).format()
+    last_fire = dt.datetime(2024, 2, 28, 14, 0)
+
+    fires = list(next_fire_times(interval, NOW, NOW + dt.timedelta(minutes=20), last_fire))
+    assert fires == [dt.datetime(2024, 2, 28, 14, minute) for minute in (35, 40, 45, 50)]
+
+
+def test_fires_follow_the_first_fire_of_a_new_job():
+    interval = Hours(2, 0).format()
+    last_fire = dt.datetime(2024, 2, 27, 9, 0) # Of a job of the previous start
+    first_fire = dt.datetime(2024, 2, 28, 15, 7) # Not fired yet
+
+    fires = list(next_fire_times(interval, NOW, NOW + dt.timedelta(hours=5), last_fire, first_fire))
+    assert fires == [dt.datetime(2024, 2, 28, 15, 7), dt.datetime(2024, 2, 28, 17, 7), dt.datetime(2024, 2, 28, 19, 7)]
+
+
+@pytest.mark.parametrize('interval', [Seconds(7), Minutes(1, 0), Hours(2, 30), Days(1, (6, 0)), Cron('*/10 8-18 * * 1-5')])
+@pytest.mark.parametrize('until', [
+    dt.datetime(2024, 2, 27, 23, 0), # Before the last fire
+    dt.datetime(2024, 2, 28, 0, 0), # The last fire
+    dt.datetime(2024, 2, 28, 0, 0, 6),
+    dt.datetime(2024, 3, 2, 14, 30, 15),
+])
+@pytest.mark.parametrize('keep', [1, 3, 100])
+def test_last_missed_fire_times_match_the_walk(interval, until, keep):
+    interval, last_fire = interval.format(), dt.datetime(2024, 2, 28)
+    fires = list(missed_fire_times(interval, last_fire, until))
+
+    assert last_missed_fire_times(interval, last_fire, until, keep) == (len(fires), fires[-keep:])
+
+
+def test_last_missed_fire_times_of_a_long_outage():
+    last_fire = dt.datetime(2024, 1, 1)
+    count, fires = last_missed_fire_times(Seconds(1).format(), last_fire, last_fire + dt.timedelta(days=365), 2)
+
+    assert count == 365 * 86400
+    assert fires == [last_fire + dt.timedelta(days=365, seconds=-1), last_fire + dt.timedelta(days=365)]
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from fluxo.settings import Scheduling
+from fluxo.fluxo_core.flow import Flow
+from fluxo.fluxo_core.intervals import Seconds, Minutes
+from fluxo.fluxo_core.flows_executor import FlowsExecutor
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.flow_schedule import ModelFlowSchedule
+
+
+def _missed_runs(interval, policy, outage: timedelta, grace: int = 60):
+    flow_info = Flow('Flow', interval.format(), misfire_policy=policy, misfire_grace_time=grace, spread_window=0)
+    ModelFlow(name='Flow', interval=flow_info.interval, list_names_tasks=['Task']).save()
+    flow = ModelFlow.get_by_name('Flow')
+
+    now = datetime.now().replace(microsecond=0)
+    ModelFlowSchedule.save_last_planned_fire(flow.id, now - outage)
+    job = SimpleNamespace(next_run=now + timedelta(hours=1))
+    return now, FlowsExecutor._missed_runs(flow_info, job)
+
+
+@pytest.mark.parametrize('policy', ['skip', 'once', 'all'])
+def test_missed_runs_of_a_long_outage(db, policy):
+    now, runs = _missed_runs(Seconds(1), policy, timedelta(days=30), grace=0)
+
+    if policy == 'all':
+        assert len(runs) == Scheduling.MAX_CATCH_UP_RUNS
+        assert runs[-1] >= now - timedelta(seconds=1) and runs == sorted(runs)
+    elif policy == 'once':
+        assert len(runs) == 1
+    else:
+        assert runs == [] or runs == [now] # Only a fire at the current second is not late yet
+
+
+def test_missed_runs_within_the_grace_time(db):
+    now, runs = _missed_runs(Minutes(1, 0), 'skip', timedelta(minutes=3, seconds=30), grace=60)
+
+    # The fire less than a minute ago runs late, the older ones are skipped
+    assert len(runs) == 1 and now - timedelta(seconds=60) <= runs[0] <= now
@@ -0,0 +1,21 @@
+from fluxo.fluxo_core.database.profile_request import ModelProfileRequest
+
+
+def test_consume_without_requests(db):
+    assert not ModelProfileRequest.consume(1, 'Task')
+
+
+def test_consume_prefers_the_request_of_the_task(db):
+    ModelProfileRequest(flow_id=1, task_name=None, remaining=1).save()
+    ModelProfileRequest(flow_id=1, task_name='Task', remaining=2).save()
+
+    assert [ModelProfileRequest.consume(1, 'Task') for _ in range(4)] == [True, True, True, False]
+    assert ModelProfileRequest.get_all_active_by_flow_id(1) is None
+
+
+def test_consume_only_matching_requests(db):
+    ModelProfileRequest(flow_id=1, task_name='Other', remaining=1).save()
+    ModelProfileRequest(flow_id=2, task_name=None, remaining=1).save()
+
+    assert not ModelProfileRequest.consume(1, 'Task')
+    assert len(ModelProfileRequest.get_all_active_by_flow_id(1)) == 1
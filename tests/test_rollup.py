@@ -0,0 +1,83 @@
+import random
+from datetime import datetime, timedelta
+import pytest
+from fluxo.settings import Analytics
+from fluxo.fluxo_core.database.rollup import ModelRollup
+
+DAY = datetime(2024, 3, 10)
+
+
+@pytest.fixture
+def durations(db):
+    '''
+    Executions of one task during a day, with a different distribution each hour, and some of the next day.
+    '''
+    rng = random.Random(3)
+    durations = {}
+    for hour in range(24):
+        for _ in range(50):
+            finished_at = DAY + timedelta(hours=hour, seconds=rng.randrange(3600))
+            duration = rng.lognormvariate(hour / 6, 0.8)
+            durations.setdefault(hour, []).append(duration)
+            ModelRollup.add('Flow', 'Task', finished_at, duration, error=duration > 20)
+    ModelRollup.add('Flow', 'Task', DAY + timedelta(days=1, hours=1), 1.0, error=False)
+    ModelRollup.add('Flow', '', DAY + timedelta(hours=5), 60.0, error=True)
+    return durations
+
+
+def test_add_counts_the_hour_and_the_day(durations):
+    hours = ModelRollup.get_trend('Flow', 'Task', 'hour', '2024/03/10', '2024/03/11')
+    assert [rollup.start for rollup in hours] == [f'2024/03/10 {hour:02d}:00:00' for hour in range(24)]
+    for rollup in hours:
+        hour_durations = durations[int(rollup.start[11:13])]
+        assert rollup.count == sum(rollup.sketch.values()) == len(hour_durations)
+        assert rollup.errors == sum(duration > 20 for duration in hour_durations)
+        assert rollup.total_duration == pytest.approx(sum(hour_durations))
+        assert rollup.min_duration == min(hour_durations)
+        assert rollup.max_duration == max(hour_durations)
+
+    days = ModelRollup.get_trend('Flow', 'Task', 'day')
+    assert [(rollup.start, rollup.count) for rollup in days] == [('2024/03/10 00:00:00', 1200), ('2024/03/11 00:00:00', 1)]
+
+
+def test_hourly_sketches_merge_into_the_daily_one(durations):
+    hours = ModelRollup.get_trend('Flow', 'Task', 'hour', '2024/03/10', '2024/03/11')
+    day, = ModelRollup.get_trend('Flow', 'Task', 'day', '2024/03/10', '2024/03/11')
+
+    merged = {}
+    for rollup in hours:
+        for bucket, count in rollup.sketch.items():
+            merged[bucket] = merged.get(bucket, 0) + count
+    assert merged == day.sketch
+
+    all_durations = sorted(duration for hour in durations.values() for duration in hour)
+    for q, estimate in zip((0.5, 0.95, 0.99), day.quantiles()):
+        exact = all_durations[int(q * (len(all_durations) - 1))]
+        assert abs(estimate - exact) <= Analytics.RELATIVE_ACCURACY * exact * (1 + 1e-9)
+
+
+def test_summary_of_the_hours_equals_the_summary_of_the_day(durations):
+    by_hour = ModelRollup.get_summary('hour', '2024/03/10', '2024/03/11')
+    by_day = ModelRollup.get_summary('day', '2024/03/10', '2024/03/11')
+
+    assert [(rollup.flow_name, rollup.task_name) for rollup in by_day] == [('Flow', ''), ('Flow', 'Task')]
+    for hour, day in zip(by_hour, by_day):
+        assert (hour.flow_name, hour.task_name, hour.start, day.start) == (day.flow_name, day.task_name, None, None)
+        assert (hour.count, hour.errors, hour.min_duration, hour.max_duration) == \
+            (day.count, day.errors, day.min_duration, day.max_duration)
+        assert hour.total_duration == pytest.approx(day.total_duration)
+        assert hour.sketch == day.sketch
+        assert hour.quantiles() == day.quantiles()
+
+
+def test_quantiles_stay_within_the_shortest_and_the_longest(db):
+    ModelRollup.add('Flow', 'Task', DAY, 2.0, error=False)
+    rollup, = ModelRollup.get_trend('Flow', 'Task', 'day')
+    assert rollup.quantiles((0, 0.5, 1)) == [2.0, 2.0, 2.0]
+
+
+def test_invalid_period(db):
+    with pytest.raises(ValueError):
+        ModelRollup.get_trend('Flow', 'Task', 'week')
+    with pytest.raises(ValueError):
+        ModelRollup.get_summary('week')
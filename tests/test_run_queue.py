@@ -0,0 +1,105 @@
+import time
+from datetime import datetime
+from fluxo.uttils import current_time_formatted
+from fluxo.fluxo_core.heartbeat import Reaper
+from fluxo.fluxo_core.database.task import ModelTask
+from fluxo.fluxo_core.database.run_queue import ModelRunQueue
+from fluxo.fluxo_core.database.log_execution_flow import ModelLogExecutionFlow
+
+PLANNED = datetime(2024, 3, 10, 12, 0)
+
+
+def _expire(id, node):
+    # The lease of the node ended a second ago
+    assert ModelRunQueue.renew(id, node, -1)
+
+
+def test_two_nodes_claim_different_runs(db):
+    low = ModelRunQueue.enqueue('Low', PLANNED, False, 0, 1.0)
+    high = ModelRunQueue.enqueue('High', PLANNED, True, 5, 5.0)
+
+    first = ModelRunQueue.claim('host:1', 30, 3)
+    second = ModelRunQueue.claim('host:2', 30, 3)
+    assert (first.id, first.node, first.status, first.attempts) == (high, 'host:1', 'claimed', 1)
+    assert (first.planned_time, first.catch_up) == (PLANNED, True)
+    assert (second.id, second.node) == (low, 'host:2')
+    assert first.expired_node is second.expired_node is None
+
+    assert ModelRunQueue.claim('host:3', 30, 3) is None
+
+
+def test_live_lease_is_not_claimed_again(db):
+    ModelRunQueue.enqueue('Flow', PLANNED, False, 0, 1.0)
+    run = ModelRunQueue.claim('host:1', 30, 3)
+
+    assert ModelRunQueue.renew(run.id, 'host:1', 30)
+    assert ModelRunQueue.claim('host:2', 30, 3) is None
+
+
+def test_expired_lease_is_claimed_again(db):
+    id = ModelRunQueue.enqueue('Flow', PLANNED, False, 0, 1.0)
+    ModelRunQueue.claim('host:1', 30, 3)
+    _expire(id, 'host:1')
+
+    run = ModelRunQueue.claim('host:2', 30, 3)
+    assert (run.id, run.node, run.attempts, run.expired_node) == (id, 'host:2', 2, 'host:1')
+    assert run.lease_until > time.time()
+
+    # The node that lost the lease can no longer renew or finish the run
+    assert not ModelRunQueue.renew(id, 'host:1', 30)
+    ModelRunQueue.finish(id, 'host:1', 'Interrupted')
+    assert ModelRunQueue.get_all_unfinished()[0].node == 'host:2'
+
+    ModelRunQueue.finish(id, 'host:2')
+    finished, = ModelRunQueue.pop_finished()
+    assert (finished.id, finished.status, finished.error) == (id, 'done', None)
+    assert ModelRunQueue.get_all_unfinished() == []
+
+
+def test_run_fails_after_max_attempts(db):
+    id = ModelRunQueue.enqueue('Flow', PLANNED, False, 0, 1.0)
+    for attempt in range(1, 4):
+        run = ModelRunQueue.claim(f'host:{attempt}', 30, 3)
+        assert (run.id, run.attempts) == (id, attempt)
+        _expire(id, run.node)
+
+    assert ModelRunQueue.claim('host:4', 30, 3) is None
+    failed, = ModelRunQueue.pop_finished()
+    assert (failed.id, failed.status, failed.attempts) == (id, 'failed', 3)
+    assert failed.error == 'Lease of node host:3 expired 3 time(s)'
+
+
+def test_failed_run_does_not_block_the_next_one(db):
+    expired = ModelRunQueue.enqueue('Flow', PLANNED, False, 0, 9.0)
+    ModelRunQueue.claim('host:1', 30, 1)
+    _expire(expired, 'host:1')
+    queued = ModelRunQueue.enqueue('Other', PLANNED, False, 0, 1.0)
+
+    run = ModelRunQueue.claim('host:2', 30, 1)
+    assert run.id == queued
+    assert [run.status for run in ModelRunQueue.pop_finished()] == ['failed']
+
+
+def test_close_executions_of_an_expired_lease(db):
+    # The execution left open by the node whose lease expired, and one of another node
+    def execution(worker):
+        log_flow = ModelLogExecutionFlow(name='Flow', id_flow=1, start_time=current_time_formatted(), worker=worker).save()
+        done = ModelTask(name='First', flow_id=1, start_time=current_time_formatted(),
+                         end_time=current_time_formatted(), log_flow_id=log_flow.id).save()
+        running = ModelTask(name='Second', flow_id=1, start_time=current_time_formatted(), log_flow_id=log_flow.id).save()
+        log_flow.ids_task = [done.id]
+        log_flow.update(**log_flow.__dict__)
+        return log_flow, running
+
+    expired, expired_task = execution('host:1')
+    live, live_task = execution('host:2')
+
+    Reaper.close_executions('Flow', 'host:1', 'Orphaned execution: the lease of node host:1 expired')
+
+    expired = ModelLogExecutionFlow.get_by_id(expired.id)
+    assert expired.end_time is not None
+    assert expired.ids_error_task == [expired_task.id]
+    assert ModelTask.get_by_id(expired_task.id).error.startswith('Orphaned execution')
+
+    assert ModelLogExecutionFlow.get_by_id(live.id).end_time is None
+    assert ModelTask.get_by_id(live_task.id).end_time is None
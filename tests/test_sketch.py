@@ -0,0 +1,83 @@
+import math
+import random
+import pytest
+from fluxo.settings import Analytics
+from fluxo.fluxo_core.sketch import DDSketch, GAMMA
+
+ACCURACY = Analytics.RELATIVE_ACCURACY
+
+
+def _sketch(durations):
+    counts = {}
+    for duration in durations:
+        bucket = DDSketch.bucket(duration)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def _exact(durations, q):
+    # The quantile the sketch estimates: the duration of rank q * (n - 1), rounded down,
+    # with the durations shorter than the minimum counted as the minimum
+    return max(sorted(durations)[math.floor(q * (len(durations) - 1))], Analytics.MIN_DURATION)
+
+
+@pytest.mark.parametrize('duration', [0.001, 0.0123, 0.5, 1.0, 1.01, 59.9, 3600.0, 86400.0 * 3])
+def test_bucket_bounds(duration):
+    bucket = DDSketch.bucket(duration)
+    # Bucket i holds the durations in (gamma^(i-1), gamma^i]
+    assert GAMMA ** (bucket - 1) < duration * (1 + 1e-12)
+    assert duration <= GAMMA ** bucket * (1 + 1e-12)
+    assert abs(DDSketch.value(bucket) - duration) <= ACCURACY * duration * (1 + 1e-9)
+
+
+def test_bucket_below_the_minimum_duration():
+    assert DDSketch.bucket(0) == DDSketch.bucket(Analytics.MIN_DURATION)
+    assert DDSketch.bucket(1e-9) == DDSketch.bucket(Analytics.MIN_DURATION)
+
+
+def test_value_is_within_the_accuracy_of_its_bucket():
+    for bucket in range(-700, 1200, 37):
+        lower, upper = GAMMA ** (bucket - 1), GAMMA ** bucket
+        value = DDSketch.value(bucket)
+        assert lower < value <= upper
+        assert (value - lower) / lower == pytest.approx(ACCURACY)
+        assert (upper - value) / upper == pytest.approx(ACCURACY)
+
+
+def test_quantiles_of_an_empty_sketch():
+    assert DDSketch.quantiles({}, (0.5, 0.99)) == [None, None]
+
+
+def test_quantiles_of_one_duration():
+    assert DDSketch.quantiles(_sketch([2.5]), (0, 0.5, 1)) == pytest.approx([2.5] * 3, rel=ACCURACY)
+
+
+@pytest.mark.parametrize('distribution', [
+    lambda rng: rng.uniform(0.5, 10),
+    lambda rng: rng.expovariate(1 / 30),
+    lambda rng: rng.lognormvariate(0, 2),
+    lambda rng: rng.paretovariate(1.2),
+])
+def test_quantiles_relative_accuracy(distribution):
+    rng = random.Random(7)
+    durations = [distribution(rng) for _ in range(20000)]
+    qs = (0, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999, 1)
+
+    for q, estimate in zip(qs, DDSketch.quantiles(_sketch(durations), qs)):
+        exact = _exact(durations, q)
+        assert abs(estimate - exact) <= ACCURACY * exact * (1 + 1e-9), q
+
+
+def test_merged_sketches_give_the_quantiles_of_all_durations():
+    rng = random.Random(11)
+    parts = [[rng.lognormvariate(i / 4, 1) for _ in range(1000)] for i in range(24)]
+
+    merged = {}
+    for part in parts:
+        for bucket, count in _sketch(part).items():
+            merged[bucket] = merged.get(bucket, 0) + count
+
+    durations = [duration for part in parts for duration in part]
+    assert merged == _sketch(durations)
+    for q, estimate in zip((0.5, 0.95, 0.99), DDSketch.quantiles(merged)):
+        assert abs(estimate - _exact(durations, q)) <= ACCURACY * _exact(durations, q) * (1 + 1e-9)
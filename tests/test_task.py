@@ -0,0 +1,22 @@
+from fluxo.fluxo_core.database.task import ModelTask
+
+
+def test_update_without_the_optional_columns(db):
+    task = ModelTask(name='Task', flow_id=1, start_time='2024/03/10 12:00:00', wall_time=1.5,
+                     read_bytes=10, profile_path='task_1.pstats', log_flow_id=7).save()
+
+    ModelTask.update(task.id, 'Task', '2024/03/10 12:00:02', 1, task.start_time, '2024/03/10 12:00:02', 'Boom')
+
+    updated = ModelTask.get_by_id(task.id)
+    assert (updated.end_time, updated.error, updated.error_size) == ('2024/03/10 12:00:02', 'Boom', 4)
+    assert (updated.wall_time, updated.read_bytes, updated.profile_path, updated.log_flow_id) == \
+        (1.5, 10, 'task_1.pstats', 7)
+
+
+def test_update_from_the_task(db):
+    task = ModelTask(name='Task', flow_id=1).save()
+    task.wall_time, task.error = 2.0, None
+    task.update(**{key: value for key, value in task.__dict__.items() if key != 'error_size'})
+
+    updated = ModelTask.get_by_id(task.id)
+    assert (updated.wall_time, updated.error, updated.error_size) == (2.0, None, None)
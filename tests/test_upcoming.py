@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from fluxo.fluxo_core.intervals import Minutes
+from fluxo.fluxo_core.upcoming import UpcomingRuns
+from fluxo.fluxo_core.database.flow import ModelFlow
+from fluxo.fluxo_core.database.flow_schedule import ModelFlowSchedule
+
+
+START = datetime(2024, 2, 28, 14, 30)
+
+
+def _running_flow(name: str, interval):
+    ModelFlow(name=name, interval=interval.format(), list_names_tasks=['Task'], running=True).save()
+    return ModelFlow.get_by_name(name)
+
+
+def test_upcoming_runs_follow_the_first_fire_of_the_job(db):
+    flow = _running_flow('Flow', Minutes(10, 0))
+    ModelFlowSchedule.save_first_planned_fire(flow.id, START + timedelta(minutes=3, seconds=20))
+
+    runs = UpcomingRuns.compute(hours=0.5, start=START)
+    assert [fire_time for fire_time, _name in runs.fires] == [
+        START + timedelta(minutes=minutes, seconds=20) for minutes in (3, 13, 23)]
+    assert runs.approximate == []
+
+
+def test_upcoming_runs_without_a_planned_fire_are_approximate(db):
+    _running_flow('Flow', Minutes(10, 0))
+
+    runs = UpcomingRuns.compute(hours=0.5, start=START)
+    assert runs.fires and runs.approximate == ['Flow']